@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -49,30 +51,53 @@ INSTALLED_APPS = [
     'functionality'
 ]
 
+# Loads request.user with its role profile in one query, through the user
+# cache (see authentication.backends)
+AUTHENTICATION_BACKENDS = [
+    'authentication.backends.ProfileModelBackend',
+]
+
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack (see functionality.metrics)
+    'functionality.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'functionality.routers.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'InternSync.urls'
 
+# Compiled templates are kept in memory by the cached loader, so each one is
+# read and parsed once per process instead of on every render. Django would
+# only pick it by default while no loaders are listed; it is spelled out here
+# so it stays on. CACHED_TEMPLATES=0 turns it off. The development server
+# still reloads edited templates either way.
+CACHED_TEMPLATES = os.environ.get('CACHED_TEMPLATES', '1') == '1'
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that times each render for MetricsMiddleware
+        'BACKEND': 'functionality.metrics.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'functionality.fragments.fragment_cache',
             ],
+            'loaders': [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)] if CACHED_TEMPLATES else TEMPLATE_LOADERS,
         },
     },
 ]
@@ -83,13 +108,223 @@ WSGI_APPLICATION = 'InternSync.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# SQLITE_PROFILE=production tunes every new connection for several gunicorn
+# workers sharing one file: WAL so readers never block the writer,
+# synchronous=NORMAL (durable at each WAL checkpoint rather than each commit),
+# a memory-mapped file and a larger page cache, and a 20 second busy timeout.
+# Transactions start with BEGIN IMMEDIATE, so a transaction.atomic() block
+# takes the write lock up front and waits its turn instead of failing with
+# "database is locked" when it upgrades from reading to writing.
+
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'default')
+
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'init_command': (
+            'PRAGMA journal_mode=WAL;'
+            'PRAGMA synchronous=NORMAL;'
+            'PRAGMA mmap_size=268435456;'
+            'PRAGMA cache_size=-32000;'
+            'PRAGMA temp_store=MEMORY;'
+        ),
+        'transaction_mode': 'IMMEDIATE',
+        # Seconds; sets SQLite's busy_timeout on the connection
+        'timeout': 20,
+    },
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': SQLITE_PROFILES[SQLITE_PROFILE],
     }
 }
 
+# Read replicas: SQLITE_REPLICAS is a comma-separated list of SQLite files
+# refreshed from the primary by `manage.py sync_replicas --interval N`. Views
+# marked @replica_reads read from them unless the browser is pinned to the
+# primary after its own write (see functionality.routers).
+
+SQLITE_REPLICAS = [path for path in os.environ.get('SQLITE_REPLICAS', '').split(',') if path]
+
+for number, path in enumerate(SQLITE_REPLICAS, 1):
+    DATABASES[f'replica_{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+        'OPTIONS': SQLITE_PROFILES[SQLITE_PROFILE],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['functionality.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+#
+# The "search" cache holds job search pages and facets. Pick a backend with
+# SEARCH_CACHE_BACKEND: 'locmem' (per process), 'file' (shared by the workers
+# of one machine) or 'redis' (any Redis-protocol server, e.g. a local
+# redis-server or valkey; needs the redis package).
+
+SEARCH_CACHE_BACKEND = os.environ.get('SEARCH_CACHE_BACKEND', 'locmem')
+SEARCH_CACHE_TIMEOUT = int(os.environ.get('SEARCH_CACHE_TIMEOUT', 60))
+
+SEARCH_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'internsync-search',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('SEARCH_CACHE_LOCATION', BASE_DIR / 'cache' / 'search'),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('SEARCH_CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+    },
+}
+
+# The "auth" cache holds cached sessions and the authenticated user with its
+# profile. Only a cache every worker shares ('file' or 'redis') may hold them:
+# with a per-process locmem cache a logout, password change or profile edit
+# would only evict the copy in the worker that served it.
+
+AUTH_CACHE_BACKEND = os.environ.get('AUTH_CACHE_BACKEND', 'locmem')
+SHARED_AUTH_CACHE = AUTH_CACHE_BACKEND in ('file', 'redis')
+
+AUTH_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'internsync-auth',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('AUTH_CACHE_LOCATION', BASE_DIR / 'cache' / 'auth'),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('AUTH_CACHE_LOCATION', 'redis://127.0.0.1:6379/2'),
+    },
+}
+
+# The "fragments" cache holds rendered job cards and application rows (see
+# functionality.fragments). Their keys carry the row's updated_at, so the
+# timeout only bounds how stale a company or student name on them can get.
+
+FRAGMENT_CACHE_BACKEND = os.environ.get('FRAGMENT_CACHE_BACKEND', 'locmem')
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', 600))
+
+FRAGMENT_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'internsync-fragments',
+        # Room for the cards and rows of a few hundred pages
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('FRAGMENT_CACHE_LOCATION', BASE_DIR / 'cache' / 'fragments'),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('FRAGMENT_CACHE_LOCATION', 'redis://127.0.0.1:6379/3'),
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'search': SEARCH_CACHE_BACKENDS[SEARCH_CACHE_BACKEND],
+    'auth': AUTH_CACHE_BACKENDS[AUTH_CACHE_BACKEND],
+    'fragments': FRAGMENT_CACHE_BACKENDS[FRAGMENT_CACHE_BACKEND],
+}
+
+
+# Sessions
+# https://docs.djangoproject.com/en/5.0/topics/http/sessions/
+#
+# SESSION_MODE picks where sessions live: 'db' (a session-table read on every
+# request), 'cached_db' (read from the auth cache, written through to the
+# database), 'cache' (auth cache only; lost when it is flushed) or
+# 'signed_cookies' (no server-side storage at all, but the session can't be
+# revoked before it expires). The authenticated user and its profile are
+# cached for USER_CACHE_TIMEOUT seconds; 0 turns that off. Both caches
+# default to on only with a shared auth cache (see above).
+
+SESSION_MODE = os.environ.get('SESSION_MODE', 'cached_db' if SHARED_AUTH_CACHE else 'db')
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+SESSION_CACHE_ALIAS = 'auth'
+
+USER_CACHE_TIMEOUT = int(os.environ.get('USER_CACHE_TIMEOUT', 30 if SHARED_AUTH_CACHE else 0))
+
+if not SHARED_AUTH_CACHE and (SESSION_MODE in ('cached_db', 'cache') or USER_CACHE_TIMEOUT):
+    raise ImproperlyConfigured(
+        "Cached sessions and USER_CACHE_TIMEOUT need a shared AUTH_CACHE_BACKEND ('file' or 'redis')"
+    )
+
+
+# File uploads
+# Every upload is streamed to a temporary file and hashed chunk by chunk;
+# CV content checks then run on the in-process background queue.
+
+FILE_UPLOAD_HANDLERS = ['functionality.uploads.HashingFileUploadHandler']
+
+TASK_WORKERS = int(os.environ.get('TASK_WORKERS', 2))
+TASKS_ALWAYS_EAGER = False
+
+# Scheduler
+# `manage.py run_scheduler` runs as its own process: it closes postings whose
+# deadline has passed, moves the applications of jobs closed more than
+# ARCHIVE_AFTER_DAYS days ago into the archive table, and sweeps up fast-track
+# work, each every SCHEDULER_INTERVALS seconds. Run one per database.
+
+SCHEDULER_INTERVALS = {
+    'close_expired_jobs': int(os.environ.get('CLOSE_JOBS_INTERVAL', 60)),
+    'archive_applications': int(os.environ.get('ARCHIVE_INTERVAL', 3600)),
+    'fast_track': int(os.environ.get('FAST_TRACK_INTERVAL', 300)),
+}
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 90))
+
+# CV downloads can be handed to the front-end server instead of being streamed
+# by Django: None, 'x-sendfile' (Apache/lighttpd, absolute path) or
+# 'x-accel-redirect' (nginx, served from an internal location at the prefix
+# below that aliases MEDIA_ROOT).
+CV_SENDFILE_BACKEND = os.environ.get('CV_SENDFILE_BACKEND') or None
+CV_SENDFILE_PREFIX = '/protected-media/'
+
+
+# Served through InternSync/asgi.py (e.g. uvicorn), the listing and dashboard
+# views are their native async versions, so a request waiting on the database
+# doesn't hold a thread. asgi.py turns this on; WSGI servers keep the
+# synchronous views, which would otherwise each need their own event loop.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '0') == '1'
+
+
+# Instrumentation
+# MetricsMiddleware keeps per-view histograms of wall time, query count and
+# time, template time and response size, served in the Prometheus text format
+# at /metrics/ to staff users, or to a scraper that sends
+# "Authorization: Bearer <METRICS_TOKEN>". Requests slower than
+# SLOW_REQUEST_MS (0 turns it off) are logged with their SLOW_REQUEST_QUERIES
+# slowest SQL statements.
+
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 0))
+SLOW_REQUEST_QUERIES = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
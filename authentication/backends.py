@@ -0,0 +1,26 @@
+# backends.py
+#
+# The session user is loaded together with its Student/Recruiter profile in
+# one joined query, so request.user.student / request.user.recruiter are
+# already cached when a view reads them. The result is kept in the user cache
+# for USER_CACHE_TIMEOUT seconds.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .cache import get_cached_user
+
+User = get_user_model()
+
+
+class ProfileModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        def load():
+            return User._default_manager.select_related('student', 'recruiter').filter(pk=user_id).first()
+
+        user = get_cached_user(user_id, load)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        # ModelBackend's own aget_user would skip both the join and the cache
+        return await sync_to_async(self.get_user)(user_id)
@@ -0,0 +1,45 @@
+# cache.py
+#
+# Short-lived cache of the authenticated user together with its Student or
+# Recruiter profile, read by ProfileModelBackend on every request. Any save or
+# delete of the user or its profile drops the entry (see signals.py); code
+# that writes those rows with queryset.update() must call invalidate_user.
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def get_cache():
+    return caches[getattr(settings, 'USER_CACHE_ALIAS', 'auth')]
+
+
+def get_timeout():
+    return getattr(settings, 'USER_CACHE_TIMEOUT', 0)
+
+
+def user_cache_key(user_id):
+    return f'user:{user_id}'
+
+
+def get_cached_user(user_id, load):
+    timeout = get_timeout()
+    if not timeout:
+        return load()
+    cache = get_cache()
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = load()
+        if user is not None:
+            cache.set(key, user, timeout)
+    return user
+
+
+def _delete_user(user_id):
+    get_cache().delete(user_cache_key(user_id))
+
+
+def invalidate_user(user_id):
+    # Drop now and again on commit, in case a request re-cached the old row meanwhile
+    _delete_user(user_id)
+    transaction.on_commit(lambda: _delete_user(user_id))
@@ -1,18 +1,53 @@
 # decorators.py
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import user_passes_test
-from django.shortcuts import redirect
+from django.core.exceptions import ObjectDoesNotExist
 
 User = get_user_model()
 
-def student_required(function):
-    def check_user(user):
-        return user.is_authenticated and user.role == User.STUDENT
-    
-    return user_passes_test(check_user, login_url='login')(function)
-
-def recruiter_required(function):
-    def check_user(user):
-        return user.is_authenticated and user.role == User.RECRUITER
-    
-    return user_passes_test(check_user, login_url='login')(function)
\ No newline at end of file
+
+def get_profile(user, role):
+    # Cached by ProfileModelBackend, so no query; None if the profile is missing
+    if not user.is_authenticated or user.role != role:
+        return None
+    try:
+        return getattr(user, role)
+    except ObjectDoesNotExist:
+        return None
+
+
+def profile_required(role):
+    """
+    Only let users with ``role`` and its profile through, and pass the
+    profile to the view as its second argument: view(request, profile, ...).
+    Works for async views too.
+    """
+    def decorator(function):
+        if iscoroutinefunction(function):
+            @wraps(function)
+            async def wrapper(request, *args, **kwargs):
+                # Resolved already by the test below; request.user is set so
+                # that templates don't load it again synchronously
+                request.user = await request.auser()
+                return await function(request, get_profile(request.user, role), *args, **kwargs)
+
+            async def test(user):
+                return get_profile(user, role) is not None
+        else:
+            @wraps(function)
+            def wrapper(request, *args, **kwargs):
+                return function(request, get_profile(request.user, role), *args, **kwargs)
+
+            def test(user):
+                return get_profile(user, role) is not None
+
+        return user_passes_test(test, login_url='login')(wrapper)
+
+    return decorator
+
+
+student_required = profile_required(User.STUDENT)
+recruiter_required = profile_required(User.RECRUITER)
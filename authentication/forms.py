@@ -1,6 +1,56 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm,UserChangeForm
-from .models import CustomUser,Student,Recruiter
+from .models import CustomUser,Skill,Student,Recruiter
+
+
+class SkillsField(forms.CharField):
+    # Comma-separated skills, cleaned to a sorted list of distinct normalized names
+    def to_python(self, value):
+        value = super().to_python(value)
+        return sorted({Skill.normalize(name) for name in value.split(',') if name.strip()})
+
+    def prepare_value(self, value):
+        return ', '.join(value) if isinstance(value, (list, tuple)) else value
+
+    def validate(self, value):
+        super().validate(value)
+        max_length = Skill._meta.get_field('name').max_length
+        too_long = [name for name in value if len(name) > max_length]
+        if too_long:
+            raise forms.ValidationError(f"Skill names are limited to {max_length} characters: {too_long[0]}")
+
+
+def save_changed(form):
+    """
+    Save only the columns the user changed on a bound ModelForm. The instance
+    may be the cached request.user or its profile, so a full save could write
+    back values another worker or a background task has changed since.
+    """
+    instance = form.save(commit=False)
+    changed = [name for name in form._meta.fields if name in form.changed_data]
+    if changed:
+        instance.save(update_fields=changed)
+    form.save_m2m()
+    return instance
+
+
+class SkillsFormMixin:
+    # For a ModelForm with a SkillsField named after one of the model's skill
+    # many-to-many fields (left out of Meta.fields); saved along with the
+    # other many-to-many data, so commit=False works as usual
+    skills_field = 'skills'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial[self.skills_field] = sorted(
+                getattr(self.instance, self.skills_field).values_list('name', flat=True)
+            )
+
+    def _save_m2m(self):
+        super()._save_m2m()
+        getattr(self.instance, self.skills_field).set(Skill.for_names(self.cleaned_data[self.skills_field]))
+
 
 class SignUpForm(forms.ModelForm):
     STUDENT = 'student'
@@ -53,12 +103,19 @@ class CustomUserForm(UserChangeForm):
             'email': forms.EmailInput(attrs={'class': 'form-control'}),
         }
 
-class StudentProfileForm(forms.ModelForm):
+class StudentProfileForm(SkillsFormMixin, forms.ModelForm):
+    skills = SkillsField(
+        required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'e.g. python, sql, figma'}),
+    )
+
     class Meta:
         model = Student
-        fields = ['cv']
+        fields = ['cv', 'cgpa', 'graduation_year']
         widgets = {
-            'cv': forms.FileInput(attrs={'class': 'form-control'})
+            'cv': forms.FileInput(attrs={'class': 'form-control'}),
+            'cgpa': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0', 'max': '10'}),
+            'graduation_year': forms.NumberInput(attrs={'class': 'form-control'}),
         }
         
     def clean_cv(self):
@@ -0,0 +1,65 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from authentication.cache import get_cache
+from authentication.models import CustomUser, Student
+
+
+def view(request):
+    # What a student view needs from the auth layer
+    request.user.student
+    return HttpResponse()
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request session and user lookup overhead of each session mode"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help="Requests per mode (default 1000)")
+        parser.add_argument(
+            '--modes', nargs='+', choices=sorted(settings.SESSION_ENGINES), default=sorted(settings.SESSION_ENGINES),
+            help="Session modes to compare (default: all)",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'session mode':<16}{'user cache':<12}{'queries/req':>12}{'us/req':>10}")
+        with transaction.atomic():
+            # The benchmark user is rolled back afterwards
+            user = CustomUser.objects.create_user(
+                username='auth-benchmark', email='auth-benchmark@example.com', role=CustomUser.STUDENT,
+            )
+            Student.objects.create(user=user)
+            for mode in options['modes']:
+                for timeout in (0, settings.USER_CACHE_TIMEOUT or 30):
+                    queries, seconds = self.measure(user, mode, timeout, options['requests'])
+                    self.stdout.write(
+                        f"{mode:<16}{'on' if timeout else 'off':<12}{queries:>12.2f}{seconds * 1e6:>10.1f}"
+                    )
+            transaction.set_rollback(True)
+
+    def measure(self, user, mode, timeout, count):
+        with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[mode], USER_CACHE_TIMEOUT=timeout):
+            get_cache().clear()
+            client = Client()
+            client.force_login(user)
+            cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+
+            handler = SessionMiddleware(AuthenticationMiddleware(view))
+            factory = RequestFactory()
+            # One warm-up request fills the caches
+            handler(factory.get('/', HTTP_COOKIE=f'{settings.SESSION_COOKIE_NAME}={cookie}'))
+
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                for _ in range(count):
+                    handler(factory.get('/', HTTP_COOKIE=f'{settings.SESSION_COOKIE_NAME}={cookie}'))
+                elapsed = time.perf_counter() - start
+        return len(ctx.captured_queries) / count, elapsed / count
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:14
+
+from django.db import migrations, models
+
+
+def mark_existing_cvs_pending(apps, schema_editor):
+    # Existing uploads were never sniffed; validate_pending_cvs picks these up
+    Student = apps.get_model('authentication', 'Student')
+    Student.objects.exclude(cv='').exclude(cv__isnull=True).update(cv_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_student_cv'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='cv_error',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='cv_sha256',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='cv_status',
+            field=models.CharField(choices=[('none', 'No CV'), ('pending', 'Pending Validation'), ('valid', 'Valid'), ('invalid', 'Invalid')], default='none', max_length=10),
+        ),
+        migrations.RunPython(mark_existing_cvs_pending, migrations.RunPython.noop),
+    ]
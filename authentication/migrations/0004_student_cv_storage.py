@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:16
+
+import functionality.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_student_cv_validation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='cv',
+            field=models.FileField(blank=True, null=True, storage=functionality.storage.get_cv_storage, upload_to='cv_files/'),
+        ),
+    ]
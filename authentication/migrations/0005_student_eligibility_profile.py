@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:39
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_student_cv_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='cgpa',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(10)], verbose_name='CGPA'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='graduation_year',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='skills',
+            field=models.ManyToManyField(blank=True, to='authentication.skill'),
+        ),
+    ]
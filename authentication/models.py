@@ -1,5 +1,7 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from functionality.storage import get_cv_storage
 
 class CustomUser(AbstractUser):
     STUDENT = 'student'
@@ -24,11 +26,52 @@ class CustomUser(AbstractUser):
     def is_recruiter(self):
         return self.role == self.RECRUITER
     
+class Skill(models.Model):
+    # Shared vocabulary for student skills and the skills a job requires
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def normalize(name):
+        return ' '.join(name.split()).lower()
+
+    @classmethod
+    def for_names(cls, names):
+        """The Skill rows for ``names`` (already normalized), creating missing ones."""
+        names = set(names)
+        cls.objects.bulk_create([cls(name=name) for name in names], ignore_conflicts=True)
+        return list(cls.objects.filter(name__in=names))
+
 class Student(models.Model):
+    CV_NONE = 'none'
+    CV_PENDING = 'pending'
+    CV_VALID = 'valid'
+    CV_INVALID = 'invalid'
+
+    CV_STATUS_CHOICES = [
+        (CV_NONE, 'No CV'),
+        (CV_PENDING, 'Pending Validation'),
+        (CV_VALID, 'Valid'),
+        (CV_INVALID, 'Invalid'),
+    ]
+
     user = models.OneToOneField(CustomUser,on_delete=models.CASCADE,primary_key=True)
-    cv = models.FileField(upload_to='cv_files/', blank=True, null=True)
+    cv = models.FileField(upload_to='cv_files/', storage=get_cv_storage, blank=True, null=True)
     cv_approved_status = models.BooleanField(default=False)
     job_status = models.BooleanField(default=False)
+    # Set by the background CV validation (functionality.uploads)
+    cv_status = models.CharField(max_length=10, choices=CV_STATUS_CHOICES, default=CV_NONE)
+    cv_sha256 = models.CharField(max_length=64, blank=True)
+    cv_error = models.CharField(max_length=200, blank=True)
+    # Matched against the structured job criteria (functionality.eligibility)
+    cgpa = models.DecimalField(
+        max_digits=4, decimal_places=2, blank=True, null=True,
+        validators=[MinValueValidator(0), MaxValueValidator(10)], verbose_name='CGPA',
+    )
+    graduation_year = models.PositiveSmallIntegerField(blank=True, null=True)
+    skills = models.ManyToManyField(Skill, blank=True)
 
     def __str__(self):
         return self.user.username
@@ -0,0 +1,20 @@
+# signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_user
+from .models import CustomUser, Student, Recruiter
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Recruiter)
+@receiver(post_delete, sender=Recruiter)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
@@ -1,3 +1,266 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from functionality.cache import get_cache
+from .cache import get_cache as get_auth_cache, invalidate_user
+from functionality.models import Job, Application, ArchivedApplication
+from .models import CustomUser, Student, Recruiter
+
+
+def make_user(username, role):
+    return CustomUser.objects.create_user(username=username, email=f'{username}@example.com', role=role)
+
+
+def make_job(recruiter, title, days_left=10):
+    return Job.objects.create(
+        recruiter=recruiter, title=title, position='Intern', description='-', criteria='-',
+        location='Remote', last_date_to_apply=timezone.now() + timedelta(days=days_left),
+    )
+
+
+class RecruiterDashboardTests(TestCase):
+    def setUp(self):
+        self.recruiter = Recruiter.objects.create(
+            user=make_user('acme', CustomUser.RECRUITER), company_name='Acme'
+        )
+        self.client.force_login(self.recruiter.user)
+
+    def add_jobs(self, count, applicants_per_job):
+        for _ in range(count):
+            job = make_job(self.recruiter, f'Job {self.recruiter.job_set.count()}')
+            for j in range(applicants_per_job):
+                student = Student.objects.create(
+                    user=make_user(f'student-{job.pk}-{j}', CustomUser.STUDENT)
+                )
+                Application.objects.create(student=student, job=job, status=Application.UNDER_REVIEW)
+
+    def dashboard_query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('recruiter_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_is_constant(self):
+        self.add_jobs(1, 1)
+        self.dashboard_query_count()
+        baseline, _ = self.dashboard_query_count()
+
+        self.add_jobs(5, 4)
+        count, response = self.dashboard_query_count()
+        self.assertEqual(count, baseline)
+        self.assertEqual(len(response.context['recent_applications']), 10)
+
+    def test_stats(self):
+        self.add_jobs(2, 3)
+        make_job(self.recruiter, 'Closed', days_left=-1)
+        application = Application.objects.first()
+        application.status = Application.SELECTED
+        application.save()
+
+        _, response = self.dashboard_query_count()
+        self.assertEqual(response.context['stats'], {
+            'active_jobs_count': 2,
+            'total_applications': 6,
+            'in_process_count': 5,
+            'positions_filled': 1,
+        })
+        self.assertEqual([job.applications_count for job in response.context['active_jobs']], [3, 3])
+
+
+class StudentDashboardTests(TestCase):
+    def setUp(self):
+        self.recruiters = [
+            Recruiter.objects.create(user=make_user(name.lower(), CustomUser.RECRUITER), company_name=name)
+            for name in ('Acme', 'Globex')
+        ]
+        self.student = Student.objects.create(user=make_user('alice', CustomUser.STUDENT))
+        self.client.force_login(self.student.user)
+
+    def apply(self, count, status=Application.PENDING):
+        for _ in range(count):
+            recruiter = self.recruiters[Job.objects.count() % 2]
+            job = make_job(recruiter, f'Job {Job.objects.count()}')
+            Application.objects.create(student=self.student, job=job, status=status)
+
+    def dashboard_query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('student_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_is_constant(self):
+        self.apply(1)
+        self.dashboard_query_count()
+        baseline, _ = self.dashboard_query_count()
+
+        self.apply(6, Application.SHORTLISTED_INTERVIEW)
+        count, response = self.dashboard_query_count()
+        self.assertEqual(count, baseline)
+        self.assertEqual(len(response.context['applications']), 7)
+
+    def test_tracker(self):
+        self.apply(3)
+        make_job(self.recruiters[0], 'Not applied')
+        closed = Application.objects.get(job__title='Job 2')
+        closed.status = Application.SELECTED
+        closed.save()
+        Job.objects.filter(pk=closed.job_id).update(last_date_to_apply=timezone.now() - timedelta(days=1))
+        Application.objects.filter(job__title='Job 0').update(preference_order=9)
+
+        _, response = self.dashboard_query_count()
+        self.assertEqual(
+            [(app.job.title, app.job.recruiter.company_name, app.preference_order, app.job_open)
+             for app in response.context['applications']],
+            [('Job 1', 'Globex', 2, True), ('Job 2', 'Acme', 3, False), ('Job 0', 'Acme', 9, True)],
+        )
+        self.assertEqual(response.context['stats'], {
+            'applications_count': 3,
+            'shortlisted_count': 0,
+            'interview_count': 0,
+            'offers_count': 1,
+        })
+        self.assertContains(response, 'Globex')
+        self.assertContains(response, reverse('reorder_application', args=[closed.pk]))
+        self.assertNotContains(response, 'Not applied')
+
+    def test_archived_applications(self):
+        self.apply(1)
+        job = make_job(self.recruiters[1], 'Old offer', days_left=-200)
+        archived = ArchivedApplication.objects.create(
+            id=999, student=self.student, job=job, status=Application.SELECTED,
+            preference_order=1, applied_date=timezone.now() - timedelta(days=210),
+        )
+
+        _, response = self.dashboard_query_count()
+        self.assertEqual(list(response.context['archived_applications']), [archived])
+        self.assertEqual(response.context['stats']['applications_count'], 2)
+        self.assertEqual(response.context['stats']['offers_count'], 1)
+        self.assertContains(response, 'Old offer')
+        # Read-only: no preference form for an archived row
+        self.assertNotContains(response, reverse('reorder_application', args=[archived.pk]))
+
+
+@override_settings(USER_CACHE_TIMEOUT=0)
+class ProfileLoadingTests(TestCase):
+    def setUp(self):
+        self.recruiter = Recruiter.objects.create(
+            user=make_user('acme', CustomUser.RECRUITER), company_name='Acme'
+        )
+        self.student = Student.objects.create(user=make_user('alice', CustomUser.STUDENT))
+        self.job = make_job(self.recruiter, 'Backend Intern')
+        self.application = Application.objects.create(student=self.student, job=self.job)
+
+    def query_count(self, user, url, backend):
+        self.client.force_login(user, backend=backend)
+        get_cache().clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertNotIn(reverse('login'), response.get('Location', ''))
+        return len(ctx.captured_queries)
+
+    @override_settings(AUTHENTICATION_BACKENDS=[
+        'authentication.backends.ProfileModelBackend',
+        'django.contrib.auth.backends.ModelBackend',
+    ])
+    def assert_saves_profile_query(self, user, urls):
+        # The plain backend needs a second query for the profile on every request
+        for url in urls:
+            with self.subTest(url=url):
+                plain = self.query_count(user, url, 'django.contrib.auth.backends.ModelBackend')
+                joined = self.query_count(user, url, 'authentication.backends.ProfileModelBackend')
+                self.assertEqual(joined, plain - 1)
+
+    def test_student_views(self):
+        self.assert_saves_profile_query(self.student.user, [
+            reverse('student_dashboard'),
+            reverse('upload_cv'),
+            reverse('search_job'),
+            reverse('apply_job', args=[self.job.pk]),
+            reverse('edit_profile'),
+        ])
+
+    def test_recruiter_views(self):
+        self.assert_saves_profile_query(self.recruiter.user, [
+            reverse('recruiter_dashboard'),
+            reverse('create_job'),
+            reverse('all_applications'),
+            reverse('export_applications'),
+            reverse('update_application_status', args=[self.application.pk, Application.PENDING]),
+            reverse('download_cv', args=[self.application.pk]),
+            reverse('download_job_cvs', args=[self.job.pk]),
+            reverse('edit_profile'),
+        ])
+
+    def test_profile_is_injected(self):
+        self.client.force_login(self.recruiter.user)
+        response = self.client.get(reverse('all_applications'))
+        self.assertEqual(response.context['applications'].object_list[0], self.application)
+
+    def test_wrong_role_or_missing_profile_is_sent_to_login(self):
+        self.client.force_login(self.student.user)
+        self.assertRedirects(self.client.get(reverse('create_job')), f"{reverse('login')}?next={reverse('create_job')}")
+
+        orphan = make_user('orphan', CustomUser.RECRUITER)
+        self.client.force_login(orphan)
+        response = self.client.get(reverse('recruiter_dashboard'))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].startswith(reverse('login')))
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db', USER_CACHE_TIMEOUT=60)
+class UserCacheTests(TestCase):
+    def setUp(self):
+        get_auth_cache().clear()
+        self.student = Student.objects.create(user=make_user('alice', CustomUser.STUDENT))
+        self.client.force_login(self.student.user)
+
+    def auth_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('student_dashboard'))
+        return [q['sql'] for q in ctx.captured_queries if 'authentication_customuser' in q['sql'] or 'django_session' in q['sql']]
+
+    def test_warm_requests_skip_session_and_user_queries(self):
+        self.assertEqual(len(self.auth_queries()), 1)
+        self.assertEqual(self.auth_queries(), [])
+
+    def test_edit_profile_invalidates(self):
+        self.auth_queries()
+        self.client.post(reverse('edit_profile'), {'username': 'alice', 'email': 'alice@new.example.com'})
+        self.assertEqual(len(self.auth_queries()), 1)
+        response = self.client.get(reverse('student_dashboard'))
+        self.assertEqual(response.wsgi_request.user.email, 'alice@new.example.com')
+
+    def test_cv_validation_invalidates(self):
+        self.auth_queries()
+        Student.objects.filter(pk=self.student.pk).update(cv_status=Student.CV_VALID)
+        self.assertEqual(self.client.get(reverse('student_dashboard')).wsgi_request.user.student.cv_status, Student.CV_NONE)
+        invalidate_user(self.student.pk)
+        self.assertEqual(self.client.get(reverse('student_dashboard')).wsgi_request.user.student.cv_status, Student.CV_VALID)
+
+    @override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+    def test_stale_profile_is_not_written_back(self):
+        self.auth_queries()
+        # Another worker or a background task changes the row behind the cached copy
+        Student.objects.filter(pk=self.student.pk).update(cv_approved_status=True, job_status=True)
+
+        self.client.post(reverse('edit_profile'), {
+            'username': 'alice', 'email': 'alice@example.com', 'cgpa': '8.00', 'skills': '',
+        })
+        self.client.post(reverse('upload_cv'), {
+            'cv': SimpleUploadedFile('cv.pdf', b'%PDF-1.4\n%%EOF\n', content_type='application/pdf'),
+        })
+        student = Student.objects.get(pk=self.student.pk)
+        self.assertEqual(student.cgpa, Decimal('8.00'))
+        self.assertTrue(student.cv)
+        self.assertTrue(student.cv_approved_status)
+        self.assertTrue(student.job_status)
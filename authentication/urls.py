@@ -1,13 +1,18 @@
 # urls.py
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Native async versions under ASGI (see settings.ASYNC_VIEWS)
+student_dashboard = views.student_dashboard_async if settings.ASYNC_VIEWS else views.student_dashboard
+recruiter_dashboard = views.recruiter_dashboard_async if settings.ASYNC_VIEWS else views.recruiter_dashboard
+
 urlpatterns = [
     path('',views.landing,name=''),
     path('signup/', views.signup, name='signup'),
     path('login/', views.user_login, name='login'),
-    path('dashboard/student/', views.student_dashboard, name='student_dashboard'),
-    path('dashboard/recruiter/', views.recruiter_dashboard, name='recruiter_dashboard'),
+    path('dashboard/student/', student_dashboard, name='student_dashboard'),
+    path('dashboard/recruiter/', recruiter_dashboard, name='recruiter_dashboard'),
     path('logout/',views.user_logout,name='logout'),
     
     path('edit_profile/',views.edit_profile,name='edit_profile')
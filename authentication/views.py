@@ -1,13 +1,20 @@
+import asyncio
+from collections import Counter
+
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, authenticate, logout
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db import transaction
-from .forms import SignUpForm,CustomUserForm,StudentProfileForm,RecruiterProfileForm
+from django.db.models import Count
+from .forms import SignUpForm,CustomUserForm,StudentProfileForm,RecruiterProfileForm,save_changed
 from .models import CustomUser, Student, Recruiter
 from .decorators import student_required, recruiter_required
-from functionality.models import Application,Job
+from functionality.fragments import application_rows
+from functionality.models import Application,ArchivedApplication,Job,RecruiterApplicationStats
+from functionality.routers import replica_reads
+from functionality.uploads import queue_cv_validation
 from django.utils import timezone
 
 
@@ -64,28 +71,84 @@ def user_logout(request):
     logout(request)
     return redirect('')
 
-@student_required
-def student_dashboard(request):
-    student = request.user.student
-    context = {
+def student_dashboard_queries(student):
+    # The application tracker: every application with its job and company in
+    # one join, in the student's preference order (application_student_preference_unique)
+    applications = (
+        Application.objects.filter(student=student)
+        .select_related('job__recruiter')
+        .defer('job__description', 'job__criteria')
+        .order_by('preference_order')
+    )
+    # and the number per status in one GROUP BY
+    status_counts = (
+        Application.objects.filter(student=student)
+        .values_list('status').annotate(count=Count('id')).order_by()
+    )
+    # Applications to jobs closed long ago, moved out by the scheduler;
+    # read-only, newest first (archived_student_applied_idx)
+    archived = (
+        ArchivedApplication.objects.filter(student=student)
+        .select_related('job__recruiter')
+        .defer('job__description', 'job__criteria')
+        .order_by('-applied_date')
+    )
+    return applications, status_counts, archived
+
+
+def student_dashboard_context(student, applications, status_counts, archived):
+    now = timezone.now()
+    for app in applications:
+        app.job_open = app.job.is_active and app.job.last_date_to_apply > now
+    # The archived rows are all loaded anyway, so they are counted here
+    counts = Counter(dict(status_counts))
+    counts.update(app.status for app in archived)
+    stats = {
+        'applications_count': sum(counts.values()),
+        'shortlisted_count': counts[Application.SHORTLISTED_OA] + counts[Application.COMPLETED_OA],
+        'interview_count': counts[Application.SHORTLISTED_INTERVIEW],
+        'offers_count': counts[Application.SELECTED],
+    }
+    return {
         'cv_approved_status': student.cv_approved_status,
         'job_status': student.job_status,
+        'applications': applications,
+        'archived_applications': archived,
+        'stats': stats,
     }
+
+
+@student_required
+@replica_reads
+def student_dashboard(request, student):
+    applications, status_counts, archived = student_dashboard_queries(student)
+    context = student_dashboard_context(student, list(applications), status_counts, list(archived))
     return render(request, 'student_dashboard.html', context)
 
-@recruiter_required
-def recruiter_dashboard(request):
-    # Get the current recruiter
-    recruiter = request.user.recruiter
-    
-    # Get all jobs created by this recruiter
-    all_jobs = Job.objects.filter(recruiter=recruiter)
-    
-    # Add application count to each job
-    active_jobs = all_jobs.filter(is_active=True, last_date_to_apply__gt=timezone.now())
-    for job in active_jobs:
-        job.applications_count = Application.objects.filter(job=job).count()
-    
+
+@student_required
+@replica_reads
+async def student_dashboard_async(request, student):
+    applications, status_counts, archived = student_dashboard_queries(student)
+
+    async def rows(queryset):
+        return [obj async for obj in queryset]
+
+    context = student_dashboard_context(student, *await asyncio.gather(
+        rows(applications), rows(status_counts), rows(archived),
+    ))
+    return render(request, 'student_dashboard.html', context)
+
+
+def recruiter_dashboard_queries(request, recruiter):
+    # Active jobs joined with their materialized application counters
+    active_jobs = (
+        Job.objects.filter(recruiter=recruiter, is_active=True, last_date_to_apply__gt=timezone.now())
+        .select_related('application_stats')
+        .defer('description', 'criteria')
+        .order_by('-posted_date')
+    )
+
     # Get recent applications for the recruiter's jobs
     # Optional: Filter by status if provided in query params
     status_filter = request.GET.get('status', None)
@@ -94,28 +157,51 @@ def recruiter_dashboard(request):
     if status_filter:
         applications_query = applications_query.filter(status=status_filter)
     
-    recent_applications = applications_query.order_by('-applied_date')[:10]
-    
-    # Calculate dashboard statistics
+    recent_applications = application_rows(applications_query).order_by('-applied_date')[:10]
+
+    # Dashboard statistics are a primary-key read of the materialized counters
+    recruiter_stats = RecruiterApplicationStats.objects.filter(pk=recruiter.pk)
+    return active_jobs, recent_applications, recruiter_stats
+
+
+def recruiter_dashboard_context(recruiter, active_jobs, recent_applications, recruiter_stats):
+    for job in active_jobs:
+        job.applications_count = job.application_stats.total if hasattr(job, 'application_stats') else 0
+    recruiter_stats = recruiter_stats or RecruiterApplicationStats(recruiter=recruiter)
     stats = {
-        'active_jobs_count': active_jobs.count(),
-        'total_applications': Application.objects.filter(job__recruiter=recruiter).count(),
-        'in_process_count': Application.objects.filter(
-            job__recruiter=recruiter,
-            status__in=['under_review', 'shortlisted_oa', 'completed_oa', 'shortlisted_interview']
-        ).count(),
-        'positions_filled': Application.objects.filter(
-            job__recruiter=recruiter,
-            status='selected'
-        ).count(),
+        'active_jobs_count': len(active_jobs),
+        'total_applications': recruiter_stats.total,
+        'in_process_count': recruiter_stats.in_process,
+        'positions_filled': recruiter_stats.selected,
     }
     
-    context = {
+    return {
         'active_jobs': active_jobs,
         'recent_applications': recent_applications,
         'stats': stats,
     }
-    
+
+
+@recruiter_required
+@replica_reads
+def recruiter_dashboard(request, recruiter):
+    active_jobs, recent_applications, recruiter_stats = recruiter_dashboard_queries(request, recruiter)
+    context = recruiter_dashboard_context(recruiter, list(active_jobs), recent_applications, recruiter_stats.first())
+    return render(request, 'recruiter_dashboard.html', context)
+
+
+@recruiter_required
+@replica_reads
+async def recruiter_dashboard_async(request, recruiter):
+    active_jobs, recent_applications, recruiter_stats = recruiter_dashboard_queries(request, recruiter)
+
+    async def rows(queryset):
+        return [obj async for obj in queryset]
+
+    # Three independent reads, awaited together
+    context = recruiter_dashboard_context(recruiter, *await asyncio.gather(
+        rows(active_jobs), rows(recent_applications), recruiter_stats.afirst(),
+    ))
     return render(request, 'recruiter_dashboard.html', context)
 
 @login_required
@@ -135,16 +221,17 @@ def edit_profile(request):
             return redirect('home')
             
         if user_form.is_valid() and profile_form.is_valid():
-            user_form.save()
-            profile_form.save()
+            save_changed(user_form)
+            save_changed(profile_form)
             
             # If student uploads a new CV, reset the approval status
             if user.is_student() and 'cv' in request.FILES:
                 user.student.cv_approved_status = False
-                user.student.save()
+                user.student.save(update_fields=['cv_approved_status'])
+                queue_cv_validation(user.student, request.FILES['cv'])
                 
             messages.success(request, "Your profile has been updated successfully!")
-            return redirect('profile')  # Redirect to profile page
+            return redirect('edit_profile')  # Back to the profile page
     else:
         user_form = CustomUserForm(instance=user)
         
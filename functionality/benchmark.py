@@ -0,0 +1,214 @@
+# benchmark.py
+#
+# End-to-end benchmark of every URL in authentication/urls.py and
+# functionality/urls.py, driven through the test client against the
+# configured database (fill it with `manage.py generate_data` first).
+# SCENARIOS says who requests each URL and how; run_benchmark() records
+# latency percentiles, the median template render time and the most queries
+# a request made, and compare() checks a run against a baseline saved as
+# JSON by `manage.py benchmark_urls`.
+# Requests that change data run in a savepoint that is rolled back, so every
+# repetition sees the same rows, and the whole run is rolled back at the end.
+import time
+from contextlib import ExitStack
+
+from django.db import connections, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from authentication.models import CustomUser
+from .metrics import TEMPLATE_SECONDS
+from .models import Application, Job
+
+# url name: how to request it. 'role' is the account the client is logged in
+# as (None for anonymous); 'args' and 'data' values naming a fixture (see
+# benchmark_fixtures) are replaced by it. 'rollback' undoes each request,
+# 'relogin' logs in again before each one.
+SCENARIOS = {
+    '': {'role': None},
+    'signup': {'role': None},
+    'login': {'role': None},
+    'logout': {'role': 'student', 'method': 'post', 'relogin': True},
+    'student_dashboard': {'role': 'student'},
+    'recruiter_dashboard': {'role': 'recruiter'},
+    'edit_profile': {'role': 'student'},
+    'upload_cv': {'role': 'student'},
+    'create_job': {'role': 'recruiter'},
+    'search_job': {'role': 'student'},
+    'search_cache_stats': {'role': 'staff'},
+    'metrics': {'role': 'staff'},
+    'apply_job': {'role': 'student', 'args': ['open_job']},
+    'update_application_status': {
+        'role': 'recruiter', 'args': ['application', 'next_status'], 'rollback': True,
+    },
+    'all_applications': {'role': 'recruiter'},
+    'bulk_update_application_status': {
+        'role': 'recruiter', 'method': 'post', 'rollback': True,
+        'data': {'application_ids': 'application', 'status': 'next_status'},
+    },
+    'export_applications': {'role': 'recruiter'},
+    'download_cv': {'role': 'recruiter', 'args': ['application']},
+    'download_job_cvs': {'role': 'recruiter', 'args': ['job']},
+    'job_ranking': {'role': 'recruiter', 'args': ['job']},
+    'reject_ineligible_applications': {'role': 'recruiter', 'method': 'post', 'args': ['job'], 'rollback': True},
+    'reorder_application': {
+        'role': 'student', 'method': 'post', 'args': ['application'], 'data': {'rank': 1}, 'rollback': True,
+    },
+}
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def url_names():
+    """Names of the URLs the benchmark has to cover."""
+    from authentication import urls as authentication_urls
+    from functionality import urls as functionality_urls
+    return {
+        pattern.name
+        for module in (authentication_urls, functionality_urls)
+        for pattern in module.urlpatterns
+        if isinstance(pattern, URLPattern) and pattern.name is not None
+    }
+
+
+def missing_scenarios():
+    return sorted(url_names() - set(SCENARIOS))
+
+
+def benchmark_fixtures():
+    """
+    The rows the scenarios point at: a pending application to a job whose
+    applicant has a CV, that student and the job's recruiter, a job the
+    student can still apply to and a staff account (rolled back afterwards).
+    """
+    application = (
+        Application.objects.filter(status=Application.PENDING, job__is_active=True)
+        .exclude(student__cv='').exclude(student__cv__isnull=True)
+        .select_related('student__user', 'job__recruiter__user')
+        .order_by('id').first()
+    )
+    if application is None:
+        raise BenchmarkError("No pending application from a student with a CV; run generate_data first")
+    student = application.student
+    open_job = (
+        Job.objects.filter(is_active=True, last_date_to_apply__gt=timezone.now())
+        .exclude(application__student=student).order_by('id').first()
+    )
+    if open_job is None:
+        raise BenchmarkError("No open job the benchmark student hasn't applied to")
+    staff = CustomUser.objects.create_user(
+        username='benchmark-staff', email='benchmark-staff@example.com', role=CustomUser.ADMIN, is_staff=True,
+    )
+    return {
+        'users': {'student': student.user, 'recruiter': application.job.recruiter.user, 'staff': staff},
+        'application': application.pk,
+        'job': application.job_id,
+        'open_job': open_job.pk,
+        'next_status': Application.UNDER_REVIEW,
+    }
+
+
+def resolve(value, fixtures):
+    return fixtures.get(value, value) if isinstance(value, str) else value
+
+
+def timed_request(client, method, url, data):
+    """
+    (status code, seconds, queries, template seconds) of one request.
+    Streamed bodies are read to the end, which also closes the response the
+    way the test client does.
+    """
+    contexts = [CaptureQueriesContext(connections[alias]) for alias in connections]
+    # MetricsMiddleware adds the request's template time to the histogram
+    template_seconds = TEMPLATE_SECONDS.total()
+    with ExitStack() as stack:
+        for context in contexts:
+            stack.enter_context(context)
+        start = time.perf_counter()
+        response = getattr(client, method)(url, data)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        elapsed = time.perf_counter() - start
+    template_seconds = TEMPLATE_SECONDS.total() - template_seconds
+    return response.status_code, elapsed, sum(len(context) for context in contexts), template_seconds
+
+
+def run_scenario(scenario, fixtures, clients, requests, warmup):
+    role = scenario['role']
+    # Logging out ends the session, so that gets a client of its own
+    client = Client() if scenario.get('relogin') else clients[role]
+    url = reverse(scenario['name'], args=[resolve(arg, fixtures) for arg in scenario.get('args', [])])
+    data = {key: resolve(value, fixtures) for key, value in scenario.get('data', {}).items()}
+    method = scenario.get('method', 'get')
+
+    latencies, template_times, queries = [], [], 0
+    for repetition in range(warmup + requests):
+        if scenario.get('relogin'):
+            client.force_login(fixtures['users'][role])
+        with transaction.atomic():
+            status, elapsed, count, template_seconds = timed_request(client, method, url, data)
+            if scenario.get('rollback'):
+                transaction.set_rollback(True)
+        if status >= 400:
+            raise BenchmarkError(f"{scenario['name']} ({method.upper()} {url}) returned {status}")
+        if repetition >= warmup:
+            latencies.append(elapsed)
+            template_times.append(template_seconds)
+            queries = max(queries, count)
+    return {
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'template_p50_ms': percentile(template_times, 0.50) * 1000,
+        'queries': queries,
+    }
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+def run_benchmark(requests=30, warmup=2, names=None):
+    """
+    Request every URL in ``names`` (default: all of SCENARIOS) ``requests``
+    times after ``warmup`` unmeasured ones. Returns {name: {p50_ms, p95_ms,
+    p99_ms, template_p50_ms, queries}}.
+    """
+    names = sorted(names or SCENARIOS)
+    results = {}
+    with transaction.atomic():
+        fixtures = benchmark_fixtures()
+        clients = {None: Client()}
+        for role, user in fixtures['users'].items():
+            clients[role] = Client()
+            clients[role].force_login(user)
+        for name in names:
+            results[name] = run_scenario(dict(SCENARIOS[name], name=name), fixtures, clients, requests, warmup)
+        transaction.set_rollback(True)
+    return results
+
+
+def compare(results, baseline, threshold=0.25, min_delta_ms=2.0):
+    """
+    Regressions of ``results`` against ``baseline`` (a saved run), as
+    messages: any extra query, or a p95 more than ``threshold`` (a fraction)
+    and ``min_delta_ms`` above the baseline's.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        base = baseline['endpoints'].get(name)
+        if base is None:
+            continue
+        if result['queries'] > base['queries']:
+            regressions.append(f"{name}: {base['queries']} -> {result['queries']} queries per request")
+        limit = base['p95_ms'] * (1 + threshold)
+        if result['p95_ms'] > limit and result['p95_ms'] - base['p95_ms'] >= min_delta_ms:
+            regressions.append(f"{name}: p95 {base['p95_ms']:.1f}ms -> {result['p95_ms']:.1f}ms")
+    return regressions
@@ -0,0 +1,203 @@
+# cache.py
+#
+# Caching for search_job: the location facet list and the job ids of each
+# (filters, cursor) page. Every key embeds a version number that is bumped
+# whenever a Job changes, so invalidation is a single increment and stale
+# entries simply age out. The backend is the "search" alias in CACHES.
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from .fragments import job_cards
+from .models import Job
+from .pagination import CursorPage
+
+VERSION_KEY = 'jobs:version'
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[getattr(settings, 'SEARCH_CACHE_ALIAS', 'search')]
+
+
+def get_timeout():
+    return getattr(settings, 'SEARCH_CACHE_TIMEOUT', 60)
+
+
+def record(event):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def cache_stats():
+    with _stats_lock:
+        hits, misses = _stats['hit'], _stats['miss']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+        'invalidations': _stats['invalidation'],
+    }
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def initial_version():
+    # If the version key is ever evicted, restart from the clock so the new
+    # version can't collide with keys written under an older one
+    return time.time_ns() // 1000
+
+
+def jobs_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, initial_version(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+async def ajobs_version():
+    cache = get_cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, initial_version(), timeout=None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def _bump_jobs_version():
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, initial_version(), timeout=None)
+    record('invalidation')
+
+
+def invalidate_jobs():
+    # Bump now so this request sees its own change, and again on commit so a
+    # reader that cached the pre-commit state under the new version is dropped
+    _bump_jobs_version()
+    transaction.on_commit(_bump_jobs_version)
+
+
+def get_cached(key, build):
+    cache = get_cache()
+    value = cache.get(key)
+    if value is not None:
+        record('hit')
+        return value, True
+    record('miss')
+    value = build()
+    cache.set(key, value, get_timeout())
+    return value, False
+
+
+async def aget_cached(key, abuild):
+    cache = get_cache()
+    value = await cache.aget(key)
+    if value is not None:
+        record('hit')
+        return value, True
+    record('miss')
+    value = await abuild()
+    await cache.aset(key, value, get_timeout())
+    return value, False
+
+
+def open_locations():
+    return (
+        Job.objects.filter(is_active=True, last_date_to_apply__gt=timezone.now())
+        .order_by('location').values_list('location', flat=True).distinct()
+    )
+
+
+def get_location_facets():
+    key = f'jobs:{jobs_version()}:locations'
+    return get_cached(key, lambda: list(open_locations()))[0]
+
+
+async def aget_location_facets():
+    key = f'jobs:{await ajobs_version()}:locations'
+
+    async def build():
+        return [location async for location in open_locations()]
+
+    return (await aget_cached(key, build))[0]
+
+
+def page_key(version, filters, cursor):
+    digest = hashlib.sha1(json.dumps([filters, cursor], sort_keys=True).encode()).hexdigest()
+    return f'jobs:{version}:page:{digest}'
+
+
+def page_entry(page):
+    # Only the ids and cursors of a page are cached
+    return {
+        'ids': [job.pk for job in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
+
+
+def cached_jobs(cached):
+    # Postings can pass their deadline while cached, so keep the open filter
+    return job_cards(Job.objects.filter(
+        pk__in=cached['ids'], is_active=True, last_date_to_apply__gt=timezone.now()
+    ).select_related('recruiter'))
+
+
+def cached_page(cached, jobs):
+    return CursorPage(
+        [jobs[pk] for pk in cached['ids'] if pk in jobs],
+        next_cursor=cached['next'],
+        previous_cursor=cached['previous'],
+    )
+
+
+def get_job_page(filters, cursor, build_page):
+    """
+    Return the search_job page for ``filters`` and ``cursor``. On a miss
+    ``build_page()`` runs the real query and only the ids and cursors are
+    cached; on a hit the jobs are re-read by primary key.
+    """
+    page = None
+
+    def build():
+        nonlocal page
+        page = build_page()
+        return page_entry(page)
+
+    cached, hit = get_cached(page_key(jobs_version(), filters, cursor), build)
+    if not hit:
+        return page
+    return cached_page(cached, cached_jobs(cached).in_bulk())
+
+
+async def aget_job_page(filters, cursor, abuild_page):
+    """get_job_page() for async views; ``abuild_page`` is a coroutine function."""
+    page = None
+
+    async def build():
+        nonlocal page
+        page = await abuild_page()
+        return page_entry(page)
+
+    cached, hit = await aget_cached(page_key(await ajobs_version(), filters, cursor), build)
+    if not hit:
+        return page
+    return cached_page(cached, await cached_jobs(cached).ain_bulk())
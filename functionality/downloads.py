@@ -0,0 +1,186 @@
+# downloads.py
+#
+# Serving stored files with conditional GET (ETag / Last-Modified), single
+# byte-range requests, and an optional hand-off to the front-end web server
+# (X-Sendfile for Apache/lighttpd, X-Accel-Redirect for nginx) so the Python
+# worker doesn't stream the bytes itself. Also builds ZIP archives on the fly.
+import logging
+import mimetypes
+import re
+import time
+import zipfile
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+logger = logging.getLogger(__name__)
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFileWrapper:
+    """Iterate over ``length`` bytes of ``fileobj`` starting at ``offset``."""
+
+    def __init__(self, fileobj, offset, length, block_size=8192):
+        self.fileobj = fileobj
+        self.fileobj.seek(offset)
+        self.remaining = length
+        self.block_size = block_size
+
+    def __iter__(self):
+        while self.remaining > 0:
+            data = self.fileobj.read(min(self.block_size, self.remaining))
+            if not data:
+                break
+            self.remaining -= len(data)
+            yield data
+
+    def close(self):
+        self.fileobj.close()
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable range, None to ignore it, or 'invalid'."""
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        # Absent, or multiple ranges: fall back to the whole file
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return 'invalid'
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return 'invalid'
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return 'invalid'
+    return start, min(end, size - 1)
+
+
+def not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since'))
+    return since is not None and int(last_modified) <= since
+
+
+def serve_file(request, fieldfile, filename, etag_value=None):
+    storage = fieldfile.storage
+    size = fieldfile.size
+    last_modified = storage.get_modified_time(fieldfile.name).timestamp()
+    etag = quote_etag(etag_value or f'{int(last_modified)}-{size}')
+
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'private, max-age=3600',
+    }
+
+    if not_modified(request, etag, last_modified):
+        response = HttpResponseNotModified()
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    sendfile = getattr(settings, 'CV_SENDFILE_BACKEND', None)
+    if sendfile:
+        # The front-end server reads the file and handles Range itself
+        response = HttpResponse(content_type='application/octet-stream')
+        if sendfile == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.CV_SENDFILE_PREFIX.rstrip('/') + '/' + fieldfile.name
+        else:
+            response['X-Sendfile'] = storage.path(fieldfile.name)
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    byte_range = parse_range(request.headers.get('Range'), size)
+    # A Range sent with If-Range only applies while the validator still matches
+    if_range = request.headers.get('If-Range')
+    if byte_range and if_range and if_range != etag and parse_http_date_safe(if_range) != int(last_modified):
+        byte_range = None
+
+    if byte_range == 'invalid':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    fileobj = fieldfile.open('rb')
+    if byte_range is None:
+        response = FileResponse(fileobj, as_attachment=True, filename=filename)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            RangeFileWrapper(fileobj, start, end - start + 1),
+            status=206,
+            content_type=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        )
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    for key, value in headers.items():
+        response[key] = value
+    return response
+
+
+class ZipStream:
+    # Write-only sink for zipfile. It has tell() but no seek(), so zipfile
+    # writes sizes into data descriptors after each member instead of seeking
+    # back, and everything written can be handed on and forgotten.
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offset = 0
+
+    def write(self, data):
+        self.buffer += data
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def stream_zip(storage, members, chunk_size=64 * 1024):
+    """
+    Yield a ZIP archive of ``members``, an iterable of (arcname, stored name)
+    in ``storage``, one chunk at a time. Only one chunk of one file is held in
+    memory; files that can't be read are left out.
+    """
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, mode='w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for arcname, name in members:
+            try:
+                source = storage.open(name, 'rb')
+                size = storage.size(name)
+            except OSError:
+                logger.warning("Skipping unreadable file %s", name)
+                continue
+            with source:
+                info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.file_size = size
+                with archive.open(info, mode='w') as dest:
+                    for chunk in source.chunks(chunk_size):
+                        dest.write(chunk)
+                        if stream.buffer:
+                            yield stream.pop()
+            if stream.buffer:
+                yield stream.pop()
+    # Central directory
+    yield stream.pop()
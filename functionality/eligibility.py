@@ -0,0 +1,115 @@
+# eligibility.py
+#
+# Matching students against the structured part of a job's criteria: a
+# minimum CGPA, a graduation year range and required skills. A match is one
+# set-based SELECT over students x jobs, so the database compares a whole
+# batch of pairs at once instead of Python checking them one by one. The
+# pairs for open jobs are stored in the Eligibility table, which backs the
+# "eligible only" search filter, and are refreshed when a job or a student
+# profile changes (see signals.py). reject_ineligible() is the recruiters'
+# one-step screening of a job's applicants.
+from django.db import connection, transaction
+
+from authentication.models import Student
+from .models import Application, Eligibility, Job
+from .pipeline import transition_applications
+
+# Jobs or students per INSERT ... SELECT
+BATCH_SIZE = 200
+
+
+def match_sql(where):
+    """SELECT of the (student_id, job_id) pairs that meet the job's criteria, narrowed by ``where``."""
+    job_skills = Job.required_skills.through._meta.db_table
+    student_skills = Student.skills.through._meta.db_table
+    # A missing CGPA or graduation year fails any requirement on it
+    return (
+        f"SELECT s.user_id, j.id FROM {Student._meta.db_table} s, {Job._meta.db_table} j "
+        f"WHERE {where} "
+        "AND (j.min_cgpa IS NULL OR s.cgpa >= j.min_cgpa) "
+        "AND (j.min_graduation_year IS NULL OR s.graduation_year >= j.min_graduation_year) "
+        "AND (j.max_graduation_year IS NULL OR s.graduation_year <= j.max_graduation_year) "
+        f"AND NOT EXISTS (SELECT 1 FROM {job_skills} r WHERE r.job_id = j.id AND NOT EXISTS ("
+        f"SELECT 1 FROM {student_skills} k WHERE k.student_id = s.user_id AND k.skill_id = r.skill_id))"
+    )
+
+
+def placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def store_matches(where, params):
+    sql = f"INSERT INTO {Eligibility._meta.db_table} (student_id, job_id) " + match_sql(where)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def refresh_jobs(job_ids):
+    """Recompute the stored pairs of ``job_ids``; inactive jobs are only cleared."""
+    job_ids = list(job_ids)
+    for start in range(0, len(job_ids), BATCH_SIZE):
+        batch = job_ids[start:start + BATCH_SIZE]
+        with transaction.atomic():
+            Eligibility.objects.filter(job_id__in=batch).delete()
+            store_matches(f"j.id IN ({placeholders(batch)}) AND j.is_active = %s", [*batch, True])
+
+
+def refresh_students(student_ids):
+    """Recompute the stored pairs of ``student_ids`` against every open job."""
+    student_ids = list(student_ids)
+    for start in range(0, len(student_ids), BATCH_SIZE):
+        batch = student_ids[start:start + BATCH_SIZE]
+        with transaction.atomic():
+            Eligibility.objects.filter(student_id__in=batch).delete()
+            store_matches(f"j.is_active = %s AND s.user_id IN ({placeholders(batch)})", [True, *batch])
+
+
+def rebuild_eligibility():
+    """Recompute every stored pair; returns how many there are."""
+    Eligibility.objects.filter(job__is_active=False).delete()
+    refresh_jobs(Job.objects.filter(is_active=True).order_by('id').values_list('id', flat=True))
+    return Eligibility.objects.count()
+
+
+def queue_refresh(job_ids=(), student_ids=()):
+    """Refresh the pairs of some jobs or students once the current transaction commits."""
+    job_ids, student_ids = list(job_ids), list(student_ids)
+    if job_ids:
+        transaction.on_commit(lambda: refresh_jobs(job_ids))
+    if student_ids:
+        transaction.on_commit(lambda: refresh_students(student_ids))
+
+
+def eligible_applicants(job, student_ids=None):
+    """
+    Ids of the students who applied to ``job`` (or of ``student_ids``) and
+    meet its criteria. Computed directly, so closed jobs work too.
+    """
+    if student_ids is None:
+        where = f"j.id = %s AND s.user_id IN (SELECT student_id FROM {Application._meta.db_table} WHERE job_id = %s)"
+        params = [job.pk, job.pk]
+    else:
+        student_ids = list(student_ids)
+        if not student_ids:
+            return set()
+        where = f"j.id = %s AND s.user_id IN ({placeholders(student_ids)})"
+        params = [job.pk, *student_ids]
+    with connection.cursor() as cursor:
+        cursor.execute(match_sql(where), params)
+        return {student_id for student_id, _ in cursor.fetchall()}
+
+
+def reject_ineligible(job):
+    """
+    Reject the applicants of ``job`` still waiting for screening (pending or
+    under review) who don't meet its criteria. Returns how many were rejected.
+    """
+    with transaction.atomic():
+        eligible = eligible_applicants(job)
+        rows = [
+            row for row in Application.objects.select_for_update()
+            .filter(job=job, status__in=[Application.PENDING, Application.UNDER_REVIEW])
+            .values_list('id', 'job_id', 'status', 'student_id')
+            if row[3] not in eligible
+        ]
+        return len(transition_applications([row[:3] for row in rows], Application.REJECTED))
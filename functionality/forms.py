@@ -1,5 +1,6 @@
 from django import forms
 from django.utils import timezone
+from authentication.forms import SkillsField, SkillsFormMixin
 from authentication.models import CustomUser,Student,Recruiter
 from .models import Job, Application
 
@@ -25,11 +26,18 @@ class CVUploadForm(forms.ModelForm):
             raise forms.ValidationError("Please upload your CV.")
         return cv
     
-class JobCreationForm(forms.ModelForm):
+class JobCreationForm(SkillsFormMixin, forms.ModelForm):
+    skills_field = 'required_skills'
+    required_skills = SkillsField(
+        required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'e.g. python, sql'}),
+    )
+
     class Meta:
         model = Job
         fields = ['title', 'position', 'location', 'description', 'criteria', 
-                  'selection_type', 'last_date_to_apply', 'salary_range', 'is_active']
+                  'selection_type', 'last_date_to_apply', 'salary_range', 'is_active',
+                  'min_cgpa', 'min_graduation_year', 'max_graduation_year']
         widgets = {
             'title': forms.TextInput(attrs={'class': 'form-control'}),
             'position': forms.TextInput(attrs={'class': 'form-control'}),
@@ -44,6 +52,9 @@ class JobCreationForm(forms.ModelForm):
             }, format='%Y-%m-%dT%H:%M'),
             'salary_range': forms.TextInput(attrs={'class': 'form-control'}),
             'is_active': forms.CheckboxInput(attrs={'class': 'form-check-input', 'role': 'switch'}),
+            'min_cgpa': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0', 'max': '10'}),
+            'min_graduation_year': forms.NumberInput(attrs={'class': 'form-control'}),
+            'max_graduation_year': forms.NumberInput(attrs={'class': 'form-control'}),
         }
 
     def __init__(self, *args, **kwargs):
@@ -60,14 +71,20 @@ class JobCreationForm(forms.ModelForm):
             raise forms.ValidationError("Last date to apply cannot be in the past.")
         return last_date
 
+    def clean(self):
+        cleaned_data = super().clean()
+        first, last = cleaned_data.get('min_graduation_year'), cleaned_data.get('max_graduation_year')
+        if first and last and first > last:
+            self.add_error('max_graduation_year', "The graduation year range ends before it starts.")
+        return cleaned_data
+
 class JobApplicationForm(forms.ModelForm):
+    # Left blank, the application goes to the end of the student's list
+    preference_order = forms.IntegerField(
+        required=False, min_value=1,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'min': '1'}),
+    )
+
     class Meta:
         model = Application
-        fields = ['preference_order']
-        widgets = {
-            'preference_order': forms.NumberInput(attrs={
-                'class': 'form-control',
-                'min': '1',
-                'max': '10'
-            }),
-        }
\ No newline at end of file
+        fields = ['preference_order']
\ No newline at end of file
@@ -0,0 +1,32 @@
+# fragments.py
+#
+# Fragment caching for the repeated parts of the listing templates: the job
+# cards of search_job and the application rows of all_applications and the
+# recruiter dashboard. Each fragment is cached with Django's {% cache %} tag
+# in the "fragments" cache, keyed on the object's id and its updated_at, so an
+# edit simply moves on to a new key. Related data without a version of its
+# own (a company or student name) can lag by up to FRAGMENT_CACHE_TIMEOUT.
+# The querysets below leave out the long text columns the fragments don't
+# show, so neither a hit nor a miss loads them.
+from django.conf import settings
+from django.db.models.functions import Substr
+
+# Enough characters for the 30-word description preview on a job card
+PREVIEW_CHARS = 600
+
+
+def job_cards(queryset):
+    """``queryset`` of jobs with what a job card needs: a description preview instead of the full text."""
+    return queryset.defer('description', 'criteria').annotate(
+        description_preview=Substr('description', 1, PREVIEW_CHARS),
+    )
+
+
+def application_rows(queryset):
+    """``queryset`` of applications with the student and job a row shows, without the job's long text."""
+    return queryset.select_related('job', 'student__user').defer('job__description', 'job__criteria')
+
+
+def fragment_cache(request):
+    # Context processor: the timeout the templates pass to {% cache %}
+    return {'FRAGMENT_CACHE_TIMEOUT': settings.FRAGMENT_CACHE_TIMEOUT}
@@ -0,0 +1,73 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import CustomUser, Student, Recruiter
+from functionality.models import Job, Application
+from functionality.pipeline import run_fast_track
+from functionality.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Advance eligible fast-track applications through the automatic stages and report throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Applications per UPDATE (default 500)")
+        parser.add_argument(
+            '--seed', type=int, default=0, metavar='N',
+            help="Benchmark on N freshly seeded fast-track applications instead (rolled back afterwards)",
+        )
+
+    def handle(self, *args, **options):
+        if not options['seed']:
+            self.report(*self.timed_run(options['batch_size']))
+            return
+
+        with transaction.atomic():
+            self.seed(options['seed'])
+            self.report(*self.timed_run(options['batch_size']))
+            transaction.set_rollback(True)
+
+    def timed_run(self, batch_size):
+        start = time.perf_counter()
+        transitions = run_fast_track(batch_size=batch_size)
+        return transitions, time.perf_counter() - start
+
+    def report(self, transitions, elapsed):
+        rate = transitions / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"{transitions} transitions in {elapsed:.2f}s ({rate:.0f} transitions/s)"
+        ))
+
+    def seed(self, count):
+        # Bulk inserts keep seeding out of the measurement's way; the
+        # counters are rebuilt once at the end
+        user = CustomUser.objects.create_user(username='fast-track-recruiter', email='fast-track@example.com', role=CustomUser.RECRUITER)
+        recruiter = Recruiter.objects.create(user=user, company_name='Fast Track Corp')
+        jobs = [
+            Job.objects.create(
+                recruiter=recruiter, title=f'Fast track job {i}', position='Intern', description='-', criteria='-',
+                location='Remote', selection_type=Job.FAST_TRACK, last_date_to_apply=timezone.now() + timedelta(days=7),
+            )
+            for i in range(10)
+        ]
+        users = CustomUser.objects.bulk_create(
+            [
+                CustomUser(username=f'fast-track-{i}', email=f'fast-track-{i}@example.com', role=CustomUser.STUDENT, password='!')
+                for i in range(count)
+            ],
+            batch_size=500,
+        )
+        students = Student.objects.bulk_create(
+            # Every fifth student's CV isn't approved yet, so they stay put
+            [Student(user=user, cv='cv_files/seed.pdf', cv_approved_status=i % 5 != 0) for i, user in enumerate(users)],
+            batch_size=500,
+        )
+        Application.objects.bulk_create(
+            [Application(student=student, job=jobs[i % len(jobs)], preference_order=1) for i, student in enumerate(students)],
+            batch_size=500,
+        )
+        rebuild_stats()
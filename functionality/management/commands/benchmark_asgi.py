@@ -0,0 +1,226 @@
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from authentication.models import CustomUser, Student, Recruiter
+from functionality.benchmark import percentile
+from functionality.models import Job, Application
+
+# name: (python module to run, application, ASYNC_VIEWS)
+SERVERS = {
+    'wsgi': ('gunicorn', 'InternSync.wsgi:application', '0'),
+    'asgi': ('uvicorn', 'InternSync.asgi:application', '1'),
+    # ASGI serving the sync views, each in a thread: the cost the async views avoid
+    'asgi-sync': ('uvicorn', 'InternSync.asgi:application', '0'),
+}
+
+# url name: the session that requests it
+ENDPOINTS = {
+    'search_job': 'student',
+    'student_dashboard': 'student',
+    'all_applications': 'recruiter',
+    'recruiter_dashboard': 'recruiter',
+}
+
+
+def host_header():
+    # A host the project accepts: the requests go to 127.0.0.1 either way
+    allowed = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+    if allowed == '*':
+        return 'localhost'
+    return 'bench' + allowed if allowed.startswith('.') else allowed
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests per second and p99 latency of the listing views under gunicorn (WSGI) "
+        "and uvicorn (ASGI), served from a scratch database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help="Requests per endpoint (default 1000)")
+        parser.add_argument('--concurrency', type=int, default=32, help="Requests in flight (default 32)")
+        parser.add_argument('--workers', type=int, default=2, help="Server worker processes (default 2)")
+        parser.add_argument('--threads', type=int, default=8, help="Threads per gunicorn worker (default 8)")
+        parser.add_argument(
+            '--servers', nargs='+', choices=sorted(SERVERS), default=['wsgi', 'asgi', 'asgi-sync'],
+            help="Servers to compare",
+        )
+        # Set on the child process that seeds the scratch database
+        parser.add_argument('--seed', action='store_true', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.stdout.write(json.dumps(self.seed()))
+            return
+
+        manage = [sys.executable, str(settings.BASE_DIR / 'manage.py')]
+        with tempfile.TemporaryDirectory() as scratch:
+            env = dict(
+                os.environ,
+                SQLITE_PROFILE='production',
+                SQLITE_PATH=os.path.join(scratch, 'bench.sqlite3'),
+                SESSION_MODE='db',
+            )
+            subprocess.run(manage + ['migrate', '--verbosity', '0'], env=env, check=True)
+            output = subprocess.run(
+                manage + ['benchmark_asgi', '--seed'], env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            cookies = json.loads(output.strip().splitlines()[-1])
+
+            self.stdout.write(f"{'server':<11}{'endpoint':<21}{'req/s':>8}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+            skipped = []
+            for name in options['servers']:
+                module = SERVERS[name][0]
+                if importlib.util.find_spec(module) is None:
+                    self.stderr.write(self.style.ERROR(f"{name:<11}SKIPPED: {module} is not installed"))
+                    skipped.append(name)
+                    continue
+                with self.server(name, env, options) as address:
+                    for endpoint, role in ENDPOINTS.items():
+                        result = asyncio.run(self.load(address, reverse(endpoint), cookies[role], options))
+                        self.stdout.write(
+                            f"{name:<11}{endpoint:<21}{result['rps']:>8.0f}{result['p50_ms']:>9.1f}"
+                            f"{result['p99_ms']:>9.1f}{result['errors']:>8}"
+                        )
+        # A comparison with a server missing is no comparison
+        if skipped:
+            raise CommandError(
+                f"Skipped {', '.join(skipped)}: install the servers with pip install -r requirements.txt"
+            )
+
+    def seed(self):
+        recruiter = Recruiter.objects.create(
+            user=CustomUser.objects.create_user(username='bench-recruiter', email='bench-recruiter@example.com', role=CustomUser.RECRUITER),
+            company_name='Bench Corp',
+        )
+        jobs = [
+            Job.objects.create(
+                recruiter=recruiter, title=f'Bench job {i}', position='Intern', description='Benchmark posting',
+                criteria='-', location=f'City {i % 5}', last_date_to_apply=timezone.now() + timedelta(days=7),
+            )
+            for i in range(50)
+        ]
+        students = []
+        for i in range(40):
+            user = CustomUser.objects.create_user(username=f'bench-{i}', email=f'bench-{i}@example.com', role=CustomUser.STUDENT)
+            students.append(Student.objects.create(user=user))
+        for i, student in enumerate(students):
+            for job in jobs[i % 10::10]:
+                Application.objects.create(student=student, job=job)
+
+        # Sessions live in the database, so every server worker can read them
+        cookies = {}
+        for role, user in (('student', students[0].user), ('recruiter', recruiter.user)):
+            client = Client()
+            client.force_login(user)
+            cookies[role] = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+        return cookies
+
+    def server(self, name, env, options):
+        module, app, async_views = SERVERS[name]
+        port = free_port()
+        if module == 'gunicorn':
+            args = [app, '--workers', str(options['workers']), '--threads', str(options['threads']), '--bind', f'127.0.0.1:{port}']
+        else:
+            args = [app, '--workers', str(options['workers']), '--host', '127.0.0.1', '--port', str(port), '--no-access-log']
+        process = subprocess.Popen(
+            [sys.executable, '-m', module, *args],
+            cwd=settings.BASE_DIR, env=dict(env, ASYNC_VIEWS=async_views),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        return RunningServer(process, port)
+
+    async def load(self, address, path, cookie, options):
+        host, port = address
+        request = (
+            f"GET {path} HTTP/1.1\r\nHost: {host_header()}\r\nCookie: {cookie}\r\nConnection: close\r\n\r\n"
+        ).encode()
+        latencies, errors = [], 0
+
+        async def fetch():
+            # One request per connection, read to the end
+            start = time.perf_counter()
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            response = await reader.read()
+            writer.close()
+            return response.split(b' ', 2)[1] == b'200', time.perf_counter() - start
+
+        async def worker(count):
+            nonlocal errors
+            for _ in range(count):
+                try:
+                    ok, elapsed = await fetch()
+                except (OSError, IndexError):
+                    ok, elapsed = False, 0.0
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+        concurrency = options['concurrency']
+        # Warm up every worker process before measuring
+        await asyncio.gather(*(worker(1) for _ in range(concurrency)))
+        latencies.clear()
+        errors = 0
+
+        per_worker, extra = divmod(options['requests'], concurrency)
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(per_worker + (i < extra)) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        return {
+            'rps': len(latencies) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'errors': errors,
+        }
+
+
+class RunningServer:
+    # Context manager that waits for the server to accept connections and stops it afterwards
+    def __init__(self, process, port, timeout=30):
+        self.process = process
+        self.address = ('127.0.0.1', port)
+        self.timeout = timeout
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f"The server exited with status {self.process.returncode}")
+            try:
+                socket.create_connection(self.address, timeout=1).close()
+                return self.address
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise CommandError("The server did not start listening in time")
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
@@ -0,0 +1,88 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from authentication.models import Student, Recruiter
+from functionality.benchmark import SCENARIOS, BenchmarkError, compare, missing_scenarios, run_benchmark
+from functionality.models import Application, Job
+
+
+class Command(BaseCommand):
+    help = (
+        "Latency percentiles and queries per request of every URL, checked against a saved "
+        "JSON baseline. Run it against a database filled by generate_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=30, help="Measured requests per URL (default 30)")
+        parser.add_argument('--warmup', type=int, default=2, help="Unmeasured requests per URL first (default 2)")
+        parser.add_argument(
+            '--baseline', default=str(settings.BASE_DIR / 'benchmarks' / 'baseline.json'),
+            help="Baseline file (default benchmarks/baseline.json)",
+        )
+        parser.add_argument('--save', action='store_true', help="Write this run as the new baseline")
+        parser.add_argument(
+            '--threshold', type=float, default=0.25,
+            help="Fraction a p95 may grow by before it counts as a regression (default 0.25)",
+        )
+        parser.add_argument(
+            '--min-delta-ms', type=float, default=2.0,
+            help="Smallest p95 increase in milliseconds that counts, so jitter on fast URLs doesn't (default 2)",
+        )
+        parser.add_argument('--only', nargs='+', choices=sorted(SCENARIOS), help="URL names to run (default: all)")
+
+    def handle(self, *args, **options):
+        missing = missing_scenarios()
+        if missing:
+            raise CommandError(f"No benchmark scenario for: {', '.join(missing)}")
+
+        try:
+            results = run_benchmark(options['requests'], options['warmup'], options['only'])
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{'url':<32}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'tmpl ms':>9}{'queries':>9}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name or 'landing':<32}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+                f"{result['p99_ms']:>9.1f}{result['template_p50_ms']:>9.1f}{result['queries']:>9}"
+            )
+
+        path = Path(options['baseline'])
+        volumes = self.volumes()
+        if options['save']:
+            baseline = {'created': timezone.now().isoformat(), 'requests': options['requests'], 'volumes': volumes, 'endpoints': results}
+            if path.exists():
+                # A partial run only replaces the URLs it measured
+                baseline['endpoints'] = dict(json.loads(path.read_text())['endpoints'], **results)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Saved the baseline to {path}"))
+            return
+
+        if not path.exists():
+            self.stdout.write(self.style.WARNING(f"No baseline at {path}; run with --save to record one"))
+            return
+        baseline = json.loads(path.read_text())
+        if baseline.get('volumes') != volumes:
+            self.stdout.write(self.style.WARNING(
+                f"The baseline was recorded with {baseline.get('volumes')} rows, this database has {volumes}"
+            ))
+        regressions = compare(results, baseline, options['threshold'], options['min_delta_ms'])
+        for message in regressions:
+            self.stdout.write(self.style.ERROR(message))
+        if regressions:
+            raise CommandError(f"{len(regressions)} regressions against {path}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {path}"))
+
+    def volumes(self):
+        # Latencies are only comparable on databases of about the same size
+        return {
+            'students': Student.objects.count(),
+            'recruiters': Recruiter.objects.count(),
+            'jobs': Job.objects.count(),
+            'applications': Application.objects.count(),
+        }
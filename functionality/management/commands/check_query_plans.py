@@ -0,0 +1,134 @@
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import CustomUser, Student, Recruiter
+from functionality.models import Job, Application, Eligibility
+from functionality.scheduler import archivable_jobs, expired_jobs
+from functionality.search import get_search_backend
+
+# A plan line that walks a whole table or index instead of searching it:
+# any SQLite "SCAN <table>", with or without "USING (COVERING) INDEX" (only
+# SEARCH narrows the rows), or Postgres "Seq Scan on <table>"
+FULL_SCAN_PATTERNS = [
+    re.compile(r'\bSCAN (?P<table>\w+)'),
+    re.compile(r'\bSeq Scan on (?P<table>\w+)'),
+]
+
+# Tables a query may scan on purpose: {query name: {table}}
+ALLOWED_SCANS = {
+    # The first page walks the open-jobs partial index in keyset order and
+    # stops after a page
+    'search_job': {'functionality_job'},
+    # DISTINCT walks job_open_location_idx, which only holds open jobs
+    'search_job locations': {'functionality_job'},
+    # A MATCH on the FTS5 table shows up as a scan of the virtual table
+    'search_job text': {'functionality_job_fts'},
+}
+
+
+def full_scans(plan, allowed=()):
+    """Tables ``plan`` scans, other than the ``allowed`` ones."""
+    tables = []
+    for line in plan.splitlines():
+        for pattern in FULL_SCAN_PATTERNS:
+            match = pattern.search(line)
+            if match and match.group('table') not in allowed:
+                tables.append(match.group('table'))
+    return tables
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the canonical queries of the job and application views and fail on table or index scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', action='store_true',
+            help="Insert a small dataset first (rolled back afterwards)",
+        )
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help="Print every query plan, not only the failing ones",
+        )
+
+    def handle(self, *args, **options):
+        failures = []
+        with transaction.atomic():
+            if options['seed']:
+                self.seed()
+            for name, queryset in self.canonical_queries():
+                plan = queryset.explain()
+                scans = full_scans(plan, ALLOWED_SCANS.get(name, ()))
+                if scans:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f"{name}: full scan of {', '.join(scans)}"))
+                    self.stdout.write(plan)
+                else:
+                    self.stdout.write(f"{name}: ok")
+                    if options['verbose_plans']:
+                        self.stdout.write(plan)
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"{len(failures)} queries scan a table or index instead of searching it")
+        self.stdout.write(self.style.SUCCESS("All canonical queries search an index"))
+
+    def seed(self):
+        now = timezone.now()
+        user = CustomUser.objects.create_user(username='plan-recruiter', email='plan-recruiter@example.com', role=CustomUser.RECRUITER)
+        recruiter = Recruiter.objects.create(user=user, company_name='Plan Corp')
+        user = CustomUser.objects.create_user(username='plan-student', email='plan-student@example.com', role=CustomUser.STUDENT)
+        student = Student.objects.create(user=user)
+        for i in range(20):
+            job = Job.objects.create(
+                recruiter=recruiter, title=f'Plan job {i}', position='Intern', description='Plan',
+                criteria='-', location=f'City {i % 4}', last_date_to_apply=now + timedelta(days=i - 5),
+                is_active=i % 5 != 0,
+            )
+            if i < 10:
+                Application.objects.create(student=student, job=job)
+
+    def canonical_queries(self):
+        # These mirror the querysets built by the views, with typical filter values
+        now = timezone.now()
+        recruiter = Recruiter.objects.first()
+        student = Student.objects.first()
+        job = Job.objects.first()
+        if recruiter is None or student is None or job is None:
+            raise CommandError("The database has no recruiters, students or jobs; run with --seed")
+
+        open_jobs = Job.objects.filter(is_active=True, last_date_to_apply__gt=now).select_related('recruiter')
+        keyset = ('-posted_date', '-id')
+        applications = Application.objects.filter(job__recruiter=recruiter).select_related('job', 'student__user')
+
+        return [
+            ('search_job', open_jobs.order_by(*keyset)[:11]),
+            ('search_job location', open_jobs.filter(location='City 1').order_by(*keyset)[:11]),
+            ('search_job selection_type', open_jobs.filter(selection_type=Job.FAST_TRACK).order_by(*keyset)[:11]),
+            ('search_job text', get_search_backend().search(open_jobs, 'plan')[:11]),
+            ('search_job locations', open_jobs.order_by('location').values_list('location', flat=True).distinct()),
+            ('search_job eligible', open_jobs.filter(
+                id__in=Eligibility.objects.filter(student=student).values('job_id'),
+            ).order_by(*keyset)[:11]),
+            ('search_job applied ids', Application.objects.filter(student=student).values_list('job_id', flat=True)),
+            ('apply_job duplicate check', Application.objects.filter(student=student, job=job)),
+            ('all_applications', applications.order_by('-applied_date', '-id')[:21]),
+            ('all_applications status', applications.filter(status=Application.PENDING).order_by('-applied_date', '-id')[:21]),
+            ('all_applications job', applications.filter(job_id=job.pk).order_by('-applied_date', '-id')[:21]),
+            ('job_ranking', Application.objects.filter(job=job).select_related('student__user').order_by(
+                'preference_order', 'applied_date', 'id',
+            )[:26]),
+            ('reorder_application shift', Application.objects.filter(student=student, preference_order__range=(1, 5))),
+            ('recruiter_dashboard active jobs', Job.objects.filter(
+                recruiter=recruiter, is_active=True, last_date_to_apply__gt=now,
+            ).select_related('application_stats').order_by('-posted_date')),
+            ('recruiter_dashboard recent applications', applications.order_by('-applied_date')[:10]),
+            ('scheduler expired jobs', expired_jobs(now).values_list('id', flat=True)[:500]),
+            ('scheduler archivable applications', Application.objects.filter(
+                job__in=archivable_jobs(settings.ARCHIVE_AFTER_DAYS, now),
+            ).order_by('id')[:500]),
+        ]
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from authentication.models import Student
+from functionality.storage import get_cv_storage
+
+
+class Command(BaseCommand):
+    help = "Delete stored CV files that no student references any more"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only list what would be deleted")
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help="Skip files younger than this many seconds (uploads still being saved)",
+        )
+
+    def handle(self, *args, **options):
+        storage = get_cv_storage()
+        referenced = set(Student.objects.exclude(cv='').exclude(cv__isnull=True).values_list('cv', flat=True))
+        cutoff = time.time() - options['min_age']
+
+        deleted = kept = 0
+        for name in self.walk(storage, storage.prefix):
+            if name in referenced:
+                kept += 1
+                continue
+            if storage.get_modified_time(name).timestamp() > cutoff:
+                kept += 1
+                continue
+            if options['dry_run']:
+                self.stdout.write(f"Would delete {name}")
+            else:
+                storage.delete(name)
+            deleted += 1
+
+        verb = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {deleted} unreferenced CV files, kept {kept}"))
+
+    def walk(self, storage, path):
+        if not storage.exists(path):
+            return
+        directories, files = storage.listdir(path)
+        for name in files:
+            yield f'{path}/{name}'
+        for directory in directories:
+            yield from self.walk(storage, f'{path}/{directory}')
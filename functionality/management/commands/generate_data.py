@@ -0,0 +1,210 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import CustomUser, Skill, Student, Recruiter
+from functionality.cache import invalidate_jobs
+from functionality.eligibility import rebuild_eligibility
+from functionality.models import Application, Job
+from functionality.search import get_search_backend
+from functionality.stats import rebuild_stats
+from functionality.storage import file_sha256, get_cv_storage
+
+LOCATIONS = ['Bangalore', 'Chennai', 'Hyderabad', 'Mumbai', 'Pune', 'Delhi', 'Kolkata', 'Remote']
+POSITIONS = ['Software Intern', 'Data Analyst Intern', 'Backend Developer', 'Frontend Developer', 'ML Intern', 'QA Intern']
+SKILLS = [
+    'python', 'django', 'java', 'c++', 'javascript', 'react', 'sql', 'postgresql', 'docker', 'kubernetes',
+    'aws', 'linux', 'git', 'machine learning', 'pandas', 'statistics', 'go', 'rust', 'html', 'css',
+]
+WORDS = ['scalable', 'platform', 'payments', 'analytics', 'mobile', 'cloud', 'search', 'api', 'dashboard', 'pipeline']
+
+# Rough shape of a placement season: most applications are still early on
+STATUS_WEIGHTS = {
+    Application.PENDING: 50,
+    Application.UNDER_REVIEW: 20,
+    Application.SHORTLISTED_OA: 8,
+    Application.COMPLETED_OA: 6,
+    Application.SHORTLISTED_INTERVIEW: 5,
+    Application.SELECTED: 3,
+    Application.REJECTED: 8,
+}
+
+# Every synthetic account gets this password
+PASSWORD = 'synthetic-password'
+
+
+def dummy_pdf(number):
+    # Small, but passes the upload checks in uploads.py
+    body = f"Synthetic CV {number}\n".encode() * 20
+    return b'%PDF-1.4\n' + body + b'trailer\n<<>>\nstartxref\n0\n%%EOF\n'
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic recruiters, jobs, students and applications "
+        "for load testing, written with bulk_create"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=100000, help="Students to create (default 100000)")
+        parser.add_argument('--recruiters', type=int, default=500, help="Recruiters to create (default 500)")
+        parser.add_argument('--jobs', type=int, default=5000, help="Jobs to create (default 5000)")
+        parser.add_argument(
+            '--applications-per-student', type=int, default=5,
+            help="Most applications per student; each gets 0 to this many (default 5)",
+        )
+        parser.add_argument(
+            '--cv-files', type=int, default=50,
+            help="Distinct dummy CV files shared by the students; 0 leaves students without a CV (default 50)",
+        )
+        parser.add_argument('--batch-size', type=int, default=2000, help="Students per transaction (default 2000)")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, for repeatable data (default 0)")
+        parser.add_argument('--prefix', default='synthetic', help="Username prefix (default 'synthetic')")
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if CustomUser.objects.filter(username__startswith=f'{prefix}-').exists():
+            raise CommandError(f"Users named {prefix}-* already exist; pick another --prefix")
+        if options['jobs'] and not options['recruiters']:
+            raise CommandError("Jobs need at least one recruiter")
+
+        self.random = random.Random(options['seed'])
+        # Hashing is deliberately slow, so every account shares one hash
+        self.password = make_password(PASSWORD)
+        self.now = timezone.now()
+        start = time.perf_counter()
+
+        self.skills = sorted(Skill.for_names(SKILLS), key=lambda skill: skill.name)
+        with transaction.atomic():
+            recruiter_ids = self.create_recruiters(prefix, options['recruiters'])
+            job_ids = self.create_jobs(recruiter_ids, options['jobs'])
+        cvs = self.create_cv_files(options['cv_files'])
+
+        applications = 0
+        for first in range(0, options['students'], options['batch_size']):
+            count = min(options['batch_size'], options['students'] - first)
+            with transaction.atomic():
+                student_ids = self.create_students(prefix, first, count, cvs)
+                applications += self.create_applications(student_ids, job_ids, options['applications_per_student'])
+            self.stdout.write(f"  {first + count} students, {applications} applications")
+
+        # bulk_create skips the signals that keep these up to date
+        self.stdout.write("Rebuilding application stats, search index and eligibility...")
+        rebuild_stats()
+        get_search_backend().rebuild()
+        eligible = rebuild_eligibility()
+        invalidate_jobs()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {options['recruiters']} recruiters, {options['jobs']} jobs, {options['students']} students "
+            f"and {applications} applications ({eligible} eligible pairs) in {time.perf_counter() - start:.1f}s. "
+            f"Every {prefix}-* account has the password '{PASSWORD}'."
+        ))
+
+    def create_users(self, usernames, role):
+        users = CustomUser.objects.bulk_create([
+            CustomUser(username=name, email=f'{name}@example.com', password=self.password, role=role)
+            for name in usernames
+        ])
+        return [user.pk for user in users]
+
+    def create_recruiters(self, prefix, count):
+        user_ids = self.create_users([f'{prefix}-recruiter-{i}' for i in range(count)], CustomUser.RECRUITER)
+        Recruiter.objects.bulk_create([
+            Recruiter(user_id=user_id, company_name=f'Company {i}') for i, user_id in enumerate(user_ids)
+        ])
+        return user_ids
+
+    def create_jobs(self, recruiter_ids, count):
+        rng = self.random
+        jobs = []
+        for i in range(count):
+            # One in five postings has already closed
+            closed = rng.random() < 0.2
+            deadline = self.now + (timedelta(days=-rng.randint(1, 200)) if closed else timedelta(days=rng.randint(1, 60)))
+            min_year = rng.choice([None, 2025, 2026])
+            jobs.append(Job(
+                recruiter_id=rng.choice(recruiter_ids),
+                title=f'{rng.choice(POSITIONS)} {i}',
+                position=rng.choice(POSITIONS),
+                description=' '.join(rng.choices(WORDS, k=12)),
+                criteria='See the structured requirements',
+                selection_type=Job.FAST_TRACK if rng.random() < 0.1 else Job.NORMAL,
+                posted_date=deadline - timedelta(days=rng.randint(7, 60)),
+                last_date_to_apply=deadline,
+                is_active=not closed,
+                location=rng.choice(LOCATIONS),
+                salary_range=rng.choice([None, '10k-20k', '20k-40k', '40k-80k']),
+                min_cgpa=rng.choice([None, None, Decimal('6.00'), Decimal('7.00'), Decimal('8.00')]),
+                min_graduation_year=min_year,
+                max_graduation_year=min_year + 1 if min_year else None,
+            ))
+        job_ids = [job.pk for job in Job.objects.bulk_create(jobs, batch_size=1000)]
+        Job.required_skills.through.objects.bulk_create(
+            [
+                Job.required_skills.through(job_id=job_id, skill_id=skill.pk)
+                for job_id in job_ids
+                for skill in rng.sample(self.skills, rng.randint(0, 2))
+            ],
+            batch_size=1000,
+        )
+        return job_ids
+
+    def create_cv_files(self, count):
+        # Content-addressed, so running again reuses the same files
+        storage = get_cv_storage()
+        cvs = []
+        for number in range(count):
+            content = ContentFile(dummy_pdf(number), name=f'synthetic-{number}.pdf')
+            sha256 = file_sha256(content)
+            cvs.append((storage.save(content.name, content), sha256))
+        return cvs
+
+    def create_students(self, prefix, first, count, cvs):
+        rng = self.random
+        user_ids = self.create_users(
+            [f'{prefix}-student-{i}' for i in range(first, first + count)], CustomUser.STUDENT,
+        )
+        students = []
+        for user_id in user_ids:
+            cv, sha256 = rng.choice(cvs) if cvs and rng.random() < 0.9 else ('', '')
+            students.append(Student(
+                user_id=user_id,
+                cv=cv,
+                cv_sha256=sha256,
+                cv_status=Student.CV_VALID if cv else Student.CV_NONE,
+                cv_approved_status=bool(cv) and rng.random() < 0.7,
+                cgpa=Decimal(rng.randint(500, 1000)) / 100,
+                graduation_year=rng.choice([2024, 2025, 2026, 2027]),
+            ))
+        Student.objects.bulk_create(students)
+        Student.skills.through.objects.bulk_create(
+            [
+                Student.skills.through(student_id=user_id, skill_id=skill.pk)
+                for user_id in user_ids
+                for skill in rng.sample(self.skills, rng.randint(1, 5))
+            ],
+            batch_size=5000,
+        )
+        return user_ids
+
+    def create_applications(self, student_ids, job_ids, most):
+        rng = self.random
+        statuses, weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+        applications = []
+        for student_id in student_ids:
+            chosen = rng.sample(job_ids, min(len(job_ids), rng.randint(0, most)))
+            # Explicit ranks: the pre_save signal that numbers them doesn't run
+            applications.extend(
+                Application(student_id=student_id, job_id=job_id, preference_order=rank, status=rng.choices(statuses, weights)[0])
+                for rank, job_id in enumerate(chosen, 1)
+            )
+        Application.objects.bulk_create(applications, batch_size=5000)
+        return len(applications)
@@ -0,0 +1,114 @@
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from authentication.models import CustomUser, Student, Recruiter
+from functionality.models import Job, Application
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrent apply_job load test. Each SQLite profile gets a scratch database, "
+        "so the project database is never touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=16, help="Concurrent worker processes (default 16)")
+        parser.add_argument('--applications', type=int, default=400, help="Applications to submit (default 400)")
+        parser.add_argument(
+            '--profiles', nargs='+', choices=sorted(settings.SQLITE_PROFILES), default=['default', 'production'],
+            help="SQLite profiles to compare",
+        )
+        # Set on the child process that runs against the scratch database
+        parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['run']:
+            self.stdout.write(json.dumps(self.run(options['workers'], options['applications'])))
+            return
+
+        self.stdout.write(f"{'profile':<12}{'ok':>6}{'errors':>8}{'locked':>8}{'apps/s':>9}{'p95 ms':>9}")
+        for profile in options['profiles']:
+            result = self.run_profile(profile, options['workers'], options['applications'])
+            self.stdout.write(
+                f"{profile:<12}{result['ok']:>6}{result['errors']:>8}{result['locked']:>8}"
+                f"{result['throughput']:>9.1f}{result['p95_ms']:>9.1f}"
+            )
+
+    def run_profile(self, profile, workers, applications):
+        manage = [sys.executable, str(settings.BASE_DIR / 'manage.py')]
+        with tempfile.TemporaryDirectory() as scratch:
+            env = dict(os.environ, SQLITE_PROFILE=profile, SQLITE_PATH=os.path.join(scratch, 'load.sqlite3'))
+            subprocess.run(manage + ['migrate', '--verbosity', '0'], env=env, check=True)
+            output = subprocess.run(
+                manage + ['load_test_apply', '--run', f'--workers={workers}', f'--applications={applications}'],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def run(self, workers, applications):
+        recruiter = Recruiter.objects.create(
+            user=CustomUser.objects.create_user(username='load-recruiter', email='load-recruiter@example.com', role=CustomUser.RECRUITER),
+            company_name='Load Corp',
+        )
+        jobs = [
+            Job.objects.create(
+                recruiter=recruiter, title=f'Load job {i}', position='Intern', description='-', criteria='-',
+                location='Remote', last_date_to_apply=timezone.now() + timedelta(hours=1),
+            )
+            for i in range(4)
+        ]
+
+        # Log every student in up front so only the applications are timed
+        sessions = []
+        for i in range(applications):
+            user = CustomUser.objects.create_user(username=f'load-{i}', email=f'load-{i}@example.com', role=CustomUser.STUDENT)
+            Student.objects.create(user=user, cv='cv_files/load.pdf')
+            client = Client()
+            client.force_login(user)
+            sessions.append((client.cookies[settings.SESSION_COOKIE_NAME].value, jobs[i % len(jobs)].pk))
+
+        # One process per worker, like gunicorn; each opens its own connection
+        connection.close()
+        start = time.perf_counter()
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            results = pool.map(apply_as, sessions, chunksize=1)
+        elapsed = time.perf_counter() - start
+
+        ok = Application.objects.count()
+        latencies = sorted(latency for latency, _, _ in results)
+        return {
+            'ok': ok,
+            'errors': sum(1 for _, error, _ in results if error),
+            'locked': sum(1 for _, _, locked in results if locked),
+            'throughput': ok / elapsed,
+            'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        }
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], TASKS_ALWAYS_EAGER=True)
+def apply_as(session):
+    # A student in the deadline rush: load the job list, then apply
+    cookie, job_id = session
+    client = Client(raise_request_exception=False)
+    client.cookies[settings.SESSION_COOKIE_NAME] = cookie
+    start = time.perf_counter()
+    client.get(reverse('search_job'))
+    response = client.post(reverse('apply_job', args=[job_id]), {'preference_order': 1})
+    elapsed = time.perf_counter() - start
+    error = response.status_code >= 400
+    locked = error and response.exc_info is not None and 'locked' in str(response.exc_info[1])
+    return elapsed, error, locked
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from functionality.stats import find_drift, rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-job and per-recruiter application counters, reporting any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only verify the counters; exit with an error if any have drifted",
+        )
+
+    def handle(self, *args, **options):
+        drift = find_drift()
+        for kind, key in drift:
+            self.stdout.write(f"Drift in {kind} stats: {key}")
+
+        if options['check']:
+            if drift:
+                raise CommandError(f"{len(drift)} application stats rows have drifted")
+            self.stdout.write(self.style.SUCCESS("Application stats are consistent"))
+            return
+
+        jobs, recruiters = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt stats for {jobs} jobs and {recruiters} recruiters ({len(drift)} had drifted)"
+        ))
@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from functionality.eligibility import rebuild_eligibility
+
+
+class Command(BaseCommand):
+    help = "Recompute the student x open job eligibility index from the structured job criteria"
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = rebuild_eligibility()
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {count} eligible pairs in {time.perf_counter() - start:.2f}s"
+        ))
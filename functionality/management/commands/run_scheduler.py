@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from functionality.scheduler import run_pending
+
+
+class Command(BaseCommand):
+    help = "Close expired jobs, archive applications of long-closed jobs and run fast-track sweeps on a schedule"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run every task once and exit")
+        parser.add_argument('--tick', type=float, default=5, help="Seconds between checks for due tasks (default 5)")
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows per transaction (default 500)")
+
+    def handle(self, *args, **options):
+        next_runs = {}
+        while True:
+            # A long-lived process: drop connections that broke or aged out
+            close_old_connections()
+            start = time.perf_counter()
+            results = run_pending(next_runs, batch_size=options['batch_size'])
+            close_old_connections()
+            if results:
+                summary = ', '.join(
+                    f"{name}: {'failed' if result is None else result}" for name, result in results.items()
+                )
+                self.stdout.write(f"{summary} ({time.perf_counter() - start:.2f}s)")
+            if options['once']:
+                return
+            time.sleep(options['tick'])
@@ -0,0 +1,49 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database onto each read replica (SQLITE_REPLICAS)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help="Keep copying every N seconds instead of once",
+        )
+        parser.add_argument(
+            '--to', action='append', default=[], metavar='PATH',
+            help="Copy to this file as well (may be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError("sync_replicas only copies SQLite databases; use the database's own replication")
+        targets = [settings.DATABASES[alias]['NAME'] for alias in settings.DATABASE_REPLICAS] + options['to']
+        if not targets:
+            raise CommandError("No replicas configured; set SQLITE_REPLICAS or pass --to")
+
+        while True:
+            start = time.perf_counter()
+            for target in targets:
+                self.copy(primary, target)
+            self.stdout.write(f"Copied to {len(targets)} replicas in {time.perf_counter() - start:.2f}s")
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def copy(self, primary, target):
+        # The backup API copies a consistent snapshot page by page while writers carry on
+        if primary.in_atomic_block:
+            # The backup would wait forever on this connection's own write lock
+            raise CommandError("sync_replicas can't run inside a transaction")
+        primary.ensure_connection()
+        destination = sqlite3.connect(str(target), timeout=20)
+        try:
+            primary.connection.backup(destination, pages=1024)
+        finally:
+            destination.close()
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from authentication.models import Student
+from functionality.uploads import validate_cv
+
+
+class Command(BaseCommand):
+    help = "Run the CV content checks for every student whose CV is still pending"
+
+    def handle(self, *args, **options):
+        pending = Student.objects.filter(cv_status=Student.CV_PENDING).values_list('pk', 'cv_sha256')
+        results = {Student.CV_VALID: 0, Student.CV_INVALID: 0}
+        for student_id, sha256 in pending.iterator():
+            status = validate_cv(student_id, sha256)
+            if status:
+                results[status] += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"{results[Student.CV_VALID]} valid, {results[Student.CV_INVALID]} invalid"
+        ))
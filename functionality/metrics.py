@@ -0,0 +1,299 @@
+# metrics.py
+#
+# Per-view request instrumentation. MetricsMiddleware files every request
+# under its URL name: wall time, the number and total time of its database
+# queries (timed by a wrapper every connection gets when it opens, see
+# signals.py), the time spent rendering templates (TimedDjangoTemplates, the
+# backend in settings.TEMPLATES) and the response size. Streamed responses
+# are recorded when the server closes them, so the queries their body runs
+# are counted and the time includes sending it. They go into
+# in-process histograms that the admin-only metrics view serves in the
+# Prometheus text format. Each worker process keeps its own, so scrape every
+# worker. With SLOW_REQUEST_MS set, slower requests are logged together with
+# their slowest SQL statements.
+import contextvars
+import heapq
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import FileResponse
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+BYTES_BUCKETS = (1000, 5000, 10000, 50000, 100000, 500000, 1000000, 5000000)
+
+# Timings of the request being handled; None outside of requests
+_current = contextvars.ContextVar('request_timings', default=None)
+_lock = threading.Lock()
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # view: [count per bucket..., sum, count]
+        self.series = {}
+
+    def observe(self, view, value):
+        with _lock:
+            series = self.series.setdefault(view, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def total(self):
+        # Sum over every view
+        with _lock:
+            return sum(values[-2] for values in self.series.values())
+
+    def lines(self):
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} histogram'
+        with _lock:
+            series = {view: list(values) for view, values in self.series.items()}
+        for view, values in sorted(series.items()):
+            label = f'view="{escape(view)}"'
+            for bound, count in zip(self.buckets, values):
+                yield f'{self.name}_bucket{{{label},le="{bound}"}} {count}'
+            yield f'{self.name}_bucket{{{label},le="+Inf"}} {values[-1]}'
+            yield f'{self.name}_sum{{{label}}} {values[-2]}'
+            yield f'{self.name}_count{{{label}}} {values[-1]}'
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        # (view, status): count
+        self.series = {}
+
+    def inc(self, view, status):
+        with _lock:
+            self.series[view, status] = self.series.get((view, status), 0) + 1
+
+    def lines(self):
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} counter'
+        with _lock:
+            series = dict(self.series)
+        for (view, status), count in sorted(series.items()):
+            yield f'{self.name}{{view="{escape(view)}",status="{status}"}} {count}'
+
+
+REQUEST_SECONDS = Histogram('internsync_request_duration_seconds', 'Wall time until the response is returned, or for streamed responses until it is closed.', SECONDS_BUCKETS)
+QUERIES = Histogram('internsync_request_db_queries', 'Database queries per request.', QUERY_BUCKETS)
+QUERY_SECONDS = Histogram('internsync_request_db_duration_seconds', 'Time per request spent in database queries.', SECONDS_BUCKETS)
+TEMPLATE_SECONDS = Histogram('internsync_request_template_duration_seconds', 'Time per request spent rendering templates, including the queries they run.', SECONDS_BUCKETS)
+RESPONSE_BYTES = Histogram('internsync_response_size_bytes', 'Response body size.', BYTES_BUCKETS)
+RESPONSES = Counter('internsync_responses_total', 'Responses by URL name and status code.')
+
+METRICS = [REQUEST_SECONDS, QUERIES, QUERY_SECONDS, TEMPLATE_SECONDS, RESPONSE_BYTES, RESPONSES]
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_metrics():
+    return '\n'.join(line for metric in METRICS for line in metric.lines()) + '\n'
+
+
+def reset_metrics():
+    with _lock:
+        for metric in METRICS:
+            metric.series.clear()
+
+
+def slow_request_seconds():
+    slow_ms = getattr(settings, 'SLOW_REQUEST_MS', 0)
+    return slow_ms / 1000 if slow_ms else None
+
+
+class RequestTimings:
+    def __init__(self, keep_queries=0):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.response_bytes = 0
+        # The slowest keep_queries statements, as a min-heap of (seconds, sql)
+        self.keep_queries = keep_queries
+        self.slowest = []
+
+    def add_query(self, sql, seconds):
+        self.queries += 1
+        self.query_seconds += seconds
+        if self.keep_queries:
+            if len(self.slowest) < self.keep_queries:
+                heapq.heappush(self.slowest, (seconds, sql))
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (seconds, sql))
+
+
+def start_timings():
+    # The statements are only kept when the slow-request log is on
+    return RequestTimings(getattr(settings, 'SLOW_REQUEST_QUERIES', 5) if slow_request_seconds() else 0)
+
+
+def time_query(execute, sql, params, many, context):
+    # Installed on every connection; the async ORM's worker thread sees the
+    # request's timings through the copied context
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query(sql, time.perf_counter() - start)
+
+
+def install_query_timer(connection):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        # Only the top-level render: included templates are part of it
+        timings = _current.get()
+        if timings is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            timings.template_seconds += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+def timed_chunks(content, timings):
+    # Each chunk is produced with the request's timings active, so the
+    # queries a streamed body runs are counted
+    chunks = iter(content)
+    while True:
+        token = _current.set(timings)
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            _current.reset(token)
+        timings.response_bytes += len(chunk)
+        yield chunk
+
+
+async def atimed_chunks(content, timings):
+    chunks = aiter(content)
+    while True:
+        token = _current.set(timings)
+        try:
+            chunk = await anext(chunks)
+        except StopAsyncIteration:
+            return
+        finally:
+            _current.reset(token)
+        timings.response_bytes += len(chunk)
+        yield chunk
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = start_timings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.record(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = start_timings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.record(request, response, timings)
+
+    def record(self, request, response, timings):
+        view = view_name(request)
+        if not response.streaming:
+            timings.response_bytes = len(response.content)
+            self.observe(request, view, response.status_code, timings)
+            return response
+
+        if isinstance(response, FileResponse):
+            # Replacing the content would drop file_to_stream and with it the
+            # server's wsgi.file_wrapper; the file's size is in the header
+            timings.response_bytes = int(response.get('Content-Length') or 0)
+        elif response.is_async:
+            response.streaming_content = atimed_chunks(response.streaming_content, timings)
+        else:
+            response.streaming_content = timed_chunks(response.streaming_content, timings)
+        # The server closes the response once the last chunk has gone out
+        response._resource_closers.append(
+            lambda: self.observe(request, view, response.status_code, timings)
+        )
+        return response
+
+    def observe(self, request, view, status, timings):
+        elapsed = time.perf_counter() - timings.start
+        REQUEST_SECONDS.observe(view, elapsed)
+        QUERIES.observe(view, timings.queries)
+        QUERY_SECONDS.observe(view, timings.query_seconds)
+        TEMPLATE_SECONDS.observe(view, timings.template_seconds)
+        RESPONSE_BYTES.observe(view, timings.response_bytes)
+        RESPONSES.inc(view, status)
+
+        threshold = slow_request_seconds()
+        if threshold is not None and elapsed >= threshold:
+            statements = ''.join(
+                f'\n  {seconds * 1000:.1f} ms: {sql}' for seconds, sql in sorted(timings.slowest, reverse=True)
+            )
+            logger.warning(
+                "Slow request %s %s (%s): %.0f ms, %d queries in %.0f ms, templates %.0f ms%s",
+                request.method, request.path, view, elapsed * 1000, timings.queries,
+                timings.query_seconds * 1000, timings.template_seconds * 1000, statements,
+            )
@@ -0,0 +1,54 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS functionality_job_fts USING fts5("
+            "title, position, description, company_name, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        schema_editor.execute(
+            "INSERT INTO functionality_job_fts (rowid, title, position, description, company_name) "
+            "SELECT j.id, j.title, j.position, j.description, r.company_name "
+            "FROM functionality_job j JOIN authentication_recruiter r ON r.user_id = j.recruiter_id"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS functionality_job_search ("
+            "job_id bigint PRIMARY KEY REFERENCES functionality_job (id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS functionality_job_search_document_idx "
+            "ON functionality_job_search USING GIN (document)"
+        )
+        schema_editor.execute(
+            "INSERT INTO functionality_job_search (job_id, document) "
+            "SELECT j.id, "
+            "setweight(to_tsvector('english', j.title), 'A') || "
+            "setweight(to_tsvector('english', j.position), 'B') || "
+            "setweight(to_tsvector('english', j.description), 'D') || "
+            "setweight(to_tsvector('english', r.company_name), 'C') "
+            "FROM functionality_job j JOIN authentication_recruiter r ON r.user_id = j.recruiter_id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS functionality_job_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP TABLE IF EXISTS functionality_job_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('functionality', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
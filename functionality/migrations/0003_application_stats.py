@@ -0,0 +1,76 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:09
+
+import django.db.models.deletion
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_stats(apps, schema_editor):
+    Application = apps.get_model('functionality', 'Application')
+    Job = apps.get_model('functionality', 'Job')
+    Recruiter = apps.get_model('authentication', 'Recruiter')
+    JobApplicationStats = apps.get_model('functionality', 'JobApplicationStats')
+    RecruiterApplicationStats = apps.get_model('functionality', 'RecruiterApplicationStats')
+
+    job_counts = defaultdict(Counter)
+    for job_id, status, n in Application.objects.values_list('job_id', 'status').annotate(n=Count('id')).order_by():
+        job_counts[job_id][status] = n
+
+    recruiter_counts = {recruiter_id: Counter() for recruiter_id in Recruiter.objects.values_list('pk', flat=True)}
+    job_rows = []
+    for job_id, recruiter_id in Job.objects.values_list('id', 'recruiter_id'):
+        recruiter_counts[recruiter_id].update(job_counts[job_id])
+        job_rows.append(JobApplicationStats(job_id=job_id, recruiter_id=recruiter_id, **job_counts[job_id]))
+
+    JobApplicationStats.objects.bulk_create(job_rows, batch_size=500)
+    RecruiterApplicationStats.objects.bulk_create(
+        [RecruiterApplicationStats(recruiter_id=pk, **counts) for pk, counts in recruiter_counts.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_student_cv'),
+        ('functionality', '0002_job_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecruiterApplicationStats',
+            fields=[
+                ('pending', models.PositiveIntegerField(default=0)),
+                ('under_review', models.PositiveIntegerField(default=0)),
+                ('shortlisted_oa', models.PositiveIntegerField(default=0)),
+                ('completed_oa', models.PositiveIntegerField(default=0)),
+                ('shortlisted_interview', models.PositiveIntegerField(default=0)),
+                ('selected', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('recruiter', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='application_stats', serialize=False, to='authentication.recruiter')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='JobApplicationStats',
+            fields=[
+                ('pending', models.PositiveIntegerField(default=0)),
+                ('under_review', models.PositiveIntegerField(default=0)),
+                ('shortlisted_oa', models.PositiveIntegerField(default=0)),
+                ('completed_oa', models.PositiveIntegerField(default=0)),
+                ('shortlisted_interview', models.PositiveIntegerField(default=0)),
+                ('selected', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='application_stats', serialize=False, to='functionality.job')),
+                ('recruiter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_application_stats', to='authentication.recruiter')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
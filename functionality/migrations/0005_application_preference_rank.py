@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:31
+
+from django.db import migrations, models
+
+
+def renumber_preferences(apps, schema_editor):
+    # Turn each student's free-form 1-10 preferences into a strict ranking,
+    # keeping their order and breaking ties by application date
+    Application = apps.get_model('functionality', 'Application')
+    changed = []
+    student_id, rank = None, 0
+    rows = Application.objects.order_by('student_id', 'preference_order', 'applied_date', 'id').only(
+        'id', 'student_id', 'preference_order'
+    )
+    for application in rows.iterator(chunk_size=2000):
+        rank = rank + 1 if application.student_id == student_id else 1
+        student_id = application.student_id
+        if application.preference_order != rank:
+            application.preference_order = rank
+            changed.append(application)
+    Application.objects.bulk_update(changed, ['preference_order'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_student_cv_storage'),
+        ('functionality', '0004_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='application',
+            name='preference_order',
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.RunPython(renumber_preferences, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', 'preference_order', 'applied_date', 'id'], name='application_job_preference_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='application',
+            constraint=models.UniqueConstraint(fields=('student', 'preference_order'), name='application_student_preference_unique'),
+        ),
+    ]
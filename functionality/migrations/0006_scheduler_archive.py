@@ -0,0 +1,48 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:36
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_student_cv_storage'),
+        ('functionality', '0005_application_preference_rank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedApplication',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('under_review', 'Under Review'), ('shortlisted_oa', 'Shortlisted for Online Assessment'), ('completed_oa', 'Completed Online Assessment'), ('shortlisted_interview', 'Shortlisted for Interview'), ('selected', 'Selected'), ('rejected', 'Rejected')], max_length=30)),
+                ('preference_order', models.PositiveIntegerField()),
+                ('applied_date', models.DateTimeField()),
+                ('archived_date', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['is_active', 'last_date_to_apply'], name='job_active_deadline_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedapplication',
+            name='job',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='functionality.job'),
+        ),
+        migrations.AddField(
+            model_name='archivedapplication',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='authentication.student'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedapplication',
+            index=models.Index(fields=['job', '-applied_date', '-id'], name='archived_job_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedapplication',
+            index=models.Index(fields=['student', '-applied_date'], name='archived_student_applied_idx'),
+        ),
+    ]
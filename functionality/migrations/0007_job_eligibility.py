@@ -0,0 +1,71 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:39
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_eligibility(apps, schema_editor):
+    # The set-based fill of eligibility.rebuild_eligibility, frozen here: every
+    # (student, active job) pair that meets the job's criteria
+    Student = apps.get_model('authentication', 'Student')
+    Job = apps.get_model('functionality', 'Job')
+    Eligibility = apps.get_model('functionality', 'Eligibility')
+    job_skills = Job.required_skills.through._meta.db_table
+    student_skills = Student.skills.through._meta.db_table
+    sql = (
+        f"INSERT INTO {Eligibility._meta.db_table} (student_id, job_id) "
+        f"SELECT s.user_id, j.id FROM {Student._meta.db_table} s, {Job._meta.db_table} j "
+        "WHERE j.is_active = %s "
+        "AND (j.min_cgpa IS NULL OR s.cgpa >= j.min_cgpa) "
+        "AND (j.min_graduation_year IS NULL OR s.graduation_year >= j.min_graduation_year) "
+        "AND (j.max_graduation_year IS NULL OR s.graduation_year <= j.max_graduation_year) "
+        f"AND NOT EXISTS (SELECT 1 FROM {job_skills} r WHERE r.job_id = j.id AND NOT EXISTS ("
+        f"SELECT 1 FROM {student_skills} k WHERE k.student_id = s.user_id AND k.skill_id = r.skill_id))"
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(sql, [True])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_student_eligibility_profile'),
+        ('functionality', '0006_scheduler_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='max_graduation_year',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='min_cgpa',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(10)], verbose_name='Minimum CGPA'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='min_graduation_year',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='required_skills',
+            field=models.ManyToManyField(blank=True, to='authentication.skill'),
+        ),
+        migrations.CreateModel(
+            name='Eligibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='functionality.job')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='authentication.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'student'], name='eligibility_job_student_idx')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'job'), name='eligibility_student_job_unique')],
+            },
+        ),
+        migrations.RunPython(fill_eligibility, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils import timezone
-from authentication.models import Student,Recruiter
+from authentication.models import Skill,Student,Recruiter
 
 class Job(models.Model):
     NORMAL = 'normal'
@@ -21,6 +22,30 @@ class Job(models.Model):
     position = models.CharField(max_length=100)
     location = models.CharField(max_length=100)
     salary_range = models.CharField(max_length=100, blank=True, null=True)
+    # Structured part of the criteria, matched against student profiles
+    # (see eligibility.py); left blank, a requirement doesn't apply
+    min_cgpa = models.DecimalField(
+        max_digits=4, decimal_places=2, blank=True, null=True,
+        validators=[MinValueValidator(0), MaxValueValidator(10)], verbose_name='Minimum CGPA',
+    )
+    min_graduation_year = models.PositiveSmallIntegerField(blank=True, null=True)
+    max_graduation_year = models.PositiveSmallIntegerField(blank=True, null=True)
+    required_skills = models.ManyToManyField(Skill, blank=True)
+    # Versions the cached job card (see fragments.py); queryset.update()
+    # callers set it themselves
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # search_job: open postings newest first, optionally by location or selection type
+            models.Index(fields=['-posted_date', '-id'], condition=models.Q(is_active=True), name='job_open_posted_idx'),
+            models.Index(fields=['location', '-posted_date', '-id'], condition=models.Q(is_active=True), name='job_open_location_idx'),
+            models.Index(fields=['selection_type', '-posted_date', '-id'], condition=models.Q(is_active=True), name='job_open_selection_idx'),
+            # recruiter_dashboard: a recruiter's active jobs by deadline
+            models.Index(fields=['recruiter', 'is_active', 'last_date_to_apply'], name='job_recruiter_active_idx'),
+            # scheduler: open postings past their deadline, and closed ones old enough to archive
+            models.Index(fields=['is_active', 'last_date_to_apply'], name='job_active_deadline_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} at {self.recruiter.company_name}"
@@ -44,14 +69,136 @@ class Application(models.Model):
         (REJECTED, 'Rejected'),
     ]
 
+    # Statuses counted as "in process" on the recruiter dashboard
+    IN_PROCESS_STATUSES = [UNDER_REVIEW, SHORTLISTED_OA, COMPLETED_OA, SHORTLISTED_INTERVIEW]
+
+    # The status state machine: where an application may go from each status.
+    # Stages may be skipped but not undone, an online assessment has to be
+    # completed once started, and only a rejection can be reconsidered.
+    TRANSITIONS = {
+        PENDING: {UNDER_REVIEW, SHORTLISTED_OA, SHORTLISTED_INTERVIEW, SELECTED, REJECTED},
+        UNDER_REVIEW: {SHORTLISTED_OA, SHORTLISTED_INTERVIEW, SELECTED, REJECTED},
+        SHORTLISTED_OA: {COMPLETED_OA, REJECTED},
+        COMPLETED_OA: {SHORTLISTED_INTERVIEW, SELECTED, REJECTED},
+        SHORTLISTED_INTERVIEW: {SELECTED, REJECTED},
+        SELECTED: set(),
+        REJECTED: {UNDER_REVIEW},
+    }
+
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     job = models.ForeignKey(Job, on_delete=models.CASCADE)
     status = models.CharField(max_length=30, choices=STATUS_CHOICES, default=PENDING)
-    preference_order = models.PositiveIntegerField(default=1)
+    # The student's rank for this job, unique per student; new applications
+    # go to the end of the list (see preferences.py)
+    preference_order = models.PositiveIntegerField()
     applied_date = models.DateTimeField(auto_now_add=True)
+    # Versions the cached application rows, like Job.updated_at
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ('student', 'job')
+        indexes = [
+            # all_applications / recruiter_dashboard: a job's applications newest first,
+            # optionally narrowed to one status
+            models.Index(fields=['job', '-applied_date', '-id'], name='application_job_applied_idx'),
+            models.Index(fields=['job', 'status', '-applied_date', '-id'], name='application_job_status_idx'),
+            # job_ranking: a job's applicants by how highly they ranked it
+            models.Index(fields=['job', 'preference_order', 'applied_date', 'id'], name='application_job_preference_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'preference_order'], name='application_student_preference_unique'),
+        ]
     
     def __str__(self):
-        return f"{self.student.user.username} - {self.job.title}"
\ No newline at end of file
+        return f"{self.student.user.username} - {self.job.title}"
+
+    @classmethod
+    def can_transition(cls, old_status, new_status):
+        return new_status in cls.TRANSITIONS.get(old_status, ())
+
+    def can_move_to(self, new_status):
+        return self.can_transition(self.status, new_status)
+
+    @property
+    def allowed_transitions(self):
+        # Where this application may go next, in pipeline order
+        return [status for status, _ in self.STATUS_CHOICES if self.can_move_to(status)]
+
+
+class ArchivedApplication(models.Model):
+    # Applications to jobs that closed long ago, moved out of the Application
+    # table by the scheduler (see scheduler.py). They keep their original id
+    # and still count in the application stats.
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    job = models.ForeignKey(Job, on_delete=models.CASCADE)
+    status = models.CharField(max_length=30, choices=Application.STATUS_CHOICES)
+    preference_order = models.PositiveIntegerField()
+    applied_date = models.DateTimeField()
+    archived_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['job', '-applied_date', '-id'], name='archived_job_applied_idx'),
+            models.Index(fields=['student', '-applied_date'], name='archived_student_applied_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived application {self.id}"
+
+class Eligibility(models.Model):
+    # (student, job) pairs where the student meets the job's structured
+    # criteria, kept for open jobs only (see eligibility.py)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    job = models.ForeignKey(Job, on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'job'], name='eligibility_student_job_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['job', 'student'], name='eligibility_job_student_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} eligible for {self.job_id}"
+
+
+class ApplicationStatusCounts(models.Model):
+    # One counter per Application status, named after the status value
+    pending = models.PositiveIntegerField(default=0)
+    under_review = models.PositiveIntegerField(default=0)
+    shortlisted_oa = models.PositiveIntegerField(default=0)
+    completed_oa = models.PositiveIntegerField(default=0)
+    shortlisted_interview = models.PositiveIntegerField(default=0)
+    selected = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    def counts(self):
+        return {status: getattr(self, status) for status, _ in Application.STATUS_CHOICES}
+
+    @property
+    def total(self):
+        return sum(self.counts().values())
+
+    @property
+    def in_process(self):
+        return sum(getattr(self, status) for status in Application.IN_PROCESS_STATUSES)
+
+
+class RecruiterApplicationStats(ApplicationStatusCounts):
+    recruiter = models.OneToOneField(Recruiter, on_delete=models.CASCADE, primary_key=True, related_name='application_stats')
+
+    def __str__(self):
+        return f"Stats for {self.recruiter_id}"
+
+
+class JobApplicationStats(ApplicationStatusCounts):
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='application_stats')
+    recruiter = models.ForeignKey(Recruiter, on_delete=models.CASCADE, related_name='job_application_stats')
+
+    def __str__(self):
+        return f"Stats for job {self.job_id}"
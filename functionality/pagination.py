@@ -0,0 +1,173 @@
+# pagination.py
+#
+# Keyset (cursor) pagination. Instead of OFFSET, every page is fetched with a
+# WHERE clause on the ordering key of the last row seen, so page 500 costs the
+# same as page 1. Cursors are opaque url-safe tokens.
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, paginator=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.paginator = paginator
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginate ``queryset`` by the unique ``ordering`` (the last field must be
+    unique, normally ``id``). ``count`` is None for no total, ``'exact'`` for a
+    COUNT(*), or ``'estimate'`` for a count capped at ``count_cap`` rows.
+    """
+
+    def __init__(self, queryset, ordering, per_page=10, count=None, count_cap=1000):
+        self.queryset = queryset
+        self.ordering = [field.lstrip('-') for field in ordering]
+        self.descending = [field.startswith('-') for field in ordering]
+        self.per_page = per_page
+        self.count_mode = count
+        self.count_cap = count_cap
+        self._count = None
+
+    @property
+    def count(self):
+        if self.count_mode is None:
+            return None
+        if self._count is None:
+            if self.count_mode == 'exact':
+                self._count = self.queryset.count()
+            else:
+                self._count = self.queryset.order_by()[:self.count_cap + 1].count()
+        return min(self._count, self.count_cap) if self.count_mode == 'estimate' else self._count
+
+    @property
+    def count_is_estimate(self):
+        # True when the capped count was hit, i.e. "count_cap or more"
+        return self.count_mode == 'estimate' and self.count is not None and self._count > self.count_cap
+
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, field) for field in self.ordering]
+        # Full microsecond precision, the key has to compare equal on the way back
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+        payload = json.dumps({'d': direction, 'v': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, values = payload['d'], payload['v']
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise InvalidCursor(cursor)
+        if direction not in (NEXT, PREVIOUS) or not isinstance(values, list) or len(values) != len(self.ordering):
+            raise InvalidCursor(cursor)
+        return direction, [self.to_python(field, value) for field, value in zip(self.ordering, values)]
+
+    def to_python(self, field_name, value):
+        try:
+            field = self.queryset.model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            # Annotations such as a search rank are plain JSON numbers
+            return value
+        try:
+            return field.to_python(value)
+        except ValidationError:
+            raise InvalidCursor(value)
+
+    def seek_filter(self, values, forward):
+        # Rows strictly after ``values`` in the requested direction:
+        # (a > x) OR (a = x AND b > y) OR ...
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            descending = self.descending[i] == forward
+            term = Q(**{f'{field}__{"lt" if descending else "gt"}': values[i]})
+            for previous_field, previous_value in zip(self.ordering[:i], values[:i]):
+                term &= Q(**{previous_field: previous_value})
+            condition |= term
+        return condition
+
+    def order_by(self, forward):
+        return [
+            f'-{field}' if descending == forward else field
+            for field, descending in zip(self.ordering, self.descending)
+        ]
+
+    def page_query(self, cursor):
+        direction, values = NEXT, None
+        if cursor:
+            try:
+                direction, values = self.decode_cursor(cursor)
+            except InvalidCursor:
+                direction, values = NEXT, None
+
+        forward = direction == NEXT
+        queryset = self.queryset.order_by(*self.order_by(forward))
+        if values is not None:
+            queryset = queryset.filter(self.seek_filter(values, forward))
+        return queryset[:self.per_page + 1], forward, values is not None
+
+    def build_page(self, rows, forward, after_cursor):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if forward:
+            has_next, has_previous = has_more, after_cursor
+        else:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+
+        return CursorPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1], NEXT) if has_next and rows else None,
+            previous_cursor=self.encode_cursor(rows[0], PREVIOUS) if has_previous and rows else None,
+            paginator=self,
+        )
+
+    def get_page(self, cursor=None):
+        queryset, forward, after_cursor = self.page_query(cursor)
+        return self.build_page(list(queryset), forward, after_cursor)
+
+    async def aget_page(self, cursor=None):
+        queryset, forward, after_cursor = self.page_query(cursor)
+        return self.build_page([obj async for obj in queryset], forward, after_cursor)
+
+    async def acount(self):
+        # Fills the count up front, so that reading .count (e.g. in a template) doesn't query
+        if self.count_mode is not None and self._count is None:
+            if self.count_mode == 'exact':
+                self._count = await self.queryset.acount()
+            else:
+                self._count = await self.queryset.order_by()[:self.count_cap + 1].acount()
+        return self.count
@@ -0,0 +1,95 @@
+# pipeline.py
+#
+# Status changes built on the Application.TRANSITIONS state machine, and the
+# fast-track engine. On fast-track jobs the screening clicks are skipped:
+# run_fast_track() moves every application whose student has an approved CV
+# along FAST_TRACK_STEPS, a batch of ids at a time with one UPDATE per batch.
+# It runs on the background queue after applications and CV approvals (see
+# queue_fast_track) and from the advance_fast_track command.
+import threading
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Application, Job
+from .stats import apply_job_status_deltas
+from .tasks import enqueue
+
+# Applied in order, so an application can go through every step in one run
+FAST_TRACK_STEPS = [
+    (Application.PENDING, Application.UNDER_REVIEW),
+    (Application.UNDER_REVIEW, Application.SHORTLISTED_OA),
+]
+
+_queued = False
+_queued_lock = threading.Lock()
+
+
+def transition_applications(rows, new_status):
+    """
+    Move the applications in ``rows`` ((id, job_id, status) tuples, read in
+    the caller's transaction) to ``new_status`` with one UPDATE, skipping any
+    move the state machine forbids. Returns the ids that moved.
+    """
+    moved = [(app_id, job_id, status) for app_id, job_id, status in rows if Application.can_transition(status, new_status)]
+    if not moved:
+        return set()
+    Application.objects.filter(id__in=[app_id for app_id, _, _ in moved]).update(status=new_status, updated_at=timezone.now())
+
+    # queryset.update() skips the signals, so move the counters here
+    deltas = defaultdict(Counter)
+    for _, job_id, status in moved:
+        deltas[job_id][status] -= 1
+        deltas[job_id][new_status] += 1
+    apply_job_status_deltas(deltas)
+    return {app_id for app_id, _, _ in moved}
+
+
+def fast_track_candidates(status):
+    return Application.objects.filter(
+        status=status,
+        job__selection_type=Job.FAST_TRACK,
+        job__is_active=True,
+        student__cv_approved_status=True,
+    )
+
+
+def run_fast_track(batch_size=500):
+    """Advance every eligible fast-track application as far as it can go; returns the number of transitions."""
+    transitions = 0
+    for old_status, new_status in FAST_TRACK_STEPS:
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    fast_track_candidates(old_status)
+                    .select_for_update(of=('self',))
+                    .order_by('id')
+                    .values_list('id', 'job_id', 'status')[:batch_size]
+                )
+                moved = transition_applications(rows, new_status)
+            transitions += len(moved)
+            if len(rows) < batch_size:
+                break
+    return transitions
+
+
+def _run_queued_fast_track():
+    global _queued
+    # Cleared first, so anything arriving during this run queues another one
+    with _queued_lock:
+        _queued = False
+    run_fast_track()
+
+
+def queue_fast_track():
+    """Run the fast-track engine in the background once the current transaction commits."""
+    def schedule():
+        global _queued
+        with _queued_lock:
+            if _queued:
+                return
+            _queued = True
+        enqueue(_run_queued_fast_track)
+
+    transaction.on_commit(schedule)
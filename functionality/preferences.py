@@ -0,0 +1,53 @@
+# preferences.py
+#
+# A student's applications form one ranked list: preference_order 1 is the
+# job they want most. Ranks are unique per student (backed by a unique
+# constraint) but may have gaps once applications are deleted. Moving an
+# application re-ranks everything between its old and new position with
+# set-based UPDATEs, however long the list is.
+from django.db import transaction
+from django.db.models import Case, F, Max, Value, When
+
+from .models import Application
+
+# SQLite and PostgreSQL check the unique constraint row by row during an
+# UPDATE, so shifted ranks pass through this range to avoid colliding with
+# rows that haven't moved yet
+SHIFT_OFFSET = 1_000_000
+
+
+def next_rank(student_id):
+    top = Application.objects.filter(student_id=student_id).aggregate(top=Max('preference_order'))['top']
+    return (top or 0) + 1
+
+
+def move_application(student, application_id, new_rank):
+    """
+    Give the student's application ``application_id`` rank ``new_rank``
+    (clamped to the current list), shifting the ones in between by one place.
+    Returns the new rank, or None if the application isn't the student's.
+    """
+    with transaction.atomic():
+        applications = Application.objects.filter(student=student)
+        # Locks the student's list on backends with row locks
+        ranks = dict(applications.select_for_update().values_list('id', 'preference_order'))
+        if application_id not in ranks:
+            return None
+        old_rank = ranks[application_id]
+        new_rank = max(1, min(new_rank, max(ranks.values())))
+        if new_rank == old_rank:
+            return new_rank
+
+        if new_rank < old_rank:
+            span, step = (new_rank, old_rank), 1
+        else:
+            span, step = (old_rank, new_rank), -1
+        shifted = Case(
+            When(pk=application_id, then=Value(new_rank)),
+            default=F('preference_order') + step,
+        )
+        applications.filter(preference_order__range=span).update(preference_order=shifted + SHIFT_OFFSET)
+        applications.filter(preference_order__gt=SHIFT_OFFSET).update(
+            preference_order=F('preference_order') - SHIFT_OFFSET
+        )
+    return new_rank
@@ -0,0 +1,120 @@
+# routers.py
+#
+# Read replica routing. Reads made inside a view wrapped in @replica_reads go
+# to one of settings.DATABASE_REPLICAS; all other reads and every write use
+# the default database. Once a request has written, ReplicaPinMiddleware sets
+# a cookie that keeps the browser on the primary for REPLICA_PIN_SECONDS, so
+# users always read their own writes while the replicas catch up (see the
+# sync_replicas command).
+import contextvars
+import random
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+PIN_COOKIE = 'db_pin'
+
+# Set for the duration of a replica-safe view
+_use_replicas = contextvars.ContextVar('use_replicas', default=False)
+# Apps written during the current request; None outside of requests
+_writes = contextvars.ContextVar('writes', default=None)
+
+# Writes that don't pin the user: the session is saved on every request
+UNPINNED_APPS = {'sessions'}
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+@contextmanager
+def reading_from_replicas():
+    token = _use_replicas.set(True)
+    try:
+        yield
+    finally:
+        _use_replicas.reset(token)
+
+
+def replica_reads(view):
+    if iscoroutinefunction(view):
+        # The async ORM runs queries in a thread that inherits this context
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if request.COOKIES.get(PIN_COOKIE) or not get_replicas():
+                return await view(request, *args, **kwargs)
+            with reading_from_replicas():
+                return await view(request, *args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.COOKIES.get(PIN_COOKIE) or not get_replicas():
+            return view(request, *args, **kwargs)
+        with reading_from_replicas():
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # A view that has written reads everything else from the primary too
+        if _use_replicas.get() and not _writes.get() and get_replicas():
+            return random.choice(get_replicas())
+        return None
+
+    def db_for_write(self, model, **hints):
+        writes = _writes.get()
+        if writes is not None and model._meta.app_label not in UNPINNED_APPS:
+            writes.add(model._meta.app_label)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema with the data
+        if db in get_replicas():
+            return False
+        return None
+
+
+class ReplicaPinMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _writes.set(set())
+        try:
+            return self.pin(self.get_response(request))
+        finally:
+            _writes.reset(token)
+
+    async def __acall__(self, request):
+        # Writes made through the async ORM land in the same set: the
+        # worker thread's context refers to it
+        token = _writes.set(set())
+        try:
+            return self.pin(await self.get_response(request))
+        finally:
+            _writes.reset(token)
+
+    def pin(self, response):
+        if _writes.get() and get_replicas():
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 10),
+                httponly=True, samesite='Lax',
+            )
+        return response
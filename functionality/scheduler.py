@@ -0,0 +1,124 @@
+# scheduler.py
+#
+# Periodic housekeeping, run by `manage.py run_scheduler` as its own worker
+# process. close_expired_jobs() flips is_active off once a posting's deadline
+# has passed, and archive_applications() moves the applications of jobs closed
+# more than ARCHIVE_AFTER_DAYS days ago into ArchivedApplication, so the hot
+# tables only hold what is still being worked on. Both go a batch of ids at a
+# time, one short transaction per batch, and are safe to run again.
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import invalidate_jobs
+from .models import Application, ArchivedApplication, Eligibility, Job
+from .pipeline import run_fast_track
+
+logger = logging.getLogger(__name__)
+
+
+def expired_jobs(now):
+    """Open jobs whose deadline has passed, oldest deadline first (job_active_deadline_idx)."""
+    # Django writes is_active=True as a bare "is_active", which SQLite doesn't
+    # match to the index's leading column; an IN list is an equality it does
+    return Job.objects.filter(is_active__in=[True], last_date_to_apply__lte=now).order_by('last_date_to_apply', 'id')
+
+
+def close_expired_jobs(batch_size=500, now=None):
+    """Deactivate open jobs whose deadline has passed; returns how many were closed."""
+    now = now or timezone.now()
+    expired = expired_jobs(now)
+    closed = 0
+    while True:
+        with transaction.atomic():
+            ids = list(expired.values_list('id', flat=True)[:batch_size])
+            # Filtered again, in case a recruiter moved the deadline meanwhile
+            count = expired.filter(id__in=ids).update(is_active=False, updated_at=now) if ids else 0
+            if count:
+                # queryset.update() skips the Job signals
+                invalidate_jobs()
+                Eligibility.objects.filter(job_id__in=ids, job__is_active=False).delete()
+        closed += count
+        if len(ids) < batch_size:
+            return closed
+
+
+def archivable_jobs(older_than_days, now=None):
+    cutoff = (now or timezone.now()) - timedelta(days=older_than_days)
+    # IN rather than is_active=False (NOT "is_active"), as in expired_jobs
+    return Job.objects.filter(is_active__in=[False], last_date_to_apply__lt=cutoff)
+
+
+def archive_applications(older_than_days=None, batch_size=500, now=None):
+    """
+    Move the applications of jobs closed more than ``older_than_days`` days
+    ago into the archive table; returns how many were moved. The stats
+    counters include archived applications, so they don't change.
+    """
+    if older_than_days is None:
+        older_than_days = settings.ARCHIVE_AFTER_DAYS
+    candidates = Application.objects.filter(job__in=archivable_jobs(older_than_days, now))
+    archived_date = timezone.now()
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                candidates.select_for_update(of=('self',))
+                .order_by('id')
+                .values_list('id', 'student_id', 'job_id', 'status', 'preference_order', 'applied_date')[:batch_size]
+            )
+            if rows:
+                ArchivedApplication.objects.bulk_create(
+                    [
+                        ArchivedApplication(
+                            id=app_id, student_id=student_id, job_id=job_id, status=status,
+                            preference_order=preference_order, applied_date=applied_date, archived_date=archived_date,
+                        )
+                        for app_id, student_id, job_id, status, preference_order, applied_date in rows
+                    ],
+                    ignore_conflicts=True,
+                )
+                # A plain DELETE: the post_delete signal would take the rows
+                # off the counters, and nothing references an application
+                ids = [row[0] for row in rows]
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"DELETE FROM {Application._meta.db_table} WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                        ids,
+                    )
+        moved += len(rows)
+        if len(rows) < batch_size:
+            return moved
+
+
+# Intervals in seconds come from settings.SCHEDULER_INTERVALS
+TASKS = {
+    'close_expired_jobs': close_expired_jobs,
+    'archive_applications': archive_applications,
+    # Catches up on fast-track runs the in-process queue lost to a restart
+    'fast_track': run_fast_track,
+}
+
+
+def run_pending(next_runs, batch_size=500, clock=time.monotonic):
+    """
+    Run every task in TASKS that is due according to ``next_runs`` ({name:
+    clock time}, updated in place; a missing name is due at once). A task
+    that fails is logged and tried again at its next interval. Returns
+    {name: result} for the tasks that ran, with None for failures.
+    """
+    results = {}
+    for name, func in TASKS.items():
+        if clock() < next_runs.get(name, 0):
+            continue
+        try:
+            results[name] = func(batch_size=batch_size)
+        except Exception:
+            logger.exception("Scheduled task %s failed", name)
+            results[name] = None
+        next_runs[name] = clock() + settings.SCHEDULER_INTERVALS[name]
+    return results
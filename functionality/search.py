@@ -0,0 +1,170 @@
+# search.py
+#
+# Full-text search over Job. Each backend keeps its own index table in sync
+# (see signals.py) and narrows a Job queryset down to the matching rows, ranked
+# by relevance. The backend is picked from the database vendor unless
+# settings.JOB_SEARCH_BACKEND points at a specific class.
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())
+
+
+def job_document(job):
+    # The text that gets indexed for a job, in column order
+    return [job.title, job.position, job.description, job.recruiter.company_name]
+
+
+class BaseSearchBackend:
+    # Ordering of search results, unique so it can key cursor pagination
+    ordering = ('-search_rank', '-posted_date', '-id')
+
+    def index_job(self, job):
+        pass
+
+    def remove_job(self, job_id):
+        pass
+
+    def rebuild(self):
+        from .models import Job
+        count = 0
+        for job in Job.objects.select_related('recruiter').iterator(chunk_size=500):
+            self.index_job(job)
+            count += 1
+        return count
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    """Fallback for databases without a text index: the old icontains scan."""
+
+    ordering = ('-posted_date', '-id')
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(position__icontains=query) |
+            Q(description__icontains=query) |
+            Q(recruiter__company_name__icontains=query)
+        )
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """FTS5 virtual table keyed by job id, ranked with bm25."""
+
+    table = 'functionality_job_fts'
+    # bm25 column weights: title, position, description, company_name
+    weights = (10.0, 5.0, 1.0, 3.0)
+
+    def index_job(self, job):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT OR REPLACE INTO {self.table} (rowid, title, position, description, company_name) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                [job.pk, *job_document(job)],
+            )
+
+    def remove_job(self, job_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [job_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+        return super().rebuild()
+
+    def match_expression(self, query):
+        # Quote every token so FTS operators in user input are treated as text,
+        # and make each one a prefix match
+        return ' '.join(f'"{token}"*' for token in tokenize(query))
+
+    def search(self, queryset, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return queryset.annotate(search_rank=Value(0.0)).none()
+        weights = ', '.join(str(w) for w in self.weights)
+        job_table = queryset.model._meta.db_table
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [expression])
+        ).annotate(
+            # bm25 is lower-is-better, so negate it to rank descending like Postgres
+            search_rank=RawSQL(
+                f'SELECT -bm25({self.table}, {weights}) FROM {self.table} '
+                f'WHERE {self.table} MATCH %s AND rowid = "{job_table}"."id"',
+                [expression],
+            )
+        ).order_by(*self.ordering)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Weighted tsvector per job in a side table with a GIN index, ranked with ts_rank."""
+
+    table = 'functionality_job_search'
+    config = 'english'
+
+    def index_job(self, job):
+        title, position, description, company_name = job_document(job)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.table} (job_id, document) VALUES (%s, '
+                f"setweight(to_tsvector('{self.config}', %s), 'A') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'B') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'D') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'C')) "
+                'ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document',
+                [job.pk, title, position, description, company_name],
+            )
+
+    def remove_job(self, job_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE job_id = %s', [job_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+        return super().rebuild()
+
+    def tsquery(self, query):
+        return ' & '.join(f'{token}:*' for token in tokenize(query))
+
+    def search(self, queryset, query):
+        tsquery = self.tsquery(query)
+        if not tsquery:
+            return queryset.annotate(search_rank=Value(0.0)).none()
+        job_table = queryset.model._meta.db_table
+        return queryset.filter(
+            id__in=RawSQL(
+                f"SELECT job_id FROM {self.table} WHERE document @@ to_tsquery('{self.config}', %s)",
+                [tsquery],
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT ts_rank(document, to_tsquery('{self.config}', %s))::float8 FROM {self.table} "
+                f'WHERE job_id = "{job_table}"."id"',
+                [tsquery],
+            )
+        ).order_by(*self.ordering)
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    backend_path = getattr(settings, 'JOB_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    return VENDOR_BACKENDS.get(connection.vendor, BasicSearchBackend)()
@@ -0,0 +1,172 @@
+# signals.py
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from authentication.models import Student, Recruiter
+from .models import Job, Application, ArchivedApplication, JobApplicationStats, RecruiterApplicationStats
+from .cache import invalidate_jobs
+from .eligibility import queue_refresh
+from .metrics import install_query_timer
+from .pipeline import queue_fast_track
+from .preferences import next_rank
+from .search import get_search_backend
+from .stats import apply_status_deltas
+
+
+@receiver(post_save, sender=Job)
+def index_job(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    get_search_backend().index_job(instance)
+
+
+@receiver(post_delete, sender=Job)
+def unindex_job(sender, instance, **kwargs):
+    get_search_backend().remove_job(instance.pk)
+
+
+@receiver(post_save, sender=Recruiter)
+def reindex_recruiter_jobs(sender, instance, created=False, raw=False, **kwargs):
+    # The company name is part of every job document of this recruiter
+    if raw or created:
+        return
+    backend = get_search_backend()
+    for job in instance.job_set.all():
+        job.recruiter = instance
+        backend.index_job(job)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_cache(sender, raw=False, **kwargs):
+    # Created, edited, deactivated or deleted: cached pages and facets are stale
+    if not raw:
+        invalidate_jobs()
+
+
+@receiver(post_save, sender=Recruiter)
+def invalidate_company_cache(sender, created=False, raw=False, **kwargs):
+    # Company names are shown on, and searched in, the cached job pages
+    if not created and not raw:
+        invalidate_jobs()
+
+
+@receiver(post_save, sender=Recruiter)
+def create_recruiter_stats(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        RecruiterApplicationStats.objects.get_or_create(recruiter=instance)
+
+
+@receiver(post_save, sender=Job)
+def create_job_stats(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        JobApplicationStats.objects.get_or_create(job=instance, defaults={'recruiter_id': instance.recruiter_id})
+
+
+@receiver(pre_save, sender=Application)
+def rank_new_application(sender, instance, raw=False, **kwargs):
+    # Without an explicit preference a new application goes to the end of the list
+    if not raw and instance.preference_order is None:
+        instance.preference_order = next_rank(instance.student_id)
+
+
+@receiver(post_init, sender=Application)
+def remember_application_status(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred status isn't fetched just for this
+    instance._saved_status = instance.__dict__.get('status') if instance.pk else None
+
+
+@receiver(post_save, sender=Application)
+def count_application_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous = instance._saved_status
+    if created:
+        deltas = {instance.status: 1}
+    elif previous is not None and previous != instance.status:
+        deltas = {previous: -1, instance.status: 1}
+    else:
+        deltas = {}
+    apply_status_deltas(instance.job_id, deltas)
+    instance._saved_status = instance.status
+
+
+@receiver(post_delete, sender=Application)
+def count_application_delete(sender, instance, **kwargs):
+    apply_status_deltas(instance.job_id, {instance._saved_status or instance.status: -1})
+
+
+@receiver(post_delete, sender=ArchivedApplication)
+def count_archived_application_delete(sender, instance, **kwargs):
+    # Archived applications still count (see stats.py)
+    apply_status_deltas(instance.job_id, {instance.status: -1})
+
+
+@receiver(post_save, sender=Application)
+def fast_track_new_application(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        queue_fast_track()
+
+
+@receiver(post_init, sender=Student)
+def remember_cv_approval(sender, instance, **kwargs):
+    instance._saved_cv_approved = instance.__dict__.get('cv_approved_status') if instance.pk else False
+
+
+@receiver(post_save, sender=Student)
+def fast_track_approved_student(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Approving the CV makes the student's waiting fast-track applications
+    # eligible; other saves of an approved student change nothing for them
+    if update_fields is not None and 'cv_approved_status' not in update_fields:
+        return
+    approved = instance.__dict__.get('cv_approved_status')
+    if not raw and approved and not instance._saved_cv_approved:
+        queue_fast_track()
+    instance._saved_cv_approved = approved
+
+
+# Fields of a student profile that eligibility depends on (besides skills)
+ELIGIBILITY_FIELDS = {'cgpa', 'graduation_year'}
+
+
+@receiver(post_save, sender=Job)
+def refresh_job_eligibility(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue_refresh(job_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Student)
+def refresh_student_eligibility(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    # Saves of other fields only (e.g. the CV pipeline) can't change a match
+    if not raw and (created or update_fields is None or ELIGIBILITY_FIELDS & set(update_fields)):
+        queue_refresh(student_ids=[instance.pk])
+
+
+def skill_change_ids(instance, action, reverse, pk_set, related):
+    # Ids of the jobs or students whose skills an m2m change touched
+    if not reverse:
+        return [instance.pk] if action.startswith('post_') else []
+    if action == 'pre_clear':
+        # A skill's clear() sends no pk_set, so note who had it before the rows go
+        setattr(instance, f'_cleared_{related}', list(getattr(instance, related).values_list('pk', flat=True)))
+        return []
+    if action == 'post_clear':
+        return instance.__dict__.pop(f'_cleared_{related}', [])
+    return pk_set if action.startswith('post_') else []
+
+
+@receiver(m2m_changed, sender=Job.required_skills.through)
+def refresh_job_skills_eligibility(sender, instance, action, reverse, pk_set, **kwargs):
+    queue_refresh(job_ids=skill_change_ids(instance, action, reverse, pk_set, 'job_set'))
+
+
+@receiver(m2m_changed, sender=Student.skills.through)
+def refresh_student_skills_eligibility(sender, instance, action, reverse, pk_set, **kwargs):
+    queue_refresh(student_ids=skill_change_ids(instance, action, reverse, pk_set, 'student_set'))
+
+
+@receiver(connection_created)
+def time_connection_queries(sender, connection, **kwargs):
+    # Per-request query counts and timings for MetricsMiddleware
+    install_query_timer(connection)
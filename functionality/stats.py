@@ -0,0 +1,130 @@
+# stats.py
+#
+# Materialized application counters per job and per recruiter. They are kept
+# up to date incrementally from the Application signals (see signals.py); code
+# that changes statuses with queryset.update() must call apply_status_deltas
+# (or apply_job_status_deltas for several jobs) itself. Archived applications
+# keep counting, so moving one into the archive leaves the counters alone.
+# rebuild_application_stats recomputes everything from scratch.
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Value, When
+
+from authentication.models import Recruiter
+from .models import Application, ArchivedApplication, Job, JobApplicationStats, RecruiterApplicationStats
+
+
+def apply_status_deltas(job_id, deltas):
+    """Add ``deltas`` ({status: +n/-n}) to the counters of the job and its recruiter."""
+    changes = {status: F(status) + delta for status, delta in deltas.items() if delta}
+    if not changes:
+        return
+    with transaction.atomic():
+        # A missing row (e.g. mid cascade-delete) is left alone; the rebuild
+        # command repairs any drift
+        JobApplicationStats.objects.filter(job_id=job_id).update(**changes)
+        RecruiterApplicationStats.objects.filter(
+            recruiter_id__in=Job.objects.filter(pk=job_id).values('recruiter_id')
+        ).update(**changes)
+
+
+def case_changes(key, deltas_by_key):
+    # {status: F(status) + CASE key WHEN ... THEN delta ... ELSE 0 END}
+    statuses = {status for deltas in deltas_by_key.values() for status in deltas}
+    return {
+        status: F(status) + Case(
+            *[When(**{key: pk}, then=Value(deltas[status])) for pk, deltas in deltas_by_key.items() if deltas.get(status)],
+            default=Value(0),
+        )
+        for status in statuses
+    }
+
+
+def apply_job_status_deltas(job_deltas):
+    """
+    apply_status_deltas for several jobs at once ({job_id: {status: +n/-n}}):
+    one read of the jobs' recruiters and one UPDATE per counter table, each
+    column moved by a CASE over the ids, however many jobs there are.
+    """
+    job_deltas = {job_id: {s: d for s, d in deltas.items() if d} for job_id, deltas in job_deltas.items()}
+    job_deltas = {job_id: deltas for job_id, deltas in job_deltas.items() if deltas}
+    if len(job_deltas) <= 1:
+        # One job needs no recruiter read
+        for job_id, deltas in job_deltas.items():
+            apply_status_deltas(job_id, deltas)
+        return
+    with transaction.atomic():
+        recruiter_deltas = defaultdict(Counter)
+        for job_id, recruiter_id in Job.objects.filter(pk__in=job_deltas).values_list('id', 'recruiter_id'):
+            recruiter_deltas[recruiter_id].update(job_deltas[job_id])
+        JobApplicationStats.objects.filter(job_id__in=job_deltas).update(**case_changes('job_id', job_deltas))
+        if recruiter_deltas:
+            RecruiterApplicationStats.objects.filter(recruiter_id__in=recruiter_deltas).update(
+                **case_changes('recruiter_id', recruiter_deltas)
+            )
+
+
+def compute_status_counts():
+    """Exact counters from the Application and ArchivedApplication tables, as {job_id: Counter}."""
+    counts = defaultdict(Counter)
+    for model in (Application, ArchivedApplication):
+        rows = model.objects.values_list('job_id', 'status').annotate(n=Count('id')).order_by()
+        for job_id, status, n in rows:
+            counts[job_id][status] += n
+    return counts
+
+
+def expected_stats():
+    job_counts = compute_status_counts()
+    jobs = {}
+    recruiters = defaultdict(Counter)
+    for recruiter_id in Recruiter.objects.values_list('pk', flat=True):
+        recruiters[recruiter_id] = Counter()
+    for job_id, recruiter_id in Job.objects.values_list('id', 'recruiter_id'):
+        counter = job_counts.get(job_id, Counter())
+        jobs[job_id] = (recruiter_id, counter)
+        recruiters[recruiter_id].update(counter)
+    return jobs, recruiters
+
+
+def status_fields(counter):
+    return {status: counter.get(status, 0) for status, _ in Application.STATUS_CHOICES}
+
+
+def find_drift():
+    """List of (kind, key) whose stored counters differ from the real counts."""
+    jobs, recruiters = expected_stats()
+    stored_jobs = {row.job_id: row.counts() for row in JobApplicationStats.objects.all()}
+    stored_recruiters = {row.recruiter_id: row.counts() for row in RecruiterApplicationStats.objects.all()}
+
+    drift = []
+    for job_id, (_, counter) in jobs.items():
+        if stored_jobs.get(job_id) != status_fields(counter):
+            drift.append(('job', job_id))
+    for recruiter_id, counter in recruiters.items():
+        if stored_recruiters.get(recruiter_id) != status_fields(counter):
+            drift.append(('recruiter', recruiter_id))
+    return drift
+
+
+@transaction.atomic
+def rebuild_stats():
+    jobs, recruiters = expected_stats()
+    JobApplicationStats.objects.all().delete()
+    RecruiterApplicationStats.objects.all().delete()
+    JobApplicationStats.objects.bulk_create(
+        [
+            JobApplicationStats(job_id=job_id, recruiter_id=recruiter_id, **status_fields(counter))
+            for job_id, (recruiter_id, counter) in jobs.items()
+        ],
+        batch_size=500,
+    )
+    RecruiterApplicationStats.objects.bulk_create(
+        [
+            RecruiterApplicationStats(recruiter_id=recruiter_id, **status_fields(counter))
+            for recruiter_id, counter in recruiters.items()
+        ],
+        batch_size=500,
+    )
+    return len(jobs), len(recruiters)
@@ -0,0 +1,44 @@
+# storage.py
+#
+# Content-addressed storage for CVs: every file is stored as
+# cv_files/<first two hex digits>/<sha256><ext>, so identical uploads share one
+# blob and re-uploads never overwrite a file another student still points to.
+# Blobs nobody references any more are removed by the gc_cv_blobs command.
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+
+
+def file_sha256(fileobj):
+    hasher = hashlib.sha256()
+    for chunk in fileobj.chunks():
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    prefix = 'cv_files'
+
+    def blob_name(self, sha256, original_name):
+        extension = os.path.splitext(original_name)[1].lower()
+        return f'{self.prefix}/{sha256[:2]}/{sha256}{extension}'
+
+    def _save(self, name, content):
+        # The upload handler already hashed the upload; hash it here otherwise
+        sha256 = getattr(content, 'sha256', None) or file_sha256(content)
+        target = self.blob_name(sha256, name)
+        if self.exists(target):
+            return target
+        saved = super()._save(target, content)
+        if saved != target:
+            # Lost a race with an identical upload; keep the first copy
+            self.delete(saved)
+        return target
+
+
+cv_storage = ContentAddressedStorage()
+
+
+def get_cv_storage():
+    return cv_storage
@@ -0,0 +1,54 @@
+# tasks.py
+#
+# A small in-process background queue: work is handed to daemon worker
+# threads so the request can return straight away. Each gunicorn/uvicorn
+# worker process runs its own threads. With settings.TASKS_ALWAYS_EAGER the
+# task runs inline instead, which is what the tests use.
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_queue = queue.Queue()
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def _worker():
+    while True:
+        func, args, kwargs = _queue.get()
+        try:
+            close_old_connections()
+            func(*args, **kwargs)
+        except Exception:
+            logger.exception("Background task %s failed", getattr(func, '__name__', func))
+        finally:
+            close_old_connections()
+            _queue.task_done()
+
+
+def _start_workers():
+    with _workers_lock:
+        if _workers:
+            return
+        for i in range(getattr(settings, 'TASK_WORKERS', 2)):
+            thread = threading.Thread(target=_worker, name=f'internsync-task-{i}', daemon=True)
+            thread.start()
+            _workers.append(thread)
+
+
+def enqueue(func, *args, **kwargs):
+    if getattr(settings, 'TASKS_ALWAYS_EAGER', False):
+        func(*args, **kwargs)
+        return
+    _start_workers()
+    _queue.put((func, args, kwargs))
+
+
+def wait_for_tasks():
+    """Block until everything queued so far has run."""
+    _queue.join()
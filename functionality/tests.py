@@ -1,3 +1,1362 @@
-from django.test import TestCase
+import asyncio
+import csv
+import importlib
+import itertools
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zipfile
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.db.utils import ConnectionHandler, OperationalError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import FileResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
+
+from authentication.models import CustomUser, Skill, Student, Recruiter
+from .benchmark import SCENARIOS, compare, missing_scenarios
+from .cache import cache_stats, get_cache, invalidate_jobs, reset_cache_stats
+from .models import Job, Application, ArchivedApplication, Eligibility, JobApplicationStats, RecruiterApplicationStats
+from .pagination import CursorPaginator
+from .routers import PIN_COOKIE, ReplicaRouter, reading_from_replicas
+from .search import get_search_backend
+from .stats import find_drift
+from .management.commands.check_query_plans import Command as CheckQueryPlans, full_scans
+from .metrics import MetricsMiddleware, render_metrics, reset_metrics
+from .eligibility import eligible_applicants, rebuild_eligibility, reject_ineligible
+from .pipeline import run_fast_track, transition_applications
+from .preferences import move_application
+from .scheduler import archive_applications, close_expired_jobs, run_pending
+from .views import APPLIED, DUPLICATE, submit_application
+
+
+def metric_value(name, view, **labels):
+    """A sample of the Prometheus text output, or None if there isn't one."""
+    label = ','.join([f'view="{view}"'] + [f'{key}="{value}"' for key, value in labels.items()])
+    for line in render_metrics().splitlines():
+        if line.startswith(f'{name}{{{label}}} '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+def make_recruiter(username='acme', company_name='Acme Corp'):
+    user = CustomUser.objects.create_user(
+        username=username, email=f'{username}@example.com', password='pass12345', role=CustomUser.RECRUITER
+    )
+    return Recruiter.objects.create(user=user, company_name=company_name)
+
+
+def make_student(username='alice'):
+    user = CustomUser.objects.create_user(
+        username=username, email=f'{username}@example.com', password='pass12345', role=CustomUser.STUDENT
+    )
+    return Student.objects.create(user=user)
+
+
+def make_job(recruiter, **kwargs):
+    fields = {
+        'title': 'Software Intern',
+        'position': 'Intern',
+        'description': 'Work on things',
+        'criteria': 'Any',
+        'location': 'Remote',
+        'last_date_to_apply': timezone.now() + timedelta(days=10),
+    }
+    fields.update(kwargs)
+    return Job.objects.create(recruiter=recruiter, **fields)
+
+
+class JobSearchTests(TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter()
+        self.student = make_student()
+        self.client.force_login(self.student.user)
+
+    def search(self, **params):
+        response = self.client.get(reverse('search_job'), params)
+        self.assertEqual(response.status_code, 200)
+        return [job.title for job in response.context['jobs']]
+
+    def test_prefix_match_and_ranking(self):
+        make_job(self.recruiter, title='Data Analyst', description='Python and SQL')
+        make_job(self.recruiter, title='Python Developer', description='Backend services')
+        make_job(self.recruiter, title='Designer', description='Figma')
+
+        # Title hits outrank description hits
+        self.assertEqual(self.search(search='pyth'), ['Python Developer', 'Data Analyst'])
+
+    def test_search_composes_with_filters(self):
+        make_job(self.recruiter, title='Python Developer', location='Pune')
+        make_job(self.recruiter, title='Python Tester', location='Delhi', selection_type=Job.FAST_TRACK)
+
+        self.assertEqual(self.search(search='python', location='Pune'), ['Python Developer'])
+        self.assertEqual(self.search(search='python', selection_type=Job.FAST_TRACK), ['Python Tester'])
+
+    def test_index_follows_company_name_and_deletes(self):
+        job = make_job(self.recruiter, title='Backend Intern')
+        self.recruiter.company_name = 'Globex'
+        self.recruiter.save()
+        self.assertEqual(self.search(search='globex'), ['Backend Intern'])
+
+        job.delete()
+        self.assertEqual(self.search(search='backend'), [])
+
+    def test_operator_characters_are_plain_text(self):
+        make_job(self.recruiter, title='C Developer')
+        self.assertEqual(self.search(search='"develop* ('), ['C Developer'])
+        self.assertEqual(self.search(search='!!!'), [])
+
+    def test_rebuild(self):
+        make_job(self.recruiter, title='Rust Intern')
+        backend = get_search_backend()
+        self.assertEqual(backend.rebuild(), 1)
+        self.assertEqual(self.search(search='rust'), ['Rust Intern'])
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter()
+        posted = timezone.now() - timedelta(days=1)
+        # Pairs of jobs share a posted_date so the id tie-breaker matters
+        self.jobs = [
+            make_job(self.recruiter, title=f'Job {i}', posted_date=posted - timedelta(hours=i // 2))
+            for i in range(25)
+        ]
+        self.expected = [job.pk for job in sorted(self.jobs, key=lambda j: (j.posted_date, j.pk), reverse=True)]
+
+    def paginator(self, **kwargs):
+        return CursorPaginator(Job.objects.all(), ('-posted_date', '-id'), per_page=10, **kwargs)
+
+    def test_forward_and_back(self):
+        paginator = self.paginator()
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+
+        self.assertEqual([job.pk for page in pages for job in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertFalse(pages[0].has_previous())
+
+        back = paginator.get_page(pages[2].previous_cursor)
+        self.assertEqual([job.pk for job in back], [job.pk for job in pages[1]])
+        first = paginator.get_page(back.previous_cursor)
+        self.assertEqual([job.pk for job in first], self.expected[:10])
+        self.assertFalse(first.has_previous())
+
+    def test_deep_pages_do_not_offset_or_count(self):
+        paginator = self.paginator()
+        cursor = paginator.get_page().next_cursor
+        with CaptureQueriesContext(connection) as ctx:
+            paginator.get_page(cursor)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn('OFFSET', ctx.captured_queries[0]['sql'])
+
+    def test_counts(self):
+        self.assertIsNone(self.paginator().count)
+        self.assertEqual(self.paginator(count='exact').count, 25)
+        estimated = CursorPaginator(Job.objects.all(), ('-posted_date', '-id'), count='estimate', count_cap=20)
+        self.assertEqual(estimated.count, 20)
+        self.assertTrue(estimated.count_is_estimate)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        page = self.paginator().get_page('not-a-cursor')
+        self.assertEqual([job.pk for job in page], self.expected[:10])
+
+    def test_search_results_paginate_by_rank(self):
+        student = make_student()
+        self.client.force_login(student.user)
+        response = self.client.get(reverse('search_job'), {'search': 'job'})
+        seen = [job.pk for job in response.context['jobs']]
+        while response.context['jobs'].has_next():
+            response = self.client.get(reverse('search_job'), {
+                'search': 'job', 'cursor': response.context['jobs'].next_cursor,
+            })
+            seen += [job.pk for job in response.context['jobs']]
+        self.assertEqual(sorted(seen), sorted(self.expected))
+
+    def test_all_applications_paginates(self):
+        student = make_student()
+        for job in self.jobs:
+            Application.objects.create(student=student, job=job)
+        self.client.force_login(self.recruiter.user)
+
+        response = self.client.get(reverse('all_applications'))
+        page = response.context['applications']
+        self.assertEqual(len(page), 20)
+        self.assertEqual(page.paginator.count, 25)
+        response = self.client.get(reverse('all_applications'), {'cursor': page.next_cursor})
+        self.assertEqual(len(response.context['applications']), 5)
+
+
+class ApplicationStatsTests(TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter()
+        self.job = make_job(self.recruiter)
+        self.other_job = make_job(self.recruiter, title='Other')
+        self.students = [make_student(f'student{i}') for i in range(3)]
+
+    def recruiter_counts(self):
+        return RecruiterApplicationStats.objects.get(pk=self.recruiter.pk).counts()
+
+    def test_counters_follow_create_update_delete(self):
+        first = Application.objects.create(student=self.students[0], job=self.job)
+        Application.objects.create(student=self.students[1], job=self.job)
+        Application.objects.create(student=self.students[2], job=self.other_job)
+
+        self.client.force_login(self.recruiter.user)
+        self.client.get(reverse('update_application_status', args=[first.pk, Application.SELECTED]))
+
+        job_stats = JobApplicationStats.objects.get(pk=self.job.pk)
+        self.assertEqual((job_stats.pending, job_stats.selected, job_stats.total), (1, 1, 2))
+        self.assertEqual(self.recruiter_counts()[Application.PENDING], 2)
+        self.assertEqual(self.recruiter_counts()[Application.SELECTED], 1)
+
+        Application.objects.get(pk=first.pk).delete()
+        self.other_job.delete()
+        self.assertEqual(self.recruiter_counts()[Application.SELECTED], 0)
+        self.assertEqual(self.recruiter_counts()[Application.PENDING], 1)
+        self.assertEqual(find_drift(), [])
+
+    def test_rebuild_command_repairs_drift(self):
+        Application.objects.create(student=self.students[0], job=self.job)
+        # queryset.update() bypasses the signals
+        Application.objects.update(status=Application.REJECTED)
+        self.assertEqual(find_drift(), [('job', self.job.pk), ('recruiter', self.recruiter.pk)])
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_application_stats', '--check', stdout=StringIO())
+        call_command('rebuild_application_stats', stdout=StringIO())
+
+        self.assertEqual(find_drift(), [])
+        self.assertEqual(self.recruiter_counts()[Application.REJECTED], 1)
+
+
+class QueryPlanTests(TestCase):
+    def test_view_queries_use_indexes(self):
+        out = StringIO()
+        call_command('check_query_plans', '--seed', stdout=out)
+        self.assertIn('All canonical queries search an index', out.getvalue())
+
+    def test_index_scans_fail(self):
+        self.assertEqual(full_scans('SCAN functionality_job USING INDEX job_open_posted_idx\nUSE TEMP B-TREE FOR ORDER BY'), ['functionality_job'])
+        self.assertEqual(full_scans('SCAN U0 USING COVERING INDEX job_active_deadline_idx'), ['U0'])
+        self.assertEqual(full_scans('SEARCH functionality_job USING COVERING INDEX job_active_deadline_idx (is_active=? AND last_date_to_apply<?)'), [])
+        self.assertEqual(full_scans('SCAN functionality_job USING INDEX job_open_posted_idx', {'functionality_job'}), [])
+
+        # A bare is_active=True filter walks an index instead of searching one
+        unsearchable = Job.objects.filter(is_active=True, last_date_to_apply__lte=timezone.now()).order_by('last_date_to_apply')
+        with mock.patch.object(CheckQueryPlans, 'canonical_queries', return_value=[('unsearchable', unsearchable)]):
+            out = StringIO()
+            with self.assertRaises(CommandError):
+                call_command('check_query_plans', '--seed', stdout=out)
+        self.assertIn('unsearchable: full scan of functionality_job', out.getvalue())
+
+
+class SearchCacheTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        reset_cache_stats()
+        self.recruiter = make_recruiter()
+        self.job = make_job(self.recruiter, title='Python Developer', location='Pune')
+        make_job(self.recruiter, title='Old posting', location='Closed City', is_active=False)
+        self.client.force_login(make_student().user)
+
+    def search(self, **params):
+        response = self.client.get(reverse('search_job'), params)
+        return [job.title for job in response.context['jobs']], response
+
+    def test_repeated_search_is_served_from_cache(self):
+        self.search(search='python')
+        with CaptureQueriesContext(connection) as uncached:
+            self.search(search='developer')
+        with CaptureQueriesContext(connection) as cached:
+            titles, _ = self.search(search='developer')
+
+        self.assertEqual(titles, ['Python Developer'])
+        self.assertTrue(any('functionality_job_fts' in q['sql'] for q in uncached.captured_queries))
+        self.assertFalse(any('functionality_job_fts' in q['sql'] for q in cached.captured_queries))
+        self.assertEqual(cache_stats()['hits'], 3)
+
+    def test_job_changes_invalidate(self):
+        self.assertEqual(self.search(search='python')[0], ['Python Developer'])
+
+        make_job(self.recruiter, title='Python Tester')
+        self.assertEqual(self.search(search='python')[0], ['Python Tester', 'Python Developer'])
+
+        self.job.is_active = False
+        self.job.save()
+        self.assertEqual(self.search(search='python')[0], ['Python Tester'])
+
+    def test_location_facets_only_list_open_jobs(self):
+        _, response = self.search()
+        self.assertEqual(response.context['locations'], ['Pune'])
+
+    def test_file_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+            with self.settings(CACHES={**settings.CACHES, 'search': backend}):
+                self.assertEqual(self.search(search='python')[0], ['Python Developer'])
+                self.assertEqual(self.search(search='python')[0], ['Python Developer'])
+                # Second request hits both the facet and the page entry
+                self.assertEqual(cache_stats()['hits'], 2)
+
+    def test_stats_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get(reverse('search_cache_stats')).status_code, 302)
+        staff = CustomUser.objects.create_user(username='staff', email='staff@example.com', is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(set(self.client.get(reverse('search_cache_stats')).json()),
+                         {'hits', 'misses', 'hit_ratio', 'invalidations'})
+
+
+class ExportApplicationsTests(TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter()
+        self.job = make_job(self.recruiter, title='Backend Intern')
+        other_job = make_job(self.recruiter, title='Frontend Intern')
+        for i in range(3):
+            Application.objects.create(student=make_student(f'student{i}'), job=self.job)
+        Application.objects.create(student=make_student('other'), job=other_job, status=Application.SELECTED)
+        # Another recruiter's applicants must never be exported
+        Application.objects.create(student=make_student('foreign'), job=make_job(make_recruiter('globex', 'Globex')))
+        self.client.force_login(self.recruiter.user)
+
+    def export(self, **params):
+        response = self.client.get(reverse('export_applications'), params)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        rows = list(csv.DictReader(self.export(format='csv').splitlines()))
+        self.assertEqual(len(rows), 4)
+        self.assertNotIn('foreign', [row['username'] for row in rows])
+
+    def test_jsonl_honors_filters(self):
+        lines = self.export(format='jsonl', job=self.job.pk).splitlines()
+        self.assertEqual({json.loads(line)['job_title'] for line in lines}, {'Backend Intern'})
+        self.assertEqual(len(lines), 3)
+
+        lines = self.export(format='jsonl', status=Application.SELECTED).splitlines()
+        self.assertEqual([json.loads(line)['username'] for line in lines], ['other'])
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get(reverse('export_applications'), {'format': 'xml'}).status_code, 400)
+
+
+class BulkStatusTests(TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter()
+        job = make_job(self.recruiter)
+        self.applications = [
+            Application.objects.create(student=make_student(f'student{i}'), job=job) for i in range(5)
+        ]
+        self.applications[0].status = Application.SHORTLISTED_OA
+        self.applications[0].save()
+        self.foreign = Application.objects.create(
+            student=make_student('foreign'), job=make_job(make_recruiter('globex', 'Globex'))
+        )
+        self.client.force_login(self.recruiter.user)
+
+    def post_json(self, payload):
+        return self.client.post(
+            reverse('bulk_update_application_status'), json.dumps(payload), content_type='application/json'
+        )
+
+    def test_bulk_update_in_constant_queries(self):
+        ids = [app.pk for app in self.applications] + [self.foreign.pk, 999999]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post_json({'application_ids': ids, 'status': Application.SHORTLISTED_OA})
+
+        results = response.json()['results']
+        self.assertEqual(results[str(self.applications[0].pk)], 'unchanged')
+        self.assertEqual(results[str(self.applications[1].pk)], 'updated')
+        self.assertEqual(results[str(self.foreign.pk)], 'not_found')
+        self.assertEqual(results['999999'], 'not_found')
+        self.assertEqual(response.json()['updated'], 4)
+
+        self.assertEqual(Application.objects.filter(status=Application.SHORTLISTED_OA).count(), 5)
+        self.assertEqual(Application.objects.get(pk=self.foreign.pk).status, Application.PENDING)
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "functionality_application"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(find_drift(), [])
+
+    def test_several_jobs_in_constant_queries(self):
+        def select_all(job_count):
+            Application.objects.all().delete()
+            ids = []
+            for i in range(job_count):
+                job = make_job(self.recruiter, title=f'Job {i}')
+                ids += [Application.objects.create(student=make_student(f'j{job_count}-{i}-{n}'), job=job).pk for n in range(2)]
+            return ids
+
+        # Session, user, ownership read and application UPDATE, then one
+        # recruiter read and one UPDATE per counter table however many jobs
+        # there are (plus two savepoints each)
+        for job_count in (2, 5):
+            ids = select_all(job_count)
+            with self.assertNumQueries(11):
+                response = self.post_json({'application_ids': ids, 'status': Application.UNDER_REVIEW})
+            self.assertEqual(response.json()['updated'], 2 * job_count)
+            self.assertEqual(find_drift(), [])
+
+        # Jobs of different recruiters in one transition
+        other = Application.objects.create(student=make_student('other'), job=make_job(make_recruiter('initech', 'Initech')))
+        rows = Application.objects.filter(status=Application.UNDER_REVIEW).values_list('id', 'job_id', 'status')
+        rows = list(rows) + [(other.pk, other.job_id, other.status)]
+        self.assertEqual(len(transition_applications(rows, Application.REJECTED)), 11)
+        self.assertEqual(find_drift(), [])
+
+    def test_form_post_redirects_back(self):
+        response = self.client.post(
+            reverse('bulk_update_application_status') + '?status=pending',
+            {'application_ids': [self.applications[1].pk], 'status': Application.REJECTED},
+        )
+        self.assertRedirects(response, reverse('all_applications') + '?status=pending')
+        self.assertEqual(Application.objects.get(pk=self.applications[1].pk).status, Application.REJECTED)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.post_json({'application_ids': [1], 'status': 'hired'}).status_code, 400)
+        self.assertEqual(self.post_json({'application_ids': [], 'status': Application.SELECTED}).status_code, 400)
+        self.assertEqual(self.post_json({'application_ids': ['x'], 'status': Application.SELECTED}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('bulk_update_application_status')).status_code, 405)
+
+
+@override_settings(TASKS_ALWAYS_EAGER=True, MEDIA_ROOT=tempfile.mkdtemp())
+class CVUploadTests(TestCase):
+    def setUp(self):
+        self.student = make_student()
+        self.client.force_login(self.student.user)
+
+    def upload(self, name, content):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post(reverse('upload_cv'), {'cv': SimpleUploadedFile(name, content)})
+        self.assertRedirects(response, reverse('student_dashboard'), fetch_redirect_response=False)
+        self.student.refresh_from_db()
+        return callbacks
+
+    def test_upload_is_pending_until_checked(self):
+        content = b'%PDF-1.4\n1 0 obj\n<<>>\nendobj\nstartxref\n0\n%%EOF\n'
+        callbacks = self.upload('cv.pdf', content)
+
+        self.assertEqual(self.student.cv_status, Student.CV_PENDING)
+        self.assertEqual(self.student.cv_sha256, hashlib.sha256(content).hexdigest())
+
+        for callback in callbacks:
+            callback()
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.cv_status, Student.CV_VALID)
+
+    def test_sniffing_rejects_mismatched_or_broken_files(self):
+        for name, content in [
+            ('cv.pdf', b'MZ\x90\x00 not a pdf'),
+            ('cv.pdf', b'%PDF-1.4 truncated'),
+            ('cv.docx', b'%PDF-1.4\nstartxref\n%%EOF'),
+            ('cv.docx', b'PK\x03\x04 broken zip'),
+        ]:
+            for callback in self.upload(name, content):
+                callback()
+            self.student.refresh_from_db()
+            self.assertEqual(self.student.cv_status, Student.CV_INVALID, name)
+            self.assertTrue(self.student.cv_error)
+
+    def test_docx(self):
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('[Content_Types].xml', '<Types/>')
+            archive.writestr('word/document.xml', '<document/>')
+        for callback in self.upload('cv.docx', buffer.getvalue()):
+            callback()
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.cv_status, Student.CV_VALID)
+
+    def test_superseded_upload_is_ignored(self):
+        callbacks = self.upload('cv.pdf', b'not a pdf at all')
+        self.upload('cv.pdf', b'%PDF-1.4\nstartxref\n%%EOF')
+        # The first upload's task must not overwrite the state of the second
+        for callback in callbacks:
+            callback()
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.cv_status, Student.CV_PENDING)
+
+
+@override_settings(TASKS_ALWAYS_EAGER=True, MEDIA_ROOT=tempfile.mkdtemp())
+class CVStorageTests(TestCase):
+    content = b'%PDF-1.4\n' + b'x' * 100 + b'\nstartxref\n0\n%%EOF\n'
+
+    def setUp(self):
+        self.recruiter = make_recruiter()
+        self.job = make_job(self.recruiter)
+
+    def apply_with_cv(self, username, content):
+        student = make_student(username)
+        self.client.force_login(student.user)
+        self.client.post(reverse('upload_cv'), {'cv': SimpleUploadedFile('my resume.pdf', content)})
+        student.refresh_from_db()
+        return student, Application.objects.create(student=student, job=self.job)
+
+    def test_identical_uploads_share_one_blob(self):
+        first, _ = self.apply_with_cv('alice', self.content)
+        second, _ = self.apply_with_cv('bob', self.content)
+        sha256 = hashlib.sha256(self.content).hexdigest()
+        self.assertEqual(first.cv.name, f'cv_files/{sha256[:2]}/{sha256}.pdf')
+        self.assertEqual(second.cv.name, first.cv.name)
+
+    def test_gc_removes_only_unreferenced_blobs(self):
+        student, _ = self.apply_with_cv('alice', self.content)
+        old_name = student.cv.name
+        self.client.post(reverse('upload_cv'), {'cv': SimpleUploadedFile('new.pdf', self.content + b' ')})
+        student.refresh_from_db()
+
+        call_command('gc_cv_blobs', '--min-age=0', stdout=StringIO())
+        storage = student.cv.storage
+        self.assertFalse(storage.exists(old_name))
+        self.assertTrue(storage.exists(student.cv.name))
+
+    def test_download_validators_and_ranges(self):
+        student, application = self.apply_with_cv('alice', self.content)
+        self.client.force_login(self.recruiter.user)
+        url = reverse('download_cv', args=[application.pk])
+
+        response = self.client.get(url)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['ETag'], f'"{student.cv_sha256}"')
+        self.assertIn('alice_CV.pdf', response['Content-Disposition'])
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        partial = self.client.get(url, HTTP_RANGE='bytes=0-7')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(b''.join(partial.streaming_content), self.content[:8])
+        self.assertEqual(partial['Content-Range'], f'bytes 0-7/{len(self.content)}')
+
+        tail = self.client.get(url, HTTP_RANGE='bytes=-6')
+        self.assertEqual(b''.join(tail.streaming_content), self.content[-6:])
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=9999-').status_code, 416)
+
+    def test_sendfile_mode(self):
+        _, application = self.apply_with_cv('alice', self.content)
+        self.client.force_login(self.recruiter.user)
+        with self.settings(CV_SENDFILE_BACKEND='x-accel-redirect'):
+            response = self.client.get(reverse('download_cv', args=[application.pk]))
+        self.assertEqual(response.content, b'')
+        self.assertTrue(response['X-Accel-Redirect'].startswith('/protected-media/cv_files/'))
+
+    def test_job_cvs_zip(self):
+        self.apply_with_cv('alice', self.content)
+        _, rejected = self.apply_with_cv('bob', self.content + b'bob')
+        rejected.status = Application.REJECTED
+        rejected.save()
+        Application.objects.create(student=make_student('carol'), job=self.job)
+        self.client.force_login(self.recruiter.user)
+        url = reverse('download_job_cvs', args=[self.job.pk])
+
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(sorted(archive.namelist()), ['alice.pdf', 'bob.pdf'])
+        self.assertEqual(archive.read('alice.pdf'), self.content)
+        self.assertIsNone(archive.testzip())
+
+        response = self.client.get(url, {'status': Application.REJECTED})
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), ['bob.pdf'])
+
+        self.client.force_login(make_recruiter('other', 'Other Inc').user)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class SQLiteProfileTests(TestCase):
+    def test_production_pragmas(self):
+        with tempfile.TemporaryDirectory() as scratch:
+            handler = ConnectionHandler({'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(scratch, 'db.sqlite3'),
+                'OPTIONS': settings.SQLITE_PROFILES['production'],
+            }})
+            production = handler['default']
+            try:
+                with production.cursor() as cursor:
+                    pragmas = {}
+                    for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'temp_store'):
+                        cursor.execute(f'PRAGMA {pragma}')
+                        pragmas[pragma] = cursor.fetchone()[0]
+                self.assertEqual(pragmas, {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 20000, 'temp_store': 2})
+                # transaction.atomic() issues BEGIN IMMEDIATE
+                self.assertEqual(production.transaction_mode, 'IMMEDIATE')
+            finally:
+                production.close()
+
+
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter()
+        self.job = make_job(self.recruiter)
+        self.student = make_student()
+        self.student.cv = 'cv_files/alice.pdf'
+        self.student.save()
+
+    def test_router(self):
+        router = ReplicaRouter()
+        with self.settings(DATABASE_REPLICAS=['replica_1']):
+            self.assertIsNone(router.db_for_read(Job))
+            with reading_from_replicas():
+                self.assertEqual(router.db_for_read(Job), 'replica_1')
+                self.assertEqual(router.db_for_write(Job), 'default')
+            self.assertFalse(router.allow_migrate('replica_1', 'functionality'))
+            self.assertIsNone(router.allow_migrate('default', 'functionality'))
+
+    @override_settings(DATABASE_REPLICAS=['default'])
+    def test_read_your_writes_pin(self):
+        self.client.force_login(self.student.user)
+        with mock.patch('functionality.routers.random.choice', side_effect=lambda aliases: aliases[0]) as choice:
+            self.client.get(reverse('search_job'))
+            self.assertTrue(choice.called)
+            self.assertNotIn(PIN_COOKIE, self.client.cookies)
+
+            response = self.client.post(reverse('apply_job', args=[self.job.pk]), {'preference_order': 1})
+            self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], settings.REPLICA_PIN_SECONDS)
+
+            choice.reset_mock()
+            self.client.get(reverse('search_job'))
+            self.assertFalse(choice.called)
+
+
+class SyncReplicasTests(TransactionTestCase):
+    def test_sync_replicas(self):
+        self.job = make_job(make_recruiter())
+        with tempfile.TemporaryDirectory() as scratch:
+            path = os.path.join(scratch, 'replica.sqlite3')
+            call_command('sync_replicas', f'--to={path}', stdout=StringIO())
+            replica = sqlite3.connect(path)
+            try:
+                titles = [row[0] for row in replica.execute('SELECT title FROM functionality_job')]
+            finally:
+                replica.close()
+        self.assertEqual(titles, [self.job.title])
+
+
+class ApplyJobTests(TestCase):
+    def setUp(self):
+        self.job = make_job(make_recruiter())
+        self.student = make_student()
+        self.student.cv = 'cv_files/alice.pdf'
+        self.student.save()
+        self.client.force_login(self.student.user)
+
+    def apply(self, job_id):
+        response = self.client.post(reverse('apply_job', args=[job_id]), {'preference_order': 2})
+        if response.status_code == 404:
+            return None
+        return ' '.join(str(message) for message in get_messages(response.wsgi_request))
+
+    def test_outcomes(self):
+        self.assertEqual(self.apply(self.job.pk), f"Applied successfully for {self.job.title}!")
+        application = Application.objects.get()
+        # A requested rank is clamped to the student's list
+        self.assertEqual((application.student, application.job, application.preference_order), (self.student, self.job, 1))
+        self.assertLess(timezone.now() - application.applied_date, timedelta(minutes=1))
+        self.assertEqual(JobApplicationStats.objects.get(job=self.job).pending, 1)
+
+        self.assertIn("already applied", self.apply(self.job.pk))
+
+        closed = make_job(self.job.recruiter, title='Closed')
+        Job.objects.filter(pk=closed.pk).update(last_date_to_apply=timezone.now() - timedelta(minutes=1))
+        self.assertIn("no longer accepting", self.apply(closed.pk))
+        inactive = make_job(self.job.recruiter, title='Inactive', is_active=False)
+        self.assertIn("no longer accepting", self.apply(inactive.pk))
+        self.assertIsNone(self.apply(9999))
+        self.assertEqual(Application.objects.count(), 1)
+
+    def test_one_round_trip_for_the_insert(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(submit_application(self.student, self.job.pk), (APPLIED, self.job.title))
+        inserts = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+        self.assertNotIn('SELECT 1', ' '.join(q['sql'] for q in ctx.captured_queries))
+
+
+class ConcurrentApplyTests(TransactionTestCase):
+    # Only the inserts are under test; keep the fast-track engine off the worker threads
+    @mock.patch('functionality.views.queue_fast_track')
+    def test_parallel_applies(self, queue_fast_track):
+        job = make_job(make_recruiter())
+        students = [make_student(f'student-{i}') for i in range(8)]
+        # Every student fires three applies at once, all at the same job
+        attempts = [student for student in students for _ in range(3)]
+        barrier = threading.Barrier(len(attempts))
+        outcomes, errors = [], []
+
+        def apply(student):
+            try:
+                barrier.wait()
+                while True:
+                    try:
+                        outcomes.append(submit_application(student, job.pk)[0])
+                        break
+                    except OperationalError as e:
+                        # The shared-cache in-memory test database fails fast
+                        # on lock contention instead of waiting; try again
+                        if 'locked' not in str(e):
+                            raise
+                        time.sleep(0.001)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=apply, args=[student]) for student in attempts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(Counter(outcomes).items()), [(APPLIED, 8), (DUPLICATE, 16)])
+        self.assertEqual(Application.objects.filter(job=job).count(), 8)
+        self.assertEqual(JobApplicationStats.objects.get(job=job).pending, 8)
+
+
+class PreferenceRankingTests(TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter()
+        self.jobs = [make_job(self.recruiter, title=f'Job {i}') for i in range(5)]
+        self.student = make_student()
+
+    def ranks(self, student=None):
+        return list(
+            Application.objects.filter(student=student or self.student)
+            .order_by('preference_order').values_list('job__title', 'preference_order')
+        )
+
+    def test_new_applications_are_ranked_last_or_inserted(self):
+        for job in self.jobs[:3]:
+            self.assertEqual(submit_application(self.student, job.pk), (APPLIED, job.title))
+        self.assertEqual(submit_application(self.student, self.jobs[3].pk, preference_order=1), (APPLIED, 'Job 3'))
+        Application.objects.create(student=self.student, job=self.jobs[4])
+        self.assertEqual(self.ranks(), [('Job 3', 1), ('Job 0', 2), ('Job 1', 3), ('Job 2', 4), ('Job 4', 5)])
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Application.objects.create(student=self.student, job=make_job(self.recruiter), preference_order=2)
+
+    def test_move_uses_a_fixed_number_of_statements(self):
+        applications = [Application.objects.create(student=self.student, job=job) for job in self.jobs]
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(move_application(self.student, applications[4].pk, 2), 2)
+        self.assertEqual(len([q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]), 2)
+        self.assertEqual(self.ranks(), [('Job 0', 1), ('Job 4', 2), ('Job 1', 3), ('Job 2', 4), ('Job 3', 5)])
+
+        self.assertEqual(move_application(self.student, applications[0].pk, 99), 5)
+        self.assertEqual(self.ranks(), [('Job 4', 1), ('Job 1', 2), ('Job 2', 3), ('Job 3', 4), ('Job 0', 5)])
+        self.assertIsNone(move_application(make_student('bob'), applications[0].pk, 1))
+
+    def test_reorder_view(self):
+        applications = [Application.objects.create(student=self.student, job=job) for job in self.jobs[:3]]
+        self.client.force_login(self.student.user)
+        url = reverse('reorder_application', args=[applications[2].pk])
+
+        self.assertRedirects(self.client.post(url, {'rank': 1}), reverse('student_dashboard'), fetch_redirect_response=False)
+        self.assertEqual(self.ranks(), [('Job 2', 1), ('Job 0', 2), ('Job 1', 3)])
+
+        response = self.client.post(url, json.dumps({'rank': 3}), content_type='application/json')
+        self.assertEqual(response.json(), {'application_id': applications[2].pk, 'rank': 3})
+        self.assertEqual(self.client.post(url, json.dumps({'rank': 0}), content_type='application/json').status_code, 400)
+
+        self.client.force_login(make_student('bob').user)
+        self.assertEqual(self.client.post(url, json.dumps({'rank': 1}), content_type='application/json').status_code, 404)
+
+    def test_ranking_view(self):
+        job = self.jobs[0]
+        first_choice, third_choice, second_choice = make_student('first'), make_student('third'), make_student('second')
+        for student, rank in [(first_choice, 1), (third_choice, 3), (second_choice, 2)]:
+            for other in self.jobs[1:rank]:
+                Application.objects.create(student=student, job=other)
+            Application.objects.create(student=student, job=job)
+
+        self.client.force_login(self.recruiter.user)
+        response = self.client.get(reverse('job_ranking', args=[job.pk]))
+        self.assertEqual(
+            [(app.student, app.preference_order) for app in response.context['applications']],
+            [(first_choice, 1), (second_choice, 2), (third_choice, 3)],
+        )
+
+        self.client.force_login(make_recruiter('globex', 'Globex').user)
+        self.assertEqual(self.client.get(reverse('job_ranking', args=[job.pk])).status_code, 404)
+
+
+class FastTrackTests(TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter()
+        self.fast_job = make_job(self.recruiter, title='Fast', selection_type=Job.FAST_TRACK)
+        self.normal_job = make_job(self.recruiter, title='Normal')
+
+    def student(self, username, approved=True):
+        student = make_student(username)
+        student.cv = 'cv_files/cv.pdf'
+        student.cv_approved_status = approved
+        student.save()
+        return student
+
+    def test_state_machine_in_views(self):
+        application = Application.objects.create(student=self.student('alice'), job=self.normal_job, status=Application.SELECTED)
+        self.client.force_login(self.recruiter.user)
+        self.client.get(reverse('update_application_status', args=[application.pk, Application.PENDING]))
+        application.refresh_from_db()
+        self.assertEqual(application.status, Application.SELECTED)
+
+        other = Application.objects.create(student=self.student('bob'), job=self.normal_job)
+        response = self.client.post(
+            reverse('bulk_update_application_status'),
+            json.dumps({'application_ids': [application.pk, other.pk], 'status': Application.COMPLETED_OA}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.json()['results'], {str(application.pk): 'not_allowed', str(other.pk): 'not_allowed'})
+        self.assertTrue(Application.can_transition(Application.SHORTLISTED_OA, Application.COMPLETED_OA))
+        self.assertTrue(Application.can_transition(Application.REJECTED, Application.UNDER_REVIEW))
+
+    def test_listing_offers_only_allowed_moves(self):
+        selected = Application.objects.create(student=self.student('alice'), job=self.normal_job, status=Application.SELECTED)
+        self.assertEqual(selected.allowed_transitions, [])
+        in_oa = Application.objects.create(student=self.student('bob'), job=self.normal_job, status=Application.SHORTLISTED_OA)
+        self.assertEqual(in_oa.allowed_transitions, [Application.COMPLETED_OA, Application.REJECTED])
+
+        self.client.force_login(self.recruiter.user)
+        response = self.client.get(reverse('all_applications'))
+        self.assertContains(response, reverse('update_application_status', args=[in_oa.pk, Application.COMPLETED_OA]))
+        self.assertNotContains(response, reverse('update_application_status', args=[in_oa.pk, Application.UNDER_REVIEW]))
+        self.assertNotContains(response, reverse('update_application_status', args=[selected.pk, Application.REJECTED]))
+        self.assertEqual(response.context['bulk_statuses'], {Application.COMPLETED_OA, Application.REJECTED})
+        self.assertContains(response, '<option value="completed_oa">')
+        self.assertNotContains(response, '<option value="under_review">')
+
+    def test_engine_advances_only_eligible_applications(self):
+        fast = Application.objects.create(student=self.student('alice'), job=self.fast_job)
+        reviewed = Application.objects.create(student=self.student('bob'), job=self.fast_job, status=Application.UNDER_REVIEW)
+        unapproved = Application.objects.create(student=self.student('carol', approved=False), job=self.fast_job)
+        normal = Application.objects.create(student=self.student('dave'), job=self.normal_job)
+
+        self.assertEqual(run_fast_track(batch_size=1), 3)
+        statuses = dict(Application.objects.values_list('id', 'status'))
+        self.assertEqual(statuses, {
+            fast.pk: Application.SHORTLISTED_OA,
+            reviewed.pk: Application.SHORTLISTED_OA,
+            unapproved.pk: Application.PENDING,
+            normal.pk: Application.PENDING,
+        })
+        self.assertEqual(find_drift(), [])
+        self.assertEqual(run_fast_track(), 0)
+
+    @mock.patch('functionality.signals.queue_fast_track')
+    def test_only_approval_queues_a_pass(self, queue_fast_track):
+        student = self.student('alice', approved=False)
+        student.cv_approved_status = True
+        student.save()
+        self.assertEqual(queue_fast_track.call_count, 1)
+
+        # Later saves of the approved student don't
+        student.cgpa = Decimal('8.50')
+        student.save()
+        Student.objects.get(pk=student.pk).save()
+        self.assertEqual(queue_fast_track.call_count, 1)
+
+        student.cv_approved_status = False
+        student.save(update_fields=['cv_approved_status'])
+        student.cv_approved_status = True
+        student.save()
+        self.assertEqual(queue_fast_track.call_count, 2)
+
+    @override_settings(TASKS_ALWAYS_EAGER=True)
+    def test_apply_queues_a_pass(self):
+        student = self.student('alice')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(submit_application(student, self.fast_job.pk), (APPLIED, 'Fast'))
+        self.assertEqual(Application.objects.get(student=student).status, Application.SHORTLISTED_OA)
+
+        # Approving a CV later picks up the waiting application
+        waiting = self.student('bob', approved=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            submit_application(waiting, self.fast_job.pk)
+        self.assertEqual(Application.objects.get(student=waiting).status, Application.PENDING)
+        with self.captureOnCommitCallbacks(execute=True):
+            waiting.cv_approved_status = True
+            waiting.save()
+        self.assertEqual(Application.objects.get(student=waiting).status, Application.SHORTLISTED_OA)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('advance_fast_track', '--seed=20', stdout=out)
+        # 16 approved students, two automatic stages each; all rolled back
+        self.assertIn('32 transitions', out.getvalue())
+        self.assertFalse(Application.objects.exists())
+
+
+class SchedulerTests(TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter()
+        self.open_job = make_job(self.recruiter, title='Open')
+        self.expired_job = make_job(self.recruiter, title='Expired', last_date_to_apply=timezone.now() - timedelta(days=1))
+        self.old_job = make_job(
+            self.recruiter, title='Old', is_active=False, last_date_to_apply=timezone.now() - timedelta(days=200),
+        )
+
+    def test_close_expired_jobs(self):
+        reset_cache_stats()
+        self.assertEqual(close_expired_jobs(batch_size=1), 1)
+        self.assertEqual(
+            dict(Job.objects.values_list('title', 'is_active')),
+            {'Open': True, 'Expired': False, 'Old': False},
+        )
+        # The cached search pages were dropped
+        self.assertGreater(cache_stats()['invalidations'], 0)
+        self.assertEqual(close_expired_jobs(), 0)
+
+    def test_archive_applications(self):
+        alice, bob = make_student('alice'), make_student('bob')
+        old = [
+            Application.objects.create(student=alice, job=self.old_job, status=Application.SELECTED),
+            Application.objects.create(student=bob, job=self.old_job),
+        ]
+        recent = Application.objects.create(student=alice, job=self.expired_job)
+        self.expired_job.is_active = False
+        self.expired_job.save()
+
+        self.assertEqual(archive_applications(older_than_days=90, batch_size=1), 2)
+        self.assertEqual(list(Application.objects.values_list('id', flat=True)), [recent.pk])
+        archived = ArchivedApplication.objects.get(pk=old[0].pk)
+        self.assertEqual((archived.student_id, archived.status), (alice.pk, Application.SELECTED))
+        # The counters still include archived applications, and rebuilding agrees
+        self.assertEqual(JobApplicationStats.objects.get(job=self.old_job).total, 2)
+        self.assertEqual(RecruiterApplicationStats.objects.get(recruiter=self.recruiter).selected, 1)
+        self.assertEqual(find_drift(), [])
+        self.assertEqual(archive_applications(older_than_days=90), 0)
+
+        # Archived applications no longer hold a rank
+        self.assertEqual(Application.objects.create(student=bob, job=self.open_job).preference_order, 1)
+
+        self.old_job.delete()
+        self.assertFalse(ArchivedApplication.objects.exists())
+        self.assertEqual(find_drift(), [])
+
+    def test_run_pending(self):
+        clock = mock.Mock(return_value=100.0)
+        next_runs = {}
+        with mock.patch.dict('functionality.scheduler.TASKS', archive_applications=lambda batch_size: 1 / 0), \
+                self.assertLogs('functionality.scheduler', 'ERROR'):
+            results = run_pending(next_runs, clock=clock)
+        self.assertEqual(results, {'close_expired_jobs': 1, 'archive_applications': None, 'fast_track': 0})
+        self.assertEqual(next_runs['close_expired_jobs'], 100.0 + settings.SCHEDULER_INTERVALS['close_expired_jobs'])
+        # Nothing is due until its interval has passed
+        self.assertEqual(run_pending(next_runs, clock=clock), {})
+        clock.return_value = next_runs['close_expired_jobs']
+        self.assertEqual(list(run_pending(next_runs, clock=clock)), ['close_expired_jobs'])
+
+
+class EligibilityTests(TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter()
+
+    def student(self, username, cgpa=None, year=None, skills=()):
+        student = make_student(username)
+        student.cgpa, student.graduation_year = cgpa, year
+        student.save()
+        student.skills.set(Skill.for_names(skills))
+        return student
+
+    def job(self, title, skills=(), **criteria):
+        job = make_job(self.recruiter, title=title, **criteria)
+        job.required_skills.set(Skill.for_names(skills))
+        return job
+
+    def pairs(self):
+        return set(Eligibility.objects.values_list('student__user__username', 'job__title'))
+
+    def test_matching(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student('alice', cgpa='8.50', year=2027, skills=['python', 'sql'])
+            self.student('bob', cgpa='6.00', year=2026, skills=['python'])
+            self.student('carol')
+            self.job('Anyone')
+            self.job('Strict', skills=['python', 'sql'], min_cgpa='7.5', min_graduation_year=2027, max_graduation_year=2028)
+            self.job('Python', skills=['python'])
+            self.job('Closed', is_active=False)
+        expected = {
+            ('alice', 'Anyone'), ('bob', 'Anyone'), ('carol', 'Anyone'),
+            ('alice', 'Strict'), ('alice', 'Python'), ('bob', 'Python'),
+        }
+        self.assertEqual(self.pairs(), expected)
+
+        # Profile changes are picked up on commit
+        bob = Student.objects.get(user__username='bob')
+        with self.captureOnCommitCallbacks(execute=True):
+            bob.skills.add(*Skill.for_names(['sql']))
+            bob.cgpa, bob.graduation_year = '9.00', 2028
+            bob.save()
+        self.assertIn(('bob', 'Strict'), self.pairs())
+
+        Eligibility.objects.all().delete()
+        self.assertEqual(rebuild_eligibility(), 7)
+
+    def test_skill_side_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student('alice', skills=['python'])
+            self.student('bob', skills=['python'])
+            self.job('Python', skills=['python'])
+        python = Skill.for_names(['python'])[0]
+        self.assertEqual(self.pairs(), {('alice', 'Python'), ('bob', 'Python')})
+
+        # A clear() from the skill's side has no pk_set; the rows it removes are noted first
+        with self.captureOnCommitCallbacks(execute=True):
+            python.student_set.clear()
+        self.assertEqual(self.pairs(), set())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            python.student_set.add(Student.objects.get(user__username='alice'))
+        self.assertEqual(self.pairs(), {('alice', 'Python')})
+        with self.captureOnCommitCallbacks(execute=True):
+            python.job_set.clear()
+        self.assertEqual(self.pairs(), {('alice', 'Python'), ('bob', 'Python')})
+
+    def test_search_and_screening(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            alice = self.student('alice', cgpa='8.00', skills=['python'])
+            bob = self.student('bob', cgpa='5.00', skills=['python'])
+            job = self.job('Backend', skills=['python'], min_cgpa='7')
+            self.job('Design', skills=['figma'])
+        self.client.force_login(bob.user)
+        response = self.client.get(reverse('search_job'), {'eligible': '1'})
+        self.assertEqual(list(response.context['jobs']), [])
+        self.client.force_login(alice.user)
+        response = self.client.get(reverse('search_job'), {'eligible': '1'})
+        self.assertEqual([j.title for j in response.context['jobs']], ['Backend'])
+        self.assertEqual(response.context['eligible_job_ids'], {job.pk})
+
+        for student, status in [(alice, Application.PENDING), (bob, Application.UNDER_REVIEW)]:
+            Application.objects.create(student=student, job=job, status=status)
+        carol = self.student('carol')
+        Application.objects.create(student=carol, job=job, status=Application.SHORTLISTED_INTERVIEW)
+        self.assertEqual(eligible_applicants(job), {alice.pk})
+
+        self.client.force_login(self.recruiter.user)
+        response = self.client.get(reverse('job_ranking', args=[job.pk]))
+        self.assertEqual(response.context['eligible_student_ids'], {alice.pk})
+        self.client.post(reverse('reject_ineligible_applications', args=[job.pk]))
+        statuses = dict(Application.objects.values_list('student_id', 'status'))
+        # Applicants past screening are left to the recruiter
+        self.assertEqual(statuses, {
+            alice.pk: Application.PENDING, bob.pk: Application.REJECTED, carol.pk: Application.SHORTLISTED_INTERVIEW,
+        })
+        self.assertEqual(find_drift(), [])
+        self.assertEqual(reject_ineligible(job), 0)
+
+    def test_forms_save_skills(self):
+        self.client.force_login(self.recruiter.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('create_job'), {
+                'title': 'Data Intern', 'position': 'Intern', 'location': 'Remote', 'description': '-',
+                'criteria': 'Python and SQL', 'selection_type': Job.NORMAL, 'is_active': 'on',
+                'last_date_to_apply': (timezone.now() + timedelta(days=5)).strftime('%Y-%m-%dT%H:%M'),
+                'min_cgpa': '7', 'required_skills': 'Python,  sql , python',
+            })
+        job = Job.objects.get(title='Data Intern')
+        self.assertEqual(sorted(job.required_skills.values_list('name', flat=True)), ['python', 'sql'])
+
+        student = make_student('alice')
+        self.client.force_login(student.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('edit_profile'), {
+                'username': 'alice', 'email': 'alice@example.com', 'cgpa': '7.25', 'graduation_year': '2027',
+                'skills': 'SQL, Python, Go',
+            })
+        student.refresh_from_db()
+        self.assertEqual(student.cgpa, Decimal('7.25'))
+        self.assertEqual(sorted(student.skills.values_list('name', flat=True)), ['go', 'python', 'sql'])
+        self.assertEqual(self.pairs(), {('alice', 'Data Intern')})
+
+
+class AsyncViewTests(TestCase):
+    """The async listing views, routed as under ASGI, render what the sync ones do."""
+
+    def setUp(self):
+        self.recruiter = make_recruiter()
+        self.student = make_student()
+        self.jobs = [make_job(self.recruiter, title=f'Job {i}', location=f'City {i % 2}') for i in range(12)]
+        for job in self.jobs[:3]:
+            Application.objects.create(student=self.student, job=job)
+
+    def route_async(self, enabled):
+        # The URLconfs pick the views at import time
+        import authentication.urls
+        import functionality.urls
+        import InternSync.urls
+        with override_settings(ASYNC_VIEWS=enabled):
+            for module in (authentication.urls, functionality.urls, InternSync.urls):
+                importlib.reload(module)
+        clear_url_caches()
+
+    def render_both(self, user, name, params=None):
+        self.client.force_login(user)
+        expected = self.client.get(reverse(name), params)
+        self.route_async(True)
+        self.addCleanup(self.route_async, False)
+        self.async_client.force_login(user)
+        response = async_to_sync(self.async_client.get)(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(asyncio.iscoroutinefunction(response.resolver_match.func))
+        return expected, response
+
+    def test_search_job(self):
+        expected, response = self.render_both(self.student.user, 'search_job', {'location': 'City 1'})
+        self.assertEqual(list(response.context['jobs']), list(expected.context['jobs']))
+        self.assertEqual(response.context['jobs'].next_cursor, expected.context['jobs'].next_cursor)
+        self.assertEqual(response.context['locations'], ['City 0', 'City 1'])
+        self.assertEqual(response.context['applied_job_ids'], expected.context['applied_job_ids'])
+        self.assertEqual(expected.context['applied_job_ids'], {job.pk for job in self.jobs[:3]})
+
+    def test_all_applications(self):
+        expected, response = self.render_both(self.recruiter.user, 'all_applications')
+        self.assertEqual(list(response.context['applications']), list(expected.context['applications']))
+        self.assertEqual(response.context['applications'].paginator.count, 3)
+        self.assertEqual(len(response.context['jobs']), 12)
+
+    def test_dashboards(self):
+        expected, response = self.render_both(self.recruiter.user, 'recruiter_dashboard')
+        self.assertEqual(response.context['stats'], expected.context['stats'])
+        self.assertEqual(list(response.context['recent_applications']), list(expected.context['recent_applications']))
+        response = async_to_sync(self.async_client.get)(reverse('student_dashboard'))
+        self.assertRedirects(response, f"{reverse('login')}?next={reverse('student_dashboard')}", fetch_redirect_response=False)
+
+        expected, response = self.render_both(self.student.user, 'student_dashboard')
+        self.assertEqual(response.context['stats'], expected.context['stats'])
+        self.assertEqual(list(response.context['applications']), list(expected.context['applications']))
+        self.assertEqual(response.context['archived_applications'], expected.context['archived_applications'])
+        self.assertEqual(response.context['stats']['applications_count'], 3)
+
+    def test_metrics(self):
+        # The async ORM's queries are counted against the request too
+        reset_metrics()
+        self.route_async(True)
+        self.addCleanup(self.route_async, False)
+        self.async_client.force_login(self.student.user)
+        response = async_to_sync(self.async_client.get)(reverse('search_job'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(metric_value('internsync_request_duration_seconds_count', 'search_job'), 1)
+        self.assertGreater(metric_value('internsync_request_db_queries_sum', 'search_job'), 0)
+        self.assertGreater(metric_value('internsync_request_template_duration_seconds_sum', 'search_job'), 0)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class GenerateDataTests(TestCase):
+    def generate(self, **options):
+        options = dict({'students': 30, 'recruiters': 3, 'jobs': 12, 'cv_files': 2, 'batch_size': 7}, **options)
+        call_command('generate_data', stdout=StringIO(), **options)
+
+    def test_generate_data(self):
+        self.generate()
+        self.assertEqual(Student.objects.filter(user__username__startswith='synthetic-').count(), 30)
+        self.assertEqual(Recruiter.objects.count(), 3)
+        self.assertEqual(Job.objects.count(), 12)
+        self.assertTrue(Application.objects.exists())
+        # Ranks run 1..n per student, as if the students had applied one by one
+        for student_id in Application.objects.values_list('student_id', flat=True).distinct():
+            ranks = list(
+                Application.objects.filter(student_id=student_id)
+                .order_by('preference_order').values_list('preference_order', flat=True)
+            )
+            self.assertEqual(ranks, list(range(1, len(ranks) + 1)))
+        # The counters, search index and eligibility index were rebuilt
+        self.assertEqual(find_drift(), [])
+        job = Job.objects.first()
+        self.assertIn(job, get_search_backend().search(Job.objects.all(), job.title))
+        self.assertTrue(Eligibility.objects.exists())
+        self.assertFalse(Eligibility.objects.filter(job__is_active=False).exists())
+        student = Student.objects.exclude(cv='').first()
+        self.assertTrue(student.cv.storage.exists(student.cv.name))
+
+    def test_prefix_in_use(self):
+        self.generate(students=2, jobs=1)
+        with self.assertRaisesMessage(CommandError, 'pick another --prefix'):
+            self.generate(students=2, jobs=1)
+        self.generate(students=2, jobs=1, prefix='second')
+        self.assertEqual(Student.objects.count(), 4)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class BenchmarkTests(TestCase):
+    def test_every_url_has_a_scenario(self):
+        self.assertEqual(missing_scenarios(), [])
+
+    def test_benchmark_urls(self):
+        call_command('generate_data', students=20, recruiters=2, jobs=20, cv_files=1, seed=3, stdout=StringIO())
+        with tempfile.TemporaryDirectory() as scratch:
+            path = os.path.join(scratch, 'baseline.json')
+            out = StringIO()
+            call_command('benchmark_urls', requests=2, warmup=1, baseline=path, save=True, stdout=out)
+            baseline = json.loads(open(path).read())
+            self.assertEqual(set(baseline['endpoints']), set(SCENARIOS))
+            self.assertEqual(baseline['volumes']['students'], 20)
+
+            # The benchmark leaves the data as it was
+            self.assertFalse(CustomUser.objects.filter(is_staff=True).exists())
+            self.assertEqual(find_drift(), [])
+
+            call_command('benchmark_urls', requests=2, warmup=1, baseline=path, threshold=10, min_delta_ms=1000, stdout=out)
+            self.assertIn('No regressions', out.getvalue())
+
+            # A baseline that needed fewer queries fails the run
+            baseline['endpoints']['search_job']['queries'] = 0
+            with open(path, 'w') as f:
+                json.dump(baseline, f)
+            with self.assertRaisesMessage(CommandError, '1 regressions'):
+                call_command('benchmark_urls', requests=2, warmup=1, baseline=path, threshold=10, min_delta_ms=1000, stdout=StringIO())
+
+    def test_compare(self):
+        baseline = {'endpoints': {'search_job': {'p95_ms': 10.0, 'queries': 3}}}
+        self.assertEqual(compare({'search_job': {'p95_ms': 12.0, 'queries': 3}}, baseline), [])
+        self.assertEqual(
+            compare({'search_job': {'p95_ms': 20.0, 'queries': 4}}, baseline),
+            ['search_job: 3 -> 4 queries per request', 'search_job: p95 10.0ms -> 20.0ms'],
+        )
+        # Small absolute changes are jitter, and new URLs have nothing to compare with
+        self.assertEqual(compare({'search_job': {'p95_ms': 11.5, 'queries': 3}}, baseline, threshold=0.1), [])
+        self.assertEqual(compare({'login': {'p95_ms': 50.0, 'queries': 9}}, baseline), [])
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        reset_metrics()
+        self.recruiter = make_recruiter()
+        self.student = make_student()
+        self.job = make_job(self.recruiter)
+        Application.objects.create(student=self.student, job=self.job)
+
+    def test_records_each_view(self):
+        self.client.force_login(self.recruiter.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('recruiter_dashboard'))
+        self.assertEqual(metric_value('internsync_request_duration_seconds_count', 'recruiter_dashboard'), 1)
+        self.assertEqual(metric_value('internsync_request_db_queries_sum', 'recruiter_dashboard'), len(ctx.captured_queries))
+        self.assertGreater(metric_value('internsync_request_db_duration_seconds_sum', 'recruiter_dashboard'), 0)
+        self.assertGreater(metric_value('internsync_request_template_duration_seconds_sum', 'recruiter_dashboard'), 0)
+        self.assertEqual(metric_value('internsync_response_size_bytes_sum', 'recruiter_dashboard'), len(response.content))
+        self.assertEqual(metric_value('internsync_responses_total', 'recruiter_dashboard', status=200), 1)
+
+        # Streamed responses are recorded once they have been read, with the
+        # queries that ran while the body was produced
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('export_applications'))
+            self.assertIsNone(metric_value('internsync_request_duration_seconds_count', 'export_applications'))
+            body = b''.join(response.streaming_content)
+        self.assertEqual(metric_value('internsync_response_size_bytes_sum', 'export_applications'), len(body))
+        self.assertEqual(metric_value('internsync_request_db_queries_sum', 'export_applications'), len(ctx.captured_queries))
+        self.assertEqual(len(body.splitlines()), 2)
+
+        self.client.get('/no-such-page/')
+        self.assertEqual(metric_value('internsync_responses_total', 'unresolved', status=404), 1)
+
+    def test_file_response_is_not_wrapped(self):
+        # The file stays available to the server's wsgi.file_wrapper
+        fileobj = BytesIO(b'%PDF-1.4 cv')
+        fileobj.name = 'cv.pdf'
+        response = MetricsMiddleware(lambda request: FileResponse(fileobj))(RequestFactory().get('/cv/'))
+        self.assertIs(response.file_to_stream, fileobj)
+        self.assertIsNone(metric_value('internsync_response_size_bytes_count', 'unresolved'))
+        response.close()
+        self.assertEqual(metric_value('internsync_response_size_bytes_sum', 'unresolved'), len(b'%PDF-1.4 cv'))
+
+    @override_settings(METRICS_TOKEN='scrape-me')
+    def test_endpoint_access(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.client.force_login(self.student.user)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-me')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('# TYPE internsync_request_duration_seconds histogram', response.content.decode())
+
+        staff = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', role=CustomUser.ADMIN, is_staff=True,
+        )
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    @override_settings(SLOW_REQUEST_MS=1, SLOW_REQUEST_QUERIES=2)
+    def test_slow_request_log(self):
+        self.client.force_login(self.recruiter.user)
+        with mock.patch('functionality.metrics.time.perf_counter', side_effect=itertools.count(step=0.01)), \
+                self.assertLogs('functionality.metrics', 'WARNING') as logs:
+            self.client.get(reverse('all_applications'))
+        message = logs.output[0]
+        self.assertIn('Slow request GET /applications/all/ (all_applications)', message)
+        # Only the slowest statements are kept
+        self.assertEqual(message.count(' ms: '), 2)
+        self.assertIn('SELECT', message)
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        caches['fragments'].clear()
+        self.recruiter = make_recruiter()
+        self.student = make_student()
+        self.job = make_job(self.recruiter, description=' '.join(f'word{i}' for i in range(200)))
+
+    def test_job_card(self):
+        self.client.force_login(self.student.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('search_job'))
+        self.assertContains(response, 'word29 …')
+        self.assertNotContains(response, 'word30')
+        # Only the preview of the description is read
+        job_queries = [q['sql'] for q in ctx.captured_queries if 'FROM "functionality_job"' in q['sql']]
+        self.assertTrue(job_queries)
+        for sql in job_queries:
+            self.assertNotIn('"functionality_job"."criteria"', sql)
+            self.assertNotIn(', "functionality_job"."description"', sql)
+
+        # An update that leaves updated_at alone is still served from the fragment
+        Job.objects.filter(pk=self.job.pk).update(position='Changed')
+        invalidate_jobs()
+        self.assertNotContains(self.client.get(reverse('search_job')), 'Changed')
+        # A saved edit moves the card to a new key
+        self.job.refresh_from_db()
+        self.job.save()
+        self.assertContains(self.client.get(reverse('search_job')), 'Changed')
+
+    def test_application_rows(self):
+        application = Application.objects.create(student=self.student, job=self.job)
+        self.client.force_login(self.recruiter.user)
+        for name in ('all_applications', 'recruiter_dashboard'):
+            self.assertContains(self.client.get(reverse(name)), 'badge bg-info text-dark">New<')
+
+        # Bulk transitions bump updated_at along with the status
+        self.client.post(reverse('bulk_update_application_status'), {
+            'application_ids': [application.pk], 'status': Application.UNDER_REVIEW,
+        })
+        for name in ('all_applications', 'recruiter_dashboard'):
+            response = self.client.get(reverse(name))
+            self.assertContains(response, 'badge bg-secondary">Under Review<')
+            self.assertNotContains(response, 'badge bg-info text-dark">New<')
+
+        # So does a single-row change, including on the page it renders
+        response = self.client.get(reverse('update_application_status', args=[application.pk, Application.SHORTLISTED_OA]))
+        self.assertContains(response, 'badge bg-primary">Shortlisted<')
+        self.assertNotContains(response, 'badge bg-secondary">Under Review<')
+        response = self.client.get(reverse('recruiter_dashboard'))
+        self.assertContains(response, 'badge bg-primary">Shortlisted<')
@@ -0,0 +1,118 @@
+# uploads.py
+#
+# CV upload pipeline. HashingFileUploadHandler (see FILE_UPLOAD_HANDLERS)
+# streams every upload to a temporary file chunk by chunk and hashes it on the
+# way, so FileSystemStorage can move it into place without reading it again.
+# The content checks (magic bytes, PDF/DOCX structure) run afterwards on the
+# background queue while the Student sits in the "pending" CV state.
+import hashlib
+import zipfile
+
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+
+from authentication.cache import invalidate_user
+from authentication.models import Student
+from .storage import file_sha256
+from .tasks import enqueue
+
+PDF_MAGIC = b'%PDF-'
+ZIP_MAGIC = b'PK\x03\x04'
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# How far from the end of a PDF the trailer may sit
+PDF_TRAILER_WINDOW = 2048
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.hasher.hexdigest()
+        return uploaded
+
+
+class CVValidationError(Exception):
+    pass
+
+
+def sniff_type(header):
+    if header.startswith(PDF_MAGIC):
+        return 'pdf'
+    if header.startswith(ZIP_MAGIC):
+        return 'docx'
+    if header.startswith(OLE_MAGIC):
+        return 'doc'
+    return None
+
+
+def check_pdf(fileobj):
+    fileobj.seek(0, 2)
+    size = fileobj.tell()
+    fileobj.seek(max(0, size - PDF_TRAILER_WINDOW))
+    trailer = fileobj.read()
+    if b'%%EOF' not in trailer or b'startxref' not in trailer:
+        raise CVValidationError("The PDF is truncated or damaged.")
+
+
+def check_docx(fileobj):
+    fileobj.seek(0)
+    try:
+        with zipfile.ZipFile(fileobj) as archive:
+            names = set(archive.namelist())
+            if '[Content_Types].xml' not in names or 'word/document.xml' not in names:
+                raise CVValidationError("The file is not a Word document.")
+            if archive.testzip() is not None:
+                raise CVValidationError("The Word document is damaged.")
+    except zipfile.BadZipFile:
+        raise CVValidationError("The Word document is damaged.")
+
+
+def check_cv_file(fileobj, name):
+    """Raise CVValidationError unless the content really is the document its name claims."""
+    fileobj.seek(0)
+    kind = sniff_type(fileobj.read(8))
+    if kind is None:
+        raise CVValidationError("The file is not a PDF or Word document.")
+    if not name.lower().endswith(f'.{kind}'):
+        raise CVValidationError(f"The file content is {kind.upper()}, which does not match its extension.")
+    if kind == 'pdf':
+        check_pdf(fileobj)
+    elif kind == 'docx':
+        check_docx(fileobj)
+    return kind
+
+
+def validate_cv(student_id, sha256):
+    # Only act on the upload this task was queued for; a newer upload has its own task
+    student = Student.objects.filter(pk=student_id, cv_sha256=sha256).first()
+    if student is None or not student.cv:
+        return None
+    try:
+        with student.cv.open('rb') as fileobj:
+            check_cv_file(fileobj, student.cv.name)
+        status, error = Student.CV_VALID, ''
+    except CVValidationError as e:
+        status, error = Student.CV_INVALID, str(e)
+    except OSError:
+        status, error = Student.CV_INVALID, "The uploaded file could not be read."
+    Student.objects.filter(pk=student_id, cv_sha256=sha256).update(cv_status=status, cv_error=error[:200])
+    invalidate_user(student_id)
+    return status
+
+
+def queue_cv_validation(student, uploaded_file):
+    """Put the student's freshly saved CV in the pending state and check it in the background."""
+    sha256 = getattr(uploaded_file, 'sha256', None) or file_sha256(uploaded_file)
+    student.cv_status = Student.CV_PENDING
+    student.cv_sha256 = sha256
+    student.cv_error = ''
+    student.save(update_fields=['cv_status', 'cv_sha256', 'cv_error'])
+    transaction.on_commit(lambda: enqueue(validate_cv, student.pk, sha256))
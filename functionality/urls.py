@@ -1,15 +1,28 @@
 # urls.py
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Native async versions under ASGI (see settings.ASYNC_VIEWS)
+search_job = views.search_job_async if settings.ASYNC_VIEWS else views.search_job
+all_applications = views.all_applications_async if settings.ASYNC_VIEWS else views.all_applications
+
 urlpatterns = [
     path('upload_cv/',views.upload_cv,name='upload_cv'),
     path('create_job/',views.create_job,name='create_job'),
-    path('search_job/',views.search_job,name='search_job'),
+    path('search_job/',search_job,name='search_job'),
+    path('search_job/cache-stats/',views.search_cache_stats,name='search_cache_stats'),
+    path('metrics/', views.metrics, name='metrics'),
     path('apply_job/<int:job_id>',views.apply_job,name='apply_job'),
     path('applications/update-status/<int:application_id>/<str:new_status>/', views.update_application_status, name='update_application_status'),
-    path('applications/all/', views.all_applications, name='all_applications'),
+    path('applications/all/', all_applications, name='all_applications'),
+    path('applications/bulk-status/', views.bulk_update_application_status, name='bulk_update_application_status'),
+    path('applications/export/', views.export_applications, name='export_applications'),
     path('applications/update-status/<int:application_id>/<str:new_status>/', views.update_application_status, name='update_application_status'),
     path('applications/cv/<int:application_id>/', views.download_cv, name='download_cv'),
+    path('jobs/<int:job_id>/cvs.zip', views.download_job_cvs, name='download_job_cvs'),
+    path('jobs/<int:job_id>/ranking/', views.job_ranking, name='job_ranking'),
+    path('jobs/<int:job_id>/reject-ineligible/', views.reject_ineligible_applications, name='reject_ineligible_applications'),
+    path('applications/<int:application_id>/preference/', views.reorder_application, name='reorder_application'),
     
 ]
\ No newline at end of file
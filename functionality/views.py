@@ -1,42 +1,68 @@
+import asyncio
+import csv
+import itertools
+import json
+import os
+
+from django.conf import settings
 from django.shortcuts import render,redirect,get_object_or_404
 from authentication.decorators import student_required,recruiter_required
+from authentication.forms import save_changed
 from django.contrib import messages
-from django.http import HttpResponseForbidden, FileResponse
+from django.http import Http404, HttpResponse, HttpResponseForbidden, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import IntegrityError, connection, transaction
+from django.urls import reverse
+from django.views.decorators.http import require_POST
 from .forms import CVUploadForm
-from .models import Job, Application
+from .fragments import application_rows, job_cards
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
+from .models import Job, Application, Eligibility
 from .forms import JobCreationForm, JobApplicationForm
-from django.db.models import Q
-from django.core.paginator import Paginator
+from .cache import aget_job_page, aget_location_facets, cache_stats, get_job_page, get_location_facets
+from .downloads import serve_file, stream_zip
+from .eligibility import eligible_applicants, reject_ineligible
+from .pagination import CursorPaginator
+from .pipeline import queue_fast_track, transition_applications
+from .preferences import move_application
+from .routers import replica_reads
+from .search import get_search_backend
+from .stats import apply_status_deltas
+from .storage import get_cv_storage
+from .uploads import queue_cv_validation
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.text import slugify
 
 @student_required
-def upload_cv(request):
+def upload_cv(request, student):
     if request.method == 'POST':
-        form = CVUploadForm(request.POST, request.FILES, instance=request.user.student)
+        form = CVUploadForm(request.POST, request.FILES, instance=student)
         if form.is_valid():
-            form.save()
-            messages.success(request, 'Your CV has been uploaded successfully!')
+            # Only the cv column: the profile may be the cached copy
+            student = save_changed(form)
+            # Content checks run in the background; the CV shows as pending until then
+            queue_cv_validation(student, form.cleaned_data['cv'])
+            messages.success(request, 'Your CV has been uploaded and is being checked.')
             return redirect('student_dashboard')  # Redirect to appropriate page after successful upload
         else:
             # Form validation errors will be displayed on the page
             pass
     else:
-        form = CVUploadForm(instance=request.user.student)
+        form = CVUploadForm(instance=student)
     
     return render(request, 'upload_cv.html', {'form': form})
 
 @recruiter_required
-def create_job(request):
-    if not request.user.is_recruiter():
-        messages.error(request, "Access denied. Only recruiters can post jobs.")
-        return redirect('home')
-    
+def create_job(request, recruiter):
     if request.method == 'POST':
         form = JobCreationForm(request.POST)
         if form.is_valid():
             job = form.save(commit=False)
-            job.recruiter = request.user.recruiter
+            job.recruiter = recruiter
             job.save()
+            form.save_m2m()
             messages.success(request, "Job posted successfully!")
             return redirect('recruiter_dashboard')  # Redirect to recruiter dashboard
     else:
@@ -44,93 +70,218 @@ def create_job(request):
     
     return render(request, 'create_job.html', {'form': form})
 
-@student_required
-def search_job(request):
-    if not request.user.is_student():
-        messages.error(request, "Access denied. Only students can search for jobs.")
-        return redirect('home')
-    
+def search_filters(request):
+    return {
+        'search': request.GET.get('search', ''),
+        'location': request.GET.get('location', ''),
+        'selection_type': request.GET.get('selection_type', ''),
+    }
+
+
+def job_search_paginator(student, filters, eligible_only):
     jobs = Job.objects.filter(is_active=True, last_date_to_apply__gt=timezone.now())
-    
-    # Get all unique locations for the filter dropdown
-    locations = Job.objects.values_list('location', flat=True).distinct()
-    
-    # Get all jobs the student has already applied to
-    applied_job_ids = Application.objects.filter(student=request.user.student).values_list('job_id', flat=True)
-    
+
     # Search functionality
-    search_query = request.GET.get('search', '')
-    if search_query:
-        jobs = jobs.filter(
-            Q(title__icontains=search_query) | 
-            Q(position__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(recruiter__company_name__icontains=search_query)
-        )
-    
+    ordering = ('-posted_date', '-id')
+    if filters['search']:
+        # Ranked full-text match; the filters below still compose with it
+        backend = get_search_backend()
+        jobs = backend.search(jobs, filters['search'])
+        ordering = backend.ordering
+
     # Filter by location
-    location = request.GET.get('location', '')
-    if location:
-        jobs = jobs.filter(location=location)
-        
+    if filters['location']:
+        jobs = jobs.filter(location=filters['location'])
+
     # Filter by selection type
-    selection_type = request.GET.get('selection_type', '')
-    if selection_type:
-        jobs = jobs.filter(selection_type=selection_type)
+    if filters['selection_type']:
+        jobs = jobs.filter(selection_type=filters['selection_type'])
+
+    # Only jobs whose criteria the student meets, from the precomputed index
+    if eligible_only:
+        jobs = jobs.filter(id__in=Eligibility.objects.filter(student=student).values('job_id'))
+
+    # Keyset pagination, 10 jobs per page; the cards only show a description preview
+    return CursorPaginator(job_cards(jobs.select_related('recruiter')), ordering, per_page=10)
+
+
+def eligible_jobs_on_page(student, jobs):
+    return Eligibility.objects.filter(student=student, job_id__in=[job.pk for job in jobs]).values_list('job_id', flat=True)
+
+
+@student_required
+@replica_reads
+def search_job(request, student):
+    # Get all unique locations of open jobs for the filter dropdown (cached)
+    locations = get_location_facets()
+    
+    # Ids of the jobs the student has already applied to, as a set so each
+    # card's `in` test is a lookup rather than a scan of the queryset's rows
+    applied_job_ids = set(Application.objects.filter(student=student).values_list('job_id', flat=True))
     
-    # Pagination
-    paginator = Paginator(jobs, 10)  # Show 10 jobs per page
-    page = request.GET.get('page')
-    jobs = paginator.get_page(page)
+    filters = search_filters(request)
+    cursor = request.GET.get('cursor')
+    eligible_only = request.GET.get('eligible') == '1'
+
+    def build_page():
+        return job_search_paginator(student, filters, eligible_only).get_page(cursor)
+
+    # Identical filter combinations are served from the cache; an eligible-only
+    # list is the student's own
+    jobs = build_page() if eligible_only else get_job_page(filters, cursor, build_page)
 
     context = {
         'jobs': jobs,
         'locations': locations,
         'applied_job_ids': applied_job_ids,
+        'eligible_job_ids': set(eligible_jobs_on_page(student, jobs)),
+        'eligible_only': eligible_only,
     }
     
     return render(request, 'search_job.html', context)
 
+
 @student_required
-def apply_job(request, job_id):
-    if not request.user.is_student():
-        messages.error(request, "Access denied. Only students can apply for jobs.")
-        return redirect('home')
-    
-    job = get_object_or_404(Job, pk=job_id, is_active=True)
-    student = request.user.student
-    
-    # Check if student has already applied
-    if Application.objects.filter(student=student, job=job).exists():
-        messages.warning(request, "You have already applied for this job.")
-        return redirect('search_job')
-    
-    # Check if application deadline has passed
-    if job.last_date_to_apply < timezone.now():
-        messages.error(request, "The application deadline has passed.")
-        return redirect('search_job')
-    
+@replica_reads
+async def search_job_async(request, student):
+    # search_job for ASGI: the facets, the applied ids and the page are
+    # independent, so they are awaited together
+    filters = search_filters(request)
+    cursor = request.GET.get('cursor')
+    eligible_only = request.GET.get('eligible') == '1'
+
+    async def build_page():
+        return await job_search_paginator(student, filters, eligible_only).aget_page(cursor)
+
+    async def applied_ids():
+        return {job_id async for job_id in Application.objects.filter(student=student).values_list('job_id', flat=True)}
+
+    locations, applied_job_ids, jobs = await asyncio.gather(
+        aget_location_facets(),
+        applied_ids(),
+        build_page() if eligible_only else aget_job_page(filters, cursor, build_page),
+    )
+
+    context = {
+        'jobs': jobs,
+        'locations': locations,
+        'applied_job_ids': applied_job_ids,
+        'eligible_job_ids': {job_id async for job_id in eligible_jobs_on_page(student, jobs)},
+        'eligible_only': eligible_only,
+    }
+    return render(request, 'search_job.html', context)
+
+@staff_member_required
+def search_cache_stats(request):
+    return JsonResponse(cache_stats())
+
+
+def metrics(request):
+    # Staff users, or a Prometheus scraper with the METRICS_TOKEN bearer token
+    token = settings.METRICS_TOKEN
+    scraper = token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if not scraper and not (request.user.is_active and request.user.is_staff):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+APPLIED, DUPLICATE, CLOSED, NOT_FOUND = 'applied', 'duplicate', 'closed', 'not_found'
+
+
+def submit_application(student, job_id, preference_order=None):
+    """
+    Apply ``student`` to the job in one INSERT ... SELECT that only produces a
+    row while the job is active and open, and that turns a second application
+    into a no-op through the (student, job) unique constraint. Concurrent
+    calls can't both succeed. The application is ranked last, then moved to
+    ``preference_order`` if one is given. Returns (outcome, job title) where
+    outcome is APPLIED, DUPLICATE, CLOSED or NOT_FOUND; the title is only
+    read for APPLIED and is None otherwise.
+    """
+    now = timezone.now()
+    ops = connection.ops
+    application_table = Application._meta.db_table
+    sql = (
+        f"INSERT INTO {application_table} (student_id, job_id, status, preference_order, applied_date, updated_at) "
+        f"SELECT %s, id, %s, (SELECT COALESCE(MAX(preference_order), 0) + 1 FROM {application_table} WHERE student_id = %s), %s, %s "
+        f"FROM {Job._meta.db_table} "
+        f"WHERE id = %s AND is_active = %s AND last_date_to_apply > %s "
+        f"ON CONFLICT (student_id, job_id) DO NOTHING"
+    )
+    params = [
+        student.pk, Application.PENDING, student.pk, ops.adapt_datetimefield_value(now), ops.adapt_datetimefield_value(now),
+        job_id, True, ops.adapt_datetimefield_value(now),
+    ]
+    for attempt in range(3):
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    inserted = cursor.rowcount == 1
+                if inserted:
+                    # The raw INSERT skips post_save, so count the application here
+                    apply_status_deltas(job_id, {Application.PENDING: 1})
+                    queue_fast_track()
+                    # One read for the new row's id and the title the view reports
+                    application_id, title = (
+                        Application.objects.filter(student=student, job_id=job_id).values_list('id', 'job__title').get()
+                    )
+                    if preference_order:
+                        move_application(student, application_id, preference_order)
+                    return APPLIED, title
+            break
+        except IntegrityError:
+            # Another application by the same student took the last rank first
+            if attempt == 2:
+                raise
+
+    # Nothing inserted: only now work out why
+    if Application.objects.filter(student=student, job_id=job_id).exists():
+        return DUPLICATE, None
+    if Job.objects.filter(pk=job_id).exists():
+        return CLOSED, None
+    return NOT_FOUND, None
+
+
+@student_required
+def apply_job(request, student, job_id):
     # Check if student has CV
     has_cv = bool(student.cv)
     cv_approved = student.cv_approved_status if has_cv else False
     can_apply = has_cv  # Students can apply even if CV is not approved yet
-    
+
     if request.method == 'POST':
         if not has_cv:
             messages.error(request, "You need to upload your CV before applying.")
             return redirect('edit_profile')
-        
+
         form = JobApplicationForm(request.POST)
         if form.is_valid():
-            application = form.save(commit=False)
-            application.student = student
-            application.job = job
-            application.save()
-            messages.success(request, f"Applied successfully for {job.title}!")
+            # Eligibility, deadline and duplicates are all enforced by the insert itself
+            outcome, title = submit_application(student, job_id, form.cleaned_data['preference_order'])
+            if outcome == NOT_FOUND:
+                raise Http404("No such job.")
+            if outcome == APPLIED:
+                messages.success(request, f"Applied successfully for {title}!")
+            elif outcome == DUPLICATE:
+                messages.warning(request, "You have already applied for this job.")
+            else:
+                messages.error(request, "This job is no longer accepting applications.")
             return redirect('search_job')
     else:
         form = JobApplicationForm()
-    
+
+    job = get_object_or_404(Job, pk=job_id, is_active=True)
+
+    # Check if student has already applied
+    if Application.objects.filter(student=student, job=job).exists():
+        messages.warning(request, "You have already applied for this job.")
+        return redirect('search_job')
+
+    # Check if application deadline has passed
+    if job.last_date_to_apply < timezone.now():
+        messages.error(request, "The application deadline has passed.")
+        return redirect('search_job')
+
     context = {
         'job': job,
         'form': form,
@@ -142,79 +293,318 @@ def apply_job(request, job_id):
     return render(request, 'apply_job.html', context)
 
 @recruiter_required
-def update_application_status(request, application_id, new_status):
-    recruiter = request.user.recruiter
+def update_application_status(request, recruiter, application_id, new_status):
     application = get_object_or_404(Application, id=application_id, job__recruiter=recruiter)
 
     # Validate the status
     valid_statuses = [choice[0] for choice in Application.STATUS_CHOICES]
     if new_status not in valid_statuses:
         messages.error(request, "Invalid application status.")
+    elif new_status != application.status and not application.can_move_to(new_status):
+        messages.error(
+            request,
+            f"An application that is {application.get_status_display()} can't be moved to "
+            f"{dict(Application.STATUS_CHOICES)[new_status]}.",
+        )
     else:
-        application.status = new_status
-        application.save()
+        # Counters in the stats tables move in the same transaction
+        with transaction.atomic():
+            application.status = new_status
+            # auto_now only writes updated_at when it is listed
+            application.save(update_fields=['status', 'updated_at'])
         status_display = dict(Application.STATUS_CHOICES)[new_status]
         messages.success(request, f"Application status updated to {status_display}.")
 
     # Render the all_applications.html template with fresh data
-    applications = Application.objects.filter(job__recruiter=recruiter).order_by('-applied_date')
-    
-    # Apply the same filters as in all_applications view
-    status_filter = request.GET.get('status', None)
-    if status_filter:
-        applications = applications.filter(status=status_filter)
+    return render(request, 'all_applications.html', applications_context(request, recruiter))
 
-    job_filter = request.GET.get('job', None)
-    if job_filter:
-        applications = applications.filter(job_id=job_filter)
 
-    jobs = Job.objects.filter(recruiter=recruiter)
+# Upper bound on ids per bulk request, well under SQLite's bound-parameter limit
+BULK_STATUS_LIMIT = 1000
 
-    context = {
-        'applications': applications,
-        'jobs': jobs,
-    }
 
-    return render(request, 'all_applications.html', context)
+def bulk_update_status(recruiter, application_ids, new_status):
+    """
+    Move the recruiter's applications in ``application_ids`` to ``new_status``
+    with one ownership query and one UPDATE. Returns {id: outcome} where outcome
+    is 'updated', 'unchanged', 'not_allowed' (the state machine forbids the
+    move) or 'not_found' (missing or another recruiter's).
+    """
+    with transaction.atomic():
+        owned = list(
+            Application.objects.select_for_update()
+            .filter(id__in=application_ids, job__recruiter=recruiter)
+            .values_list('id', 'job_id', 'status')
+        )
+        moved = transition_applications([row for row in owned if row[2] != new_status], new_status)
+
+    results = {app_id: 'not_found' for app_id in application_ids}
+    for app_id, _, status in owned:
+        if status == new_status:
+            results[app_id] = 'unchanged'
+        else:
+            results[app_id] = 'updated' if app_id in moved else 'not_allowed'
+    return results
 
 
 @recruiter_required
-def all_applications(request):
-    recruiter = request.user.recruiter
+@require_POST
+def bulk_update_application_status(request, recruiter):
+    wants_json = request.content_type == 'application/json'
+
+    if wants_json:
+        try:
+            payload = json.loads(request.body)
+            raw_ids, new_status = payload['application_ids'], payload['status']
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({'error': "Expected application_ids and status."}, status=400)
+    else:
+        raw_ids, new_status = request.POST.getlist('application_ids'), request.POST.get('status')
+
+    try:
+        application_ids = list(dict.fromkeys(int(app_id) for app_id in raw_ids))
+    except (TypeError, ValueError):
+        application_ids = None
+
+    valid_statuses = [choice[0] for choice in Application.STATUS_CHOICES]
+    if new_status not in valid_statuses:
+        error = "Invalid application status."
+    elif not application_ids:
+        error = "No applications selected."
+    elif len(application_ids) > BULK_STATUS_LIMIT:
+        error = f"At most {BULK_STATUS_LIMIT} applications can be updated at once."
+    else:
+        error = None
+
+    if error:
+        if wants_json:
+            return JsonResponse({'error': error}, status=400)
+        messages.error(request, error)
+    else:
+        results = bulk_update_status(recruiter, application_ids, new_status)
+        updated = sum(1 for outcome in results.values() if outcome == 'updated')
+        if wants_json:
+            return JsonResponse({'status': new_status, 'updated': updated, 'results': results})
+        status_display = dict(Application.STATUS_CHOICES)[new_status]
+        messages.success(request, f"{updated} applications moved to {status_display}.")
+        not_allowed = sum(1 for outcome in results.values() if outcome == 'not_allowed')
+        if not_allowed:
+            messages.warning(request, f"{not_allowed} applications can't be moved to {status_display} from their current stage.")
+
+    # Back to the listing with the same filters
+    query = request.GET.urlencode()
+    return redirect(reverse('all_applications') + (f'?{query}' if query else ''))
+
 
-    applications = Application.objects.filter(job__recruiter=recruiter).order_by('-applied_date')
+def filter_applications(request, recruiter):
+    # The status and job filters shared by the listing and the export
+    applications = Application.objects.filter(job__recruiter=recruiter)
 
     status_filter = request.GET.get('status', None)
     if status_filter:
         applications = applications.filter(status=status_filter)
 
-    jobs = Job.objects.filter(recruiter=recruiter)
-
     job_filter = request.GET.get('job', None)
     if job_filter:
         applications = applications.filter(job_id=job_filter)
 
-    context = {
-        'applications': applications,
-        'jobs': jobs,
+    return applications
+
+
+def applications_paginator(request, recruiter):
+    applications = application_rows(filter_applications(request, recruiter))
+
+    # Keyset pagination, newest first; the total is capped so it stays cheap
+    return CursorPaginator(applications, ('-applied_date', '-id'), per_page=20, count='estimate')
+
+
+def job_choices(recruiter):
+    # The job filter only needs titles
+    return Job.objects.filter(recruiter=recruiter).only('id', 'title')
+
+
+def bulk_statuses(page):
+    # The bulk form offers the statuses at least one row on the page can move to
+    return {status for app in page for status in app.allowed_transitions}
+
+
+def applications_context(request, recruiter):
+    page = applications_paginator(request, recruiter).get_page(request.GET.get('cursor'))
+    return {
+        'applications': page,
+        'bulk_statuses': bulk_statuses(page),
+        'jobs': job_choices(recruiter),
     }
 
+
+@recruiter_required
+@replica_reads
+def all_applications(request, recruiter):
+    return render(request, 'all_applications.html', applications_context(request, recruiter))
+
+
+@recruiter_required
+@replica_reads
+async def all_applications_async(request, recruiter):
+    paginator = applications_paginator(request, recruiter)
+
+    async def jobs():
+        return [job async for job in job_choices(recruiter)]
+
+    page, _, job_list = await asyncio.gather(
+        paginator.aget_page(request.GET.get('cursor')),
+        paginator.acount(),
+        jobs(),
+    )
+    context = {'applications': page, 'bulk_statuses': bulk_statuses(page), 'jobs': job_list}
     return render(request, 'all_applications.html', context)
 
 
+class Echo:
+    # File-like object for csv.writer that hands each line back instead of buffering it
+    def write(self, value):
+        return value
+
+
+EXPORT_FIELDS = [
+    ('id', 'application_id'),
+    ('job_id', 'job_id'),
+    ('job__title', 'job_title'),
+    ('student__user__username', 'username'),
+    ('student__user__first_name', 'first_name'),
+    ('student__user__last_name', 'last_name'),
+    ('student__user__email', 'email'),
+    ('status', 'status'),
+    ('preference_order', 'preference_order'),
+    ('applied_date', 'applied_date'),
+]
+
+
 @recruiter_required
-def download_cv(request, application_id):
-    recruiter = request.user.recruiter
-    application = get_object_or_404(Application, id=application_id, job__recruiter=recruiter)
+def export_applications(request, recruiter):
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in ('csv', 'jsonl'):
+        return HttpResponseBadRequest("Unsupported export format.")
+
+    # Only the exported columns, streamed from a server-side cursor in chunks
+    columns = [column for column, _ in EXPORT_FIELDS]
+    headers = [header for _, header in EXPORT_FIELDS]
+    rows = (
+        filter_applications(request, recruiter)
+        .order_by('-applied_date', '-id')
+        .values_list(*columns)
+        .iterator(chunk_size=2000)
+    )
+
+    if export_format == 'csv':
+        writer = csv.writer(Echo())
+        lines = itertools.chain(
+            [writer.writerow(headers)],
+            (writer.writerow(row) for row in rows),
+        )
+        content_type = 'text/csv'
+    else:
+        lines = (json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + '\n' for row in rows)
+        content_type = 'application/x-ndjson'
+
+    filename = f"applications-{timezone.now():%Y%m%d-%H%M}.{export_format}"
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@recruiter_required
+def download_cv(request, recruiter, application_id):
+    application = get_object_or_404(
+        Application.objects.select_related('student__user'), id=application_id, job__recruiter=recruiter
+    )
+    student = application.student
     
     # Check if student has a CV
-    if not application.student.cv:
+    if not student.cv:
         messages.error(request, "This student has not uploaded a CV.")
-        return redirect('view_applicants', job_id=application.job.id)
+        return redirect('all_applications')
     
-    # Serve the CV file
+    # Serve the CV file, with caching validators and Range support
+    extension = os.path.splitext(student.cv.name)[1]
+    filename = f"{student.user.get_full_name() or student.user.username}_CV{extension}"
     try:
-        return FileResponse(application.student.cv.open(), as_attachment=True, filename=f"{application.student.user.get_full_name()}_CV.pdf")
-    except Exception as e:
+        return serve_file(request, student.cv, filename, etag_value=student.cv_sha256 or None)
+    except OSError as e:
         messages.error(request, f"Error downloading CV: {str(e)}")
-        return redirect('view_applicants', job_id=application.job.id)
+        return redirect('all_applications')
+
+
+@recruiter_required
+def download_job_cvs(request, recruiter, job_id):
+    # One ownership check for the whole archive
+    job = get_object_or_404(Job, pk=job_id, recruiter=recruiter)
+
+    applications = Application.objects.filter(job=job).exclude(student__cv='').exclude(student__cv__isnull=True)
+    status_filter = request.GET.get('status', None)
+    if status_filter:
+        applications = applications.filter(status=status_filter)
+
+    # Names only, read lazily; each CV is streamed into the archive in turn
+    rows = applications.order_by('id').values_list('student__user__username', 'student__cv').iterator(chunk_size=500)
+    members = ((f"{username}{os.path.splitext(cv_name)[1]}", cv_name) for username, cv_name in rows)
+
+    response = StreamingHttpResponse(stream_zip(get_cv_storage(), members), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{slugify(job.title) or "job"}-cvs.zip"'
+    return response
+
+
+@student_required
+@require_POST
+def reorder_application(request, student, application_id):
+    wants_json = request.content_type == 'application/json'
+    try:
+        rank = int(json.loads(request.body)['rank'] if wants_json else request.POST.get('rank'))
+    except (ValueError, KeyError, TypeError):
+        rank = None
+
+    new_rank = move_application(student, application_id, rank) if rank and rank > 0 else None
+    if wants_json:
+        if rank is None or rank < 1:
+            return JsonResponse({'error': "Expected a rank of 1 or more."}, status=400)
+        if new_rank is None:
+            return JsonResponse({'error': "No such application."}, status=404)
+        return JsonResponse({'application_id': application_id, 'rank': new_rank})
+
+    if new_rank is None:
+        messages.error(request, "Could not change the preference order.")
+    else:
+        messages.success(request, f"Moved to preference {new_rank}.")
+    return redirect('student_dashboard')
+
+
+@recruiter_required
+@replica_reads
+def job_ranking(request, recruiter, job_id):
+    job = get_object_or_404(Job, pk=job_id, recruiter=recruiter)
+
+    # Applicants who ranked this job highest first; served by application_job_preference_idx
+    applications = Application.objects.filter(job=job).select_related('student__user')
+    status_filter = request.GET.get('status', None)
+    if status_filter:
+        applications = applications.filter(status=status_filter)
+
+    paginator = CursorPaginator(applications, ('preference_order', 'applied_date', 'id'), per_page=25)
+    page = paginator.get_page(request.GET.get('cursor'))
+    context = {
+        'job': job,
+        'applications': page,
+        'eligible_student_ids': eligible_applicants(job, [app.student_id for app in page]),
+        'status_choices': Application.STATUS_CHOICES,
+        'status_filter': status_filter,
+    }
+    return render(request, 'job_ranking.html', context)
+
+
+@recruiter_required
+@require_POST
+def reject_ineligible_applications(request, recruiter, job_id):
+    job = get_object_or_404(Job, pk=job_id, recruiter=recruiter)
+    rejected = reject_ineligible(job)
+    messages.success(request, f"Rejected {rejected} applicants who don't meet the job's criteria.")
+    return redirect('job_ranking', job_id=job.pk)